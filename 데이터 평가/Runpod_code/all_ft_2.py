@@ -3,11 +3,12 @@ from dotenv import load_dotenv
 load_dotenv()  # .env 구문 자동 로드
 
 import os
+import json
 import shutil
 import torch
 import configparser
 from huggingface_hub import HfApi, login
-from datasets import load_dataset, Features, Value
+from datasets import load_dataset, load_from_disk, Features, Value
 from transformers import (
     AutoTokenizer, AutoModelForCausalLM,
     TrainingArguments, Trainer,
@@ -45,6 +46,10 @@ class FullFTTrainer:
         print("✅ Hugging Face 로그인 완료:", self.api.whoami()["name"])
 
     def load_and_prepare_dataset(self):
+        # dataset/functions/3_to_instruct.write_arrow_dataset로 만든 Arrow 폴더는 JSON 파싱 없이 memory-map
+        if os.path.isdir(self.file_path):
+            self.dataset = load_from_disk(self.file_path)
+            return
         temp_cache_dir = "./tmp_cache"
         os.makedirs(temp_cache_dir, exist_ok=True)
         features = Features({
@@ -78,7 +83,25 @@ class FullFTTrainer:
         self.tokenizer = AutoTokenizer.from_pretrained(self.model_id)
         self.model = AutoModelForCausalLM.from_pretrained(self.model_id)
 
+    def pretokenized_columns(self):
+        # 같은 모델 tokenizer로 미리 토큰화된 Arrow 폴더면 토큰 컬럼 목록, 아니면 None
+        tokenization_path = os.path.join(self.file_path, "tokenization.json")
+        if "input_ids" not in self.dataset.column_names or not os.path.exists(tokenization_path):
+            return None
+        with open(tokenization_path, "r", encoding="utf-8") as f:
+            tokenization = json.load(f)
+        if tokenization.get("tokenizer") != self.model_id:
+            print(f"⚠️ 미리 토큰화한 tokenizer({tokenization.get('tokenizer')})가 모델과 달라서 다시 토큰화합니다.")
+            return None
+        # 텍스트 컬럼(string)을 뺀 나머지가 토큰 컬럼
+        return [col for col, feature in self.dataset.features.items() if getattr(feature, "dtype", None) != "string"]
+
     def tokenize_dataset(self):
+        token_columns = self.pretokenized_columns()
+        if token_columns is not None:
+            # 이미 토큰화된 컬럼만 선택 (map 없이 바로 학습)
+            self.tokenized_dataset = self.dataset.select_columns(token_columns)
+            return
         self.tokenized_dataset = self.dataset.map(self.format_and_tokenize, remove_columns=self.dataset.column_names)
 
     def setup_trainer(self):
@@ -1,13 +1,7 @@
 import json
 import os
 from collections import OrderedDict
-
-# 데이터 파일 경로 설정
-root_path = "/Users/seo/Documents/_code/for_AI/my_project/Finetuning/dataset/_dataset"
-input_name = "data_nyang.jsonl"
-output_name = "dataset_0613_made.jsonl"
-input_path = os.path.join(root_path, input_name)
-output_path = os.path.join(root_path, output_name)
+from typing import Dict, Iterable, Iterator
 
 # 컬럼명 변경 매핑: 원본 컬럼명 → 바꿀 컬럼명
 rename_map = {
@@ -18,27 +12,27 @@ rename_map = {
 # 최종적으로 저장할 컬럼 순서 지정
 column_order = ["content", "emotion", "post_type", "transformed_content"]
 
-with open(input_path, encoding="utf-8") as infile, open(output_path, "w", encoding="utf-8") as outfile:
-    for line in infile:
-        if not line.strip():
-            continue  # 빈 줄은 건너뜀
-
-        # 한 줄씩 JSON 파싱
-        item = json.loads(line)
-
+def to_post(rows: Iterable[Dict], rename: Dict = None, columns: list = None,
+            emotion: str = "normal", post_type: str = "cat") -> Iterator[Dict]:
+    """
+    컬럼명 변경 + emotion/post_type 지정 + 컬럼 순서 정렬 (한 행씩 변환)
+    """
+    rename = rename_map if rename is None else rename
+    columns = column_order if columns is None else columns
+    for item in rows:
         # 컬럼명 변경 적용
         new_item = {}
         for k, v in item.items():
-            new_key = rename_map.get(k, k)  # 매핑에 있으면 바꿔주고, 없으면 그대로
+            new_key = rename.get(k, k)  # 매핑에 있으면 바꿔주고, 없으면 그대로
             new_item[new_key] = v
 
         # emotion, post_type 컬럼 추가/수정
-        new_item["emotion"] = "normal"
-        new_item["post_type"] = "cat"
+        new_item["emotion"] = emotion
+        new_item["post_type"] = post_type
 
         # 지정한 컬럼 순서대로 정렬
         ordered = OrderedDict()
-        for col in column_order:
+        for col in columns:
             if col in new_item:
                 ordered[col] = new_item[col]
 
@@ -46,7 +40,26 @@ with open(input_path, encoding="utf-8") as infile, open(output_path, "w", encodi
         for k, v in new_item.items():
             if k not in ordered:
                 ordered[k] = v
+        yield ordered
+
+def read_rows(infile) -> Iterator[Dict]:
+    for line in infile:
+        if not line.strip():
+            continue  # 빈 줄은 건너뜀
+
+        # 한 줄씩 JSON 파싱
+        yield json.loads(line)
+
+if __name__ == "__main__":
+    # 데이터 파일 경로 설정
+    root_path = "/Users/seo/Documents/_code/for_AI/my_project/Finetuning/dataset/_dataset"
+    input_name = "data_nyang.jsonl"
+    output_name = "dataset_0613_made.jsonl"
+    input_path = os.path.join(root_path, input_name)
+    output_path = os.path.join(root_path, output_name)
 
-        # 한 줄씩 JSONL로 저장
-        json.dump(ordered, outfile, ensure_ascii=False)
-        outfile.write('\n')
\ No newline at end of file
+    with open(input_path, encoding="utf-8") as infile, open(output_path, "w", encoding="utf-8") as outfile:
+        for ordered in to_post(read_rows(infile)):
+            # 한 줄씩 JSONL로 저장
+            json.dump(ordered, outfile, ensure_ascii=False)
+            outfile.write('\n')
@@ -1,72 +1,38 @@
 import os
-import re
 import json
+import heapq
 import argparse
-from typing import Dict
+import numpy as np
+from operator import itemgetter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Tuple
 from collections import Counter, OrderedDict
+from text_normalize import (
+    EMOJI_CLASS, EMOJI_RE, HASHTAG_RE, WORD_RE, MEANINGLESS_RE, KOR_ENG_RE, STARTS_WITH_ALPHA_RE, DANGER_KEYWORDS,
+    TEXT_FEATURES, consecutive_emoji_re, clean_special_spaces, postprocess, postprocess_texts, text_features
+)
 
 class TextPostprocessor:
-    # 이모지 패턴 정의
-    EMOJI_PATTERN = (
-        "[" +
-        "\U0001F600-\U0001F64F"
-        "\U0001F300-\U0001F5FF"
-        "\U0001F680-\U0001F6FF"
-        "\U0001F1E0-\U0001F1FF"
-        "\U00002700-\U000027BF"
-        "\U0001F900-\U0001F9FF"
-        "\U00002600-\U000026FF"
-        "]"
-    )
+    # 이모지 패턴 정의 (text_normalize에서 한 번만 compile)
+    EMOJI_PATTERN = EMOJI_CLASS
 
     @staticmethod
     def clean_special_spaces(text: str) -> str:
         # 특수 유니코드 공백을 일반 공백으로 치환
-        return re.sub(r'[\u2000-\u200B\u2800\u3000]', ' ', text)
+        return clean_special_spaces(text)
 
     @classmethod
     def process(cls, text: str, original_content: str = "") -> str:
-        # 특수 공백 치환
-        text = cls.clean_special_spaces(text)
-        # 해시태그 제거
-        text = re.sub(r'#\S+', '', text)
-        # 실제 줄바꿈 문자 제거
-        text = re.sub(r'(\r\n|\r|\n)', '', text)
-        # 이스케이프된 줄바꿈 문자 제거
-        text = re.sub(r'(\\r\\n|\\r|\\n)', '', text)
-        text = re.sub(r"[️‹›／]", '', text)
-        # 이모지 2개만 남기기
-        emojis = re.findall(cls.EMOJI_PATTERN, text)
-        if len(emojis) > 2:
-            keep = emojis[:2]
-            text = re.sub(cls.EMOJI_PATTERN, '', text) + ''.join(keep)
-        # 연속 특수문자 압축은 하지 않음 (예: ... → ... 그대로 둠)
-        # 반복 단어 2회까지만 허용
-        words = re.findall(r'\b\w+\b', text)
-        counts = Counter(words)
-        for word, count in counts.items():
-            if count > 2:
-                text = re.sub(rf'\b({re.escape(word)})\b', '', text, count=count - 2)
-        # 중복 마침표, 불필요한 공백 정리
-        text = re.sub(r'\.\.+', lambda m: m.group(0), text)  # ... 등은 그대로 둠
-        text = re.sub(r'\s+', ' ', text).strip()
-        # 5자 미만, 의미 없는 텍스트는 오류 메시지
-        if len(text) < 5 or re.fullmatch(r'[\W\d\s]+', text):
-            return "[출력 오류] 결과 생성이 실패했어요."
-        # 변환 텍스트가 너무 길면 자르기 (최대 200자)
-        if original_content:
-            max_len = 200
-            if len(text) > max_len:
-                words = text.split()
-                trimmed_text = ""
-                for word in words:
-                    if len(trimmed_text) + len(word) + 1 > max_len:
-                        break
-                    trimmed_text += word + " "
-                text = trimmed_text.strip()
-        return text
+        # 특수 공백/해시태그/줄바꿈 제거, 이모지 2개·반복 단어 2회까지, 5자 미만 오류 메시지, 200자 자르기
+        return postprocess(text, original_content)
+
+    @classmethod
+    def process_batch(cls, texts, original_contents=None) -> list:
+        return postprocess_texts(texts, original_contents)
 
 class DataFilter:
+    FIELDS = ['content', 'transformed_content']
+
     @staticmethod
     def should_remove(data: Dict) -> bool:
         # content, transformed_content 모두 없음
@@ -76,24 +42,21 @@ class DataFilter:
         for key in ['content', 'transformed_content']:
             if key in data:
                 text = data[key]
-                if len(text) >= 5 and not re.fullmatch(r'[\W\d\s]+', text):
+                if len(text) >= 5 and not MEANINGLESS_RE.fullmatch(text):
                     break
         else:
             return True
         
         # 시스템 메시지, 명령어, 해킹/공격/SQL 인젝션 등 포함
-        danger_keywords = [
-            "system", "override", "drop table", "select", "union", "script", "해킹", "attack", "hack", "sql", "delete", "insert", "update", "shutdown"
-        ]
         for key in ['content', 'transformed_content']:
             if key in data:
                 text = data[key].lower()
-                if any(kw in text for kw in danger_keywords):
+                if any(kw in text for kw in DANGER_KEYWORDS):
                     return True
                 
         # 한글/영어가 하나도 없는 경우 삭제
         def has_kor_eng(text: str) -> bool:
-            return bool(re.search(r'[A-Za-z가-힣]', text))
+            return bool(KOR_ENG_RE.search(text))
         if not (has_kor_eng(data.get('content', '')) or has_kor_eng(data.get('transformed_content', ''))):
             return True
         
@@ -118,24 +81,87 @@ class DataFilter:
         
         return False
 
+    @staticmethod
+    def extract_features(rows: List[Dict]) -> Dict:
+        """
+        행 묶음의 특징 레코드: 필드별 {"present": 필드 존재 여부, TEXT_FEATURES 이름: 값 배열}
+        - 텍스트마다 text_features로 한 번만 scan
+        - 필드 값이 문자열이 아닌 행은 "fallback"=True (should_remove/should_modify로 직접 판별)
+        """
+        empty = (0,) * len(TEXT_FEATURES)
+        fallback = []
+        present = {key: [] for key in DataFilter.FIELDS}
+        records = {key: [] for key in DataFilter.FIELDS}
+        for data in rows:
+            usable = all(isinstance(data[key], str) for key in DataFilter.FIELDS if key in data)
+            fallback.append(not usable)
+            for key in DataFilter.FIELDS:
+                has_field = usable and key in data
+                present[key].append(has_field)
+                records[key].append(text_features(data[key]) if has_field else empty)
+
+        features = {"fallback": np.asarray(fallback, dtype=bool)}
+        for key in DataFilter.FIELDS:
+            columns = np.asarray(records[key], dtype=np.int64).reshape(len(rows), len(TEXT_FEATURES))
+            features[key] = {"present": np.asarray(present[key], dtype=bool)}
+            features[key].update({name: columns[:, i] for i, name in enumerate(TEXT_FEATURES)})
+        return features
+
+    @staticmethod
+    def evaluate(features: Dict, max_emojis: int = 4, consecutive: int = 3, repeat: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        특징 레코드에 should_remove / should_modify 규칙을 배열 연산으로 적용
+        Returns: (삭제 mask, 수정 mask)
+        """
+        content, transformed = features['content'], features['transformed_content']
+        fields = [content, transformed]
+        # 삭제: 두 필드 모두 빈 값 / 5자 이상이면서 의미 있는 필드 없음 / 위험 키워드 / 한글·영어 없음
+        remove = (content["length"] == 0) & (transformed["length"] == 0)
+        remove |= ~np.logical_or.reduce([(f["length"] >= 5) & (f["meaningful"] > 0) for f in fields])
+        remove |= np.logical_or.reduce([f["danger"] > 0 for f in fields])
+        remove |= ~np.logical_or.reduce([f["kor_eng"] > 0 for f in fields])
+        # 수정: 해시태그, 이모지 과다/연속, 비알파벳 시작, 반복 단어, 변환 텍스트 과다 길이
+        modify = np.logical_or.reduce([
+            f["present"] & (
+                (f["hashtag"] > 0)
+                | (f["emoji_count"] > max_emojis)
+                | (f["emoji_run"] >= consecutive)
+                | (f["starts_alpha"] == 0)
+                | (f["max_word_count"] > repeat)
+            )
+            for f in fields
+        ])
+        modify |= (content["length"] > 0) & (transformed["length"] > 2.0 * content["length"])
+        return remove, modify
+
+    @staticmethod
+    def decide(rows: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        행 묶음의 (삭제 mask, 수정 mask). should_remove / should_modify와 같은 결과
+        """
+        features = DataFilter.extract_features(rows)
+        remove, modify = DataFilter.evaluate(features)
+        for i in np.flatnonzero(features["fallback"]):
+            remove[i] = DataFilter.should_remove(rows[i])
+            modify[i] = not remove[i] and DataFilter.should_modify(rows[i])
+        return remove, modify
+
     @staticmethod
     def contains_hashtags(text: str) -> bool:
-        return bool(re.search(r'#\S+', text))
+        return bool(HASHTAG_RE.search(text))
 
     @staticmethod
     def contains_many_emojis(text: str, max_emojis: int = 4) -> bool:
-        emoji_re = re.compile(TextPostprocessor.EMOJI_PATTERN, flags=re.UNICODE)
-        return len(re.findall(emoji_re, text)) > max_emojis
+        return len(EMOJI_RE.findall(text)) > max_emojis
 
     @staticmethod
     def contains_consecutive_emojis(text: str, consecutive: int = 3) -> bool:
-        pattern = re.compile(TextPostprocessor.EMOJI_PATTERN + "{" + str(consecutive) + ",}", flags=re.UNICODE)
-        return bool(pattern.search(text))
+        return bool(consecutive_emoji_re(consecutive).search(text))
 
     @staticmethod
     def starts_with_non_alpha(text: str) -> bool:
         text = text.strip()
-        return not bool(re.match(r'^[A-Za-z가-힣]', text))
+        return not bool(STARTS_WITH_ALPHA_RE.match(text))
 
     @staticmethod
     def transformed_too_long(data: Dict) -> bool:
@@ -147,63 +173,122 @@ class DataFilter:
 
     @staticmethod
     def contains_repeated_word(text: str, repeat: int = 3) -> bool:
-        words = re.findall(r'\b\w+\b', text)
+        words = WORD_RE.findall(text)
         word_counts = Counter(words)
         return any(count > repeat for count in word_counts.values())
 
-def filter_and_postprocess(input_path: str, output_path: str, remove_duplicates: bool = True, skip_until_line: int = 0) -> None:
-    """
-    - input_path: 입력 jsonl 파일 경로
-    - output_path: 출력 jsonl 파일 경로
-    - skip_until_line: 해당 줄까지 데이터는 모두 건너뜀(1부터 시작)
-    - remove_duplicates: True면 중복 제거, False면 중복 제거 안함
-    """
-    seen = set()
+def _dedup_key(data: Dict) -> tuple:
+    # 중복 제거 기준: content + emotion + post_type
+    return (
+        data.get('content', '').strip(),
+        data.get('emotion', ''),
+        data.get('post_type', '')
+    )
+
+def _filter_chunk(chunk: List[Tuple[int, Dict]]) -> Iterator[Tuple[int, Dict]]:
     column_order = ["content", "emotion", "post_type", "transformed_content"]
-    with open(input_path, 'r', encoding='utf-8') as infile, open(output_path, 'w', encoding='utf-8') as outfile:
-        for idx, line in enumerate(infile, 1):
-            if idx <= skip_until_line:
-                continue
-            try:
-                data = json.loads(line)
-            except Exception:
-                continue
+    remove, modify = DataFilter.decide([data for _, data in chunk])
+    for (idx, data), drop, fix in zip(chunk, remove, modify):
+        # 삭제 조건
+        if drop:
+            continue
 
-            # 중복 제거 기준: content + emotion + post_type
-            if remove_duplicates:
-                key = (
-                    data.get('content', '').strip(),
-                    data.get('emotion', ''),
-                    data.get('post_type', '')
+        # 수정(후처리) 조건
+        if fix:
+            if 'content' in data:
+                data['content'] = TextPostprocessor.process(data['content'])
+            if 'transformed_content' in data:
+                data['transformed_content'] = TextPostprocessor.process(
+                    data['transformed_content'],
+                    original_content=data.get('content', '')
                 )
-                if key in seen:
-                    continue
-                seen.add(key)
 
-            # 삭제 조건
-            if DataFilter.should_remove(data):
+        # 컬럼 순서 정렬
+        ordered = OrderedDict()
+        for col in column_order:
+            if col in data:
+                ordered[col] = data[col]
+        for k, v in data.items():
+            if k not in ordered:
+                ordered[k] = v
+        yield idx, ordered
+
+def _filter_indexed(rows: Iterable[Tuple[int, Dict]], remove_duplicates: bool = True,
+                    chunk_size: int = 1024) -> Iterator[Tuple[int, Dict]]:
+    # (원래 행 번호, 행)을 받아 중복 제거 → 삭제/수정 판별 → 후처리, 남은 행을 (행 번호, 결과)로 반환
+    seen = set()
+    chunk = []
+    for idx, data in rows:
+        if remove_duplicates:
+            key = _dedup_key(data)
+            if key in seen:
                 continue
+            seen.add(key)
+        chunk.append((idx, data))
+        if len(chunk) >= chunk_size:
+            yield from _filter_chunk(chunk)
+            chunk = []
+    if chunk:
+        yield from _filter_chunk(chunk)
+
+def _filter_partition(args: Tuple[List[Tuple[int, Dict]], bool]) -> List[Tuple[int, Dict]]:
+    # 프로세스 풀 worker: 파티션 하나를 처리 (같은 중복 키는 같은 파티션에 있어서 파티션 안에서만 중복 제거)
+    rows, remove_duplicates = args
+    return list(_filter_indexed(rows, remove_duplicates))
+
+def _filter_parallel(rows: Iterable[Dict], remove_duplicates: bool, max_workers: int) -> Iterator[Dict]:
+    """
+    중복 키(content, emotion, post_type) hash로 행을 파티션에 나누고 프로세스 풀에서 처리한 뒤 원래 순서로 병합
+    - 중복 키가 같은 행은 모두 같은 파티션에 원래 순서대로 들어가므로, 파티션별 중복 제거 결과가 전체 순차 처리와 같음
+    - 파티션 개수는 worker의 4배 (파티션 크기 차이로 한 worker만 오래 걸리지 않게)
+    """
+    n_partitions = max_workers * 4
+    partitions = [[] for _ in range(n_partitions)]
+    for idx, data in enumerate(rows):
+        # hash()는 프로세스마다 달라질 수 있지만 파티션 배정은 이 프로세스에서만 함
+        key = _dedup_key(data) if remove_duplicates else idx
+        partitions[hash(key) % n_partitions].append((idx, data))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(_filter_partition, [(part, remove_duplicates) for part in partitions if part]))
+    # 각 파티션 결과는 행 번호 순서라서 k-way merge로 원래 순서 복원
+    for _, ordered in heapq.merge(*results, key=itemgetter(0)):
+        yield ordered
+
+def filter_rows(rows: Iterable[Dict], remove_duplicates: bool = True, chunk_size: int = 1024,
+                max_workers: int = 1) -> Iterator[Dict]:
+    """
+    중복 제거 → 삭제 조건 → 수정(후처리) → 컬럼 순서 정렬 (파이프라인 stage로도 사용)
+    - remove_duplicates: True면 중복 제거, False면 중복 제거 안함
+    - chunk_size: 삭제/수정 조건을 한 번에 판별할 행 개수 (DataFilter.decide)
+    - max_workers: 2 이상이면 프로세스 풀로 병렬 처리 (입력을 모두 읽은 뒤 처리, 결과는 순차 처리와 동일)
+    """
+    if max_workers > 1:
+        yield from _filter_parallel(rows, remove_duplicates, max_workers)
+        return
+    for _, ordered in _filter_indexed(enumerate(rows), remove_duplicates, chunk_size):
+        yield ordered
 
-            # 수정(후처리) 조건
-            if DataFilter.should_modify(data):
-                if 'content' in data:
-                    data['content'] = TextPostprocessor.process(data['content'])
-                if 'transformed_content' in data:
-                    data['transformed_content'] = TextPostprocessor.process(
-                        data['transformed_content'],
-                        original_content=data.get('content', '')
-                    )
-
-            # 컬럼 순서 정렬
-            ordered = OrderedDict()
-            for col in column_order:
-                if col in data:
-                    ordered[col] = data[col]
-            for k, v in data.items():
-                if k not in ordered:
-                    ordered[k] = v
-            data = ordered
+def _read_jsonl(infile, skip_until_line: int = 0) -> Iterator[Dict]:
+    for idx, line in enumerate(infile, 1):
+        if idx <= skip_until_line:
+            continue
+        try:
+            yield json.loads(line)
+        except Exception:
+            continue
 
+def filter_and_postprocess(input_path: str, output_path: str, remove_duplicates: bool = True, skip_until_line: int = 0,
+                           max_workers: int = 1) -> None:
+    """
+    - input_path: 입력 jsonl 파일 경로
+    - output_path: 출력 jsonl 파일 경로
+    - skip_until_line: 해당 줄까지 데이터는 모두 건너뜀(1부터 시작)
+    - remove_duplicates: True면 중복 제거, False면 중복 제거 안함
+    - max_workers: 병렬 처리 프로세스 수 (1이면 순차 처리)
+    """
+    with open(input_path, 'r', encoding='utf-8') as infile, open(output_path, 'w', encoding='utf-8') as outfile:
+        rows = _read_jsonl(infile, skip_until_line)
+        for data in filter_rows(rows, remove_duplicates=remove_duplicates, max_workers=max_workers):
             json.dump(data, outfile, ensure_ascii=False)
             outfile.write('\n')
 
@@ -246,6 +331,7 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Process dataset files for finetuning.')
     parser.add_argument('-c', type=str, required=True, help='Dataset code to process')
     parser.add_argument('--skip', type=int, default=0, help='해당 줄까지 데이터는 모두 삭제(1부터 시작)')
+    parser.add_argument('--max_workers', type=int, default=1, help='병렬 처리에 사용할 프로세스 수 (1이면 순차 처리)')
     args = parser.parse_args()
 
     root_path = "/Users/seo/Documents/_code/for_AI/my_project/Finetuning/dataset/_dataset"
@@ -254,7 +340,8 @@ if __name__ == "__main__":
     output_file_path = os.path.join(root_path, f'_filtered/dataset_{code}_filtered.jsonl')
 
     # 데이터 필터링 및 후처리, 지정한 줄까지 삭제
-    filter_and_postprocess(input_file_path, output_file_path, remove_duplicates = True, skip_until_line=args.skip)
+    filter_and_postprocess(input_file_path, output_file_path, remove_duplicates = True, skip_until_line=args.skip,
+                           max_workers=args.max_workers)
 
     print("✅ 필터링 완료 및 새로운 파일 생성 완료")
     print(f"! 변환 전 데이터 개수: {count_lines(input_file_path)}")
@@ -1,27 +1,191 @@
 import json
 import os 
+import shutil
+import hashlib
+import itertools
+from string import Formatter
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# 학습 프롬프트 템플릿 (post: Runpod_code/all_ft_2.py format_and_tokenize와 같은 형식)
+TEMPLATES = {
+    "post": (
+        "### content:\n{content}\n"
+        "### emotion:\n{emotion}\n"
+        "### post_type:\n{post_type}\n\n"
+        "### transformed_content:\n{transformed_content}"
+    ),
+    "instruct": "### instruction:\n{instruction}\n### input:\n{input}\n\n### output:\n{output}",
+}
+# tokenizer가 돌려주는 컬럼 중 0/1 값만 있는 컬럼 (int8로 저장, 나머지는 int32)
+SMALL_INT_COLUMNS = {"attention_mask", "token_type_ids", "special_tokens_mask"}
+ARROW_FILENAME = "data-00000-of-00001.arrow"
+TOKENIZATION_NAME = "tokenization.json"
+
+def to_instruction(rows: Iterable[Dict]) -> Iterator[Dict]:
+    for data in rows:
+        # 감정(emotion)이 영어라면 happy → happy한 등으로 변환
+        instruction = f"다음 문장을 {data['post_type']}의 {data['emotion']}한 말투로 바꿔줘."
+        yield {
+            "instruction": instruction,
+            "input": data["content"],
+            "output": data["transformed_content"]
+        }
 
 def convert_to_instruction_format(
     old_path: str,
     new_path: str
 ) -> None:
     with open(old_path, 'r', encoding='utf-8') as fin, open(new_path, 'w', encoding='utf-8') as fout:
-        for line in fin:
-            data = json.loads(line)
-            # 감정(emotion)이 영어라면 happy → happy한 등으로 변환
-            instruction = f"다음 문장을 {data['post_type']}의 {data['emotion']}한 말투로 바꿔줘."
-            new_data = {
-                "instruction": instruction,
-                "input": data["content"],
-                "output": data["transformed_content"]
-            }
+        for new_data in to_instruction(json.loads(line) for line in fin):
             fout.write(json.dumps(new_data, ensure_ascii=False) + '\n')
 
-root_path = "/Users/seo/Documents/_code/for_AI/my_project/Finetuning/dataset/_dataset/"
+def template_fields(template: str) -> List[str]:
+    return [name for _, name, _, _ in Formatter().parse(template) if name]
+
+def resolve_template(template: Optional[str], row: Dict) -> str:
+    """
+    template이 None이면 행 컬럼에 맞는 TEMPLATES 항목 선택 (instruct stage 결과면 "instruct", 원본 행이면 "post")
+    template 컬럼이 행에 없으면 ValueError
+    """
+    if template is None:
+        for name in ("instruct", "post"):
+            if all(field in row for field in template_fields(TEMPLATES[name])):
+                return TEMPLATES[name]
+        raise ValueError(f"행 컬럼({', '.join(row)})에 맞는 template이 없습니다. template을 직접 지정하세요.")
+    template = TEMPLATES.get(template, template)
+    missing = [field for field in template_fields(template) if field not in row]
+    if missing:
+        raise ValueError(f"template 컬럼 {missing}이 행에 없습니다 (행 컬럼: {', '.join(row)})")
+    return template
+
+def write_arrow_dataset(rows: Iterable[Dict], out_dir: str, tokenizer=None, template: Optional[str] = None,
+                        max_length: int = 512, batch_size: int = 1000) -> int:
+    """
+    행을 Hugging Face datasets의 save_to_disk 형식(Arrow) 폴더로 바로 저장
+    - 학습 쪽에서 datasets.load_from_disk(out_dir)로 memory-map해서 JSON 파싱 없이 사용
+    - tokenizer: 이름/경로(AutoTokenizer) 또는 tokenizer 객체. 주면 template으로 만든 문장을
+      truncation + max_length padding으로 토큰화해서 tokenizer 출력 컬럼(input_ids, attention_mask 등) + labels 추가
+    - template: TEMPLATES 키("post", "instruct") 또는 {컬럼명}이 들어간 format 문자열
+      None이면 첫 행 컬럼으로 선택 (instruction/input/output → "instruct", content/emotion/... → "post")
+    - 텍스트 컬럼은 첫 행의 키 순서, batch_size 행씩 RecordBatch로 씀
+    Returns: 저장한 행 개수
+    """
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        raise ValueError("저장할 행이 없습니다.")
+    # template은 토큰화할 때만 사용 → tokenizer가 있을 때만 첫 행으로 컬럼 확인
+    template = resolve_template(template, first) if tokenizer is not None else TEMPLATES.get(template, template)
+    rows = itertools.chain([first], rows)
+    if isinstance(tokenizer, str):
+        from transformers import AutoTokenizer
+        tokenizer = AutoTokenizer.from_pretrained(tokenizer)
+
+    tmp_dir = out_dir.rstrip("/\\") + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    try:
+        total = _write_arrow_files(rows, tmp_dir, tokenizer, template, max_length, batch_size)
+    except BaseException:
+        # 중간에 실패하면 쓰다 만 임시 폴더 삭제 (기존 out_dir은 그대로)
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+    return total
+
+def _write_arrow_files(rows: Iterable[Dict], tmp_dir: str, tokenizer, template: str,
+                       max_length: int, batch_size: int) -> int:
+    import pyarrow as pa
+
+    fingerprint = hashlib.sha256(json.dumps({
+        "tokenizer": getattr(tokenizer, "name_or_path", None), "template": template, "max_length": max_length
+    }).encode("utf-8"))
+
+    columns: List[str] = None
+    features = None
+    writer, sink = None, None
+    total = 0
+
+    def write_batch(batch: List[Dict]):
+        nonlocal columns, features, writer, sink
+        if columns is None:
+            columns = list(batch[0].keys())
+        arrays = {col: pa.array([row.get(col) for row in batch], type=pa.string()) for col in columns}
+        if tokenizer is not None:
+            texts = [template.format(**row) for row in batch]
+            tokenized = tokenizer(texts, truncation=True, padding="max_length", max_length=max_length)
+            for key, values in tokenized.items():
+                arrays[key] = pa.array(values, type=pa.list_(pa.int8() if key in SMALL_INT_COLUMNS else pa.int32()))
+            # labels = input_ids 복사 (all_ft_2.py format_and_tokenize와 동일)
+            arrays["labels"] = arrays["input_ids"]
+        record_batch = pa.RecordBatch.from_pydict(arrays)
+        if writer is None:
+            features = {
+                name: {"dtype": "string", "_type": "Value"} if name in columns
+                else {"feature": {"dtype": str(record_batch.schema.field(name).type.value_type), "_type": "Value"}, "_type": "Sequence"}
+                for name in record_batch.schema.names
+            }
+            # datasets가 features를 읽는 schema metadata
+            schema = record_batch.schema.with_metadata(
+                {"huggingface": json.dumps({"info": {"features": features}})}
+            )
+            sink = pa.OSFile(os.path.join(tmp_dir, ARROW_FILENAME), "wb")
+            writer = pa.ipc.new_stream(sink, schema)
+        writer.write_batch(record_batch)
+        for row in batch:
+            fingerprint.update(json.dumps(row, ensure_ascii=False).encode("utf-8"))
+
+    batch = []
+    try:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                write_batch(batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            write_batch(batch)
+            total += len(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+            sink.close()
+
+    with open(os.path.join(tmp_dir, "dataset_info.json"), "w", encoding="utf-8") as f:
+        json.dump({"citation": "", "description": "", "features": features, "homepage": "", "license": ""}, f, indent=2)
+    with open(os.path.join(tmp_dir, "state.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "_data_files": [{"filename": ARROW_FILENAME}],
+            "_fingerprint": fingerprint.hexdigest()[:16],
+            "_format_columns": None,
+            "_format_kwargs": {},
+            "_format_type": None,
+            "_output_all_columns": False,
+            "_split": None,
+        }, f, indent=2)
+    if tokenizer is not None:
+        # 학습 쪽에서 같은 tokenizer인지 확인하는 용도
+        with open(os.path.join(tmp_dir, TOKENIZATION_NAME), "w", encoding="utf-8") as f:
+            json.dump({"tokenizer": tokenizer.name_or_path, "template": template, "max_length": max_length},
+                      f, ensure_ascii=False, indent=2)
+    return total
+
+def convert_to_arrow(old_path: str, out_dir: str, tokenizer=None, template: Optional[str] = None, max_length: int = 512) -> int:
+    # instruction jsonl 대신 Arrow 데이터셋 폴더로 저장
+    with open(old_path, 'r', encoding='utf-8') as fin:
+        return write_arrow_dataset(
+            to_instruction(json.loads(line) for line in fin), out_dir,
+            tokenizer=tokenizer, template=template, max_length=max_length
+        )
+
+if __name__ == "__main__":
+    root_path = "/Users/seo/Documents/_code/for_AI/my_project/Finetuning/dataset/_dataset/"
 
-# 사용 예시
-convert_to_instruction_format(
-    os.path.join(root_path,"_made/dataset_0629_made.jsonl"),
-    os.path.join(root_path, "_instruct/dataset_0629_instruct.jsonl")
-)
-# /Users/jaeseoksee/Documents/project/for_AI/my_project/Finetuning/dataset/_dataset/_filtered/dataset_0619_filtered.jsonl
\ No newline at end of file
+    # 사용 예시
+    convert_to_instruction_format(
+        os.path.join(root_path,"_made/dataset_0629_made.jsonl"),
+        os.path.join(root_path, "_instruct/dataset_0629_instruct.jsonl")
+    )
+# /Users/jaeseoksee/Documents/project/for_AI/my_project/Finetuning/dataset/_dataset/_filtered/dataset_0619_filtered.jsonl
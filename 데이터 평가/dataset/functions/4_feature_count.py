@@ -1,49 +1,44 @@
 import json
 import argparse
-from collections import Counter, defaultdict
+from typing import List
 
-def count_posttype_emotion_and_content(input_path: str) -> None:
+from feature_stats import DEFAULT_PRECISION, DISTINCT_MODES, count_files, merge_stats, print_stats
+
+def count_posttype_emotion_and_content(input_path, mode: str = "exact", precision: int = DEFAULT_PRECISION,
+                                       max_workers: int = 1, json_path: str = None) -> dict:
     """
     post_type별로 emotion 분포, 총 데이터 개수, content 중복 없는 개수 출력
+    - input_path: 파일/폴더 경로 또는 경로 리스트 (여러 파일이면 파일별 통계를 합쳐서 출력)
+    - mode: 중복 없는 원문 개수 계산 방식 (exact: 64bit hash 집합, hll: HyperLogLog 근사)
+    - json_path: 주면 통계를 JSON으로도 저장 (합친 통계 + 파일별 통계)
     """
-    emotion_order = ["normal", "happy", "sad", "grumpy", "angry", "curious"]
-    type_emotion_counter = defaultdict(lambda: Counter())
-    type_total_counter = Counter()
-    content_set = set()
-    total_count = 0
-
-    with open(input_path, encoding='utf-8') as f:
-        for line in f:
-            if not line.strip():
-                continue
-            data = json.loads(line)
-            total_count += 1
-            post_type = data.get('post_type', 'unknown')
-            emotion = data.get('emotion', 'unknown')
-            content = data.get('content', '').strip()
-            if content:
-                content_set.add(content)
-            type_emotion_counter[post_type][emotion] += 1
-            type_total_counter[post_type] += 1
+    paths: List[str] = [input_path] if isinstance(input_path, str) else list(input_path)
+    per_file = count_files(paths, mode, precision, max_workers)
+    merged = merge_stats(per_file.values(), mode, precision)
 
-    print(f"\n✅ 총 데이터 개수: {total_count}")
-    print(f"✅ 중복 없는 원문 개수: {len(content_set)}")
+    if len(per_file) > 1:
+        print(f"📂 파일 {len(per_file)}개 합산")
+    print_stats(merged)
 
-    for post_type, emotion_counter in type_emotion_counter.items():
-        total = type_total_counter[post_type]
-        print(f"\n--- {post_type} : 총 {total}개 ---")
-        for emotion in emotion_order:
-            if emotion in emotion_counter:
-                print(f"{emotion}: {emotion_counter[emotion]}")
-        for emotion, count in emotion_counter.items():
-            if emotion not in emotion_order:
-                print(f"{emotion}: {count}")
+    report = {**merged.to_json(), "files": {path: stats.to_json() for path, stats in per_file.items()}}
+    if mode == "hll":
+        report["precision"] = precision
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n📝 JSON 저장: {json_path}")
+    return report
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="데이터셋 통계 출력")
-    parser.add_argument('--data', type=str, required=True, help='입력 JSONL 파일 경로')
+    parser.add_argument('--data', type=str, nargs='+', required=True, help='입력 JSONL 파일/폴더 경로 (여러 개 가능)')
+    parser.add_argument('--mode', type=str, default="exact", choices=DISTINCT_MODES,
+                        help='중복 없는 원문 개수 계산 방식 (hll: 메모리 고정 근사)')
+    parser.add_argument('--precision', type=int, default=DEFAULT_PRECISION, help='HyperLogLog register 개수 = 2^precision')
+    parser.add_argument('--max_workers', type=int, default=1, help='파일 단위 병렬 처리 프로세스 수')
+    parser.add_argument('--json', type=str, default=None, help='통계를 저장할 JSON 파일 경로')
     args = parser.parse_args()
 
-    count_posttype_emotion_and_content(args.data)
+    count_posttype_emotion_and_content(args.data, args.mode, args.precision, args.max_workers, args.json)
 
 # python 4.feature_count.py --data my_project/Finetuning/dataset/_dataset/dataset_0615_filtered.jsonl
\ No newline at end of file
@@ -1,11 +1,17 @@
 import json
+from typing import Dict, Iterable, Iterator
 
-input_path = "/Users/jaeseoksee/Documents/project/for_AI/my_project/Finetuning/dataset/_dataset/_made/dataset_0629_made.jsonl"     # 원본 파일명 (네 파일명에 맞게)
-output_path = "/Users/jaeseoksee/Documents/project/for_AI/my_project/Finetuning/dataset/_dataset/_made/dataset_0709_made.json" # 출력 파일명
-
-with open(input_path, "r", encoding="utf-8") as infile, \
-     open(output_path, "w", encoding="utf-8") as outfile:
-    for line in infile:
-        data = json.loads(line)
+def drop_normal(rows: Iterable[Dict]) -> Iterator[Dict]:
+    # emotion이 normal이 아닌 행만 남김
+    for data in rows:
         if data.get("emotion") != "normal":
-            outfile.write(json.dumps(data, ensure_ascii=False) + "\n")
\ No newline at end of file
+            yield data
+
+if __name__ == "__main__":
+    input_path = "/Users/jaeseoksee/Documents/project/for_AI/my_project/Finetuning/dataset/_dataset/_made/dataset_0629_made.jsonl"     # 원본 파일명 (네 파일명에 맞게)
+    output_path = "/Users/jaeseoksee/Documents/project/for_AI/my_project/Finetuning/dataset/_dataset/_made/dataset_0709_made.json" # 출력 파일명
+
+    with open(input_path, "r", encoding="utf-8") as infile, \
+         open(output_path, "w", encoding="utf-8") as outfile:
+        for data in drop_normal(json.loads(line) for line in infile):
+            outfile.write(json.dumps(data, ensure_ascii=False) + "\n")
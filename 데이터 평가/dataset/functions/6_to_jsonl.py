@@ -1,11 +1,16 @@
 import json
+from typing import Dict, Iterator
 
-input_file = "/Users/jaeseoksee/Documents/project/for_AI/my_project/Finetuning/dataset/_dataset/_made/posts_dump_0709.json"    # 원본 JSON 파일명 (배열 형태)
-output_file = "/Users/jaeseoksee/Documents/project/for_AI/my_project/Finetuning/dataset/_dataset/_made/posts_dump_0709.jsonl" # 변환될 JSONL 파일명
+def read_json_array(input_file: str) -> Iterator[Dict]:
+    # JSON 배열 파일(리스트)을 한 행씩 반환 (배열 파일은 한 번에 로드됨)
+    with open(input_file, "r", encoding="utf-8") as f:
+        data = json.load(f)  # 리스트로 로드됨
+    yield from data
 
-with open(input_file, "r", encoding="utf-8") as f:
-    data = json.load(f)  # 리스트로 로드됨
+if __name__ == "__main__":
+    input_file = "/Users/jaeseoksee/Documents/project/for_AI/my_project/Finetuning/dataset/_dataset/_made/posts_dump_0709.json"    # 원본 JSON 파일명 (배열 형태)
+    output_file = "/Users/jaeseoksee/Documents/project/for_AI/my_project/Finetuning/dataset/_dataset/_made/posts_dump_0709.jsonl" # 변환될 JSONL 파일명
 
-with open(output_file, "w", encoding="utf-8") as f:
-    for item in data:
-        f.write(json.dumps(item, ensure_ascii=False) + "\n")
+    with open(output_file, "w", encoding="utf-8") as f:
+        for item in read_json_array(input_file):
+            f.write(json.dumps(item, ensure_ascii=False) + "\n")
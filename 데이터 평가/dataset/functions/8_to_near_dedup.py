@@ -0,0 +1,182 @@
+import json
+import argparse
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+# =========================
+# MinHash + LSH 유사 중복 제거 (pipeline stage "near_dedup")
+# - 2_to_filtered는 (content, emotion, post_type)가 완전히 같은 행만 지움
+#   → 이모지 하나, 조사 하나만 다른 크롤링 캡션/Gemini 출력은 그대로 남음
+# - 텍스트를 문자 k-gram(shingle) 집합으로 보고 Jaccard 유사도가 threshold 이상이면 같은 클러스터
+# - MinHash 서명(num_perm개) → band로 나눠 bucket에 넣고, 같은 bucket에 걸린 대표 행하고만 서명 비교
+#   → 행마다 band 개수만큼만 조회하므로 전체 행 수에 거의 선형
+# - 스트리밍: 먼저 나온 행이 클러스터 대표, 뒤에 나온 유사 행은 버림 (출력 순서 유지)
+# - shingle hash는 문자 code point로 계산 (Python hash()처럼 실행마다 바뀌지 않음 → 캐시 결과와 동일)
+# =========================
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_NUM_PERM = 128
+DEFAULT_SHINGLE_SIZE = 3
+# band 수 고를 때 false negative 가중치 (false positive는 서명 비교로 걸러지므로 놓치는 쪽을 더 무겁게)
+FALSE_NEGATIVE_WEIGHT = 10
+
+def _permutations(num_perm: int, seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    # h(x) = (a * x + b) mod 2^64 의 상위 32bit (a는 홀수)
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+    return a, b
+
+def lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    band 개수 b, band당 행 r (b * r <= num_perm) 중 false positive(유사도 < threshold인데 후보) 확률 적분
+    + FALSE_NEGATIVE_WEIGHT × false negative(유사도 >= threshold인데 후보 아님) 확률 적분이 가장 작은 값
+    """
+    best = None
+    below = np.linspace(0, threshold, 201)
+    above = np.linspace(threshold, 1, 201)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        false_positive = np.mean(1 - (1 - below ** rows) ** bands) * threshold
+        false_negative = np.mean((1 - above ** rows) ** bands) * (1 - threshold)
+        error = false_positive + FALSE_NEGATIVE_WEIGHT * false_negative
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.split())
+
+def shingle_hashes(text: str, shingle_size: int = DEFAULT_SHINGLE_SIZE) -> np.ndarray:
+    """
+    문자 k-gram hash (uint64, 중복 제거). shingle_size보다 짧은 텍스트는 텍스트 전체가 shingle 하나
+    """
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    k = min(shingle_size, len(codes))
+    if k == 0:
+        return np.empty(0, dtype=np.uint64)
+    hashes = np.zeros(len(codes) - k + 1, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for i in range(k):
+            hashes = hashes * np.uint64(0x100000001B3) + codes[i:len(codes) - k + 1 + i]
+        # splitmix64 마무리 섞기 (code point 차이가 작아도 bit가 고르게 퍼지도록)
+        hashes ^= hashes >> np.uint64(30)
+        hashes *= np.uint64(0xBF58476D1CE4E5B9)
+        hashes ^= hashes >> np.uint64(27)
+    return np.unique(hashes)
+
+class MinHashLSH:
+    """
+    대표 행의 MinHash 서명을 band bucket에 등록하고, 새 행과 Jaccard 추정치가 threshold 이상인 대표를 찾음
+    """
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD, num_perm: int = DEFAULT_NUM_PERM,
+                 shingle_size: int = DEFAULT_SHINGLE_SIZE, seed: int = 1):
+        if not 0 < threshold <= 1:
+            raise ValueError(f"threshold는 0보다 크고 1 이하여야 합니다: {threshold}")
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.a, self.b = _permutations(num_perm, seed)
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        self.buckets = defaultdict(list)
+        self.signatures: List[np.ndarray] = []
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = shingle_hashes(normalize_text(text), self.shingle_size)
+        if not len(hashes):
+            return np.zeros(len(self.a), dtype=np.uint32)
+        with np.errstate(over="ignore"):
+            values = hashes[:, None] * self.a + self.b
+        return (values.min(axis=0) >> np.uint64(32)).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray, group) -> Iterator[tuple]:
+        for band in range(self.bands):
+            yield group, band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def query(self, signature: np.ndarray, group=None) -> int:
+        """
+        Returns: 유사한 대표 번호 (가장 먼저 등록된 것), 없으면 -1
+        """
+        candidates = set()
+        for key in self._band_keys(signature, group):
+            candidates.update(self.buckets.get(key, ()))
+        for rep in sorted(candidates):
+            if np.count_nonzero(self.signatures[rep] == signature) >= self.threshold * len(signature):
+                return rep
+        return -1
+
+    def insert(self, signature: np.ndarray, group=None) -> int:
+        rep = len(self.signatures)
+        self.signatures.append(signature)
+        for key in self._band_keys(signature, group):
+            self.buckets[key].append(rep)
+        return rep
+
+def _text(data: Dict, fields: Sequence[str]) -> str:
+    return " ".join(str(data.get(field) or "").strip() for field in fields)
+
+def print_clusters(cluster_sizes: List[int], representatives: List[str], top: int = 5) -> None:
+    """
+    클러스터 크기 분포 + 가장 큰 클러스터 대표 텍스트 출력
+    """
+    removed = sum(cluster_sizes) - len(cluster_sizes)
+    duplicated = [i for i, size in enumerate(cluster_sizes) if size > 1]
+    print(f"🔁 near_dedup: 입력 {sum(cluster_sizes)}개 → {len(cluster_sizes)}개 (유사 중복 {removed}개 삭제, 클러스터 {len(duplicated)}개)")
+    if not duplicated:
+        return
+    histogram = Counter(cluster_sizes[i] for i in duplicated)
+    print("   클러스터 크기: " + ", ".join(f"{size}개×{histogram[size]}" for size in sorted(histogram)))
+    for i in sorted(duplicated, key=lambda i: -cluster_sizes[i])[:top]:
+        print(f"   [{cluster_sizes[i]}] {representatives[i][:60]}")
+
+def near_dedup_rows(rows: Iterable[Dict], threshold: float = DEFAULT_THRESHOLD, fields: Sequence[str] = ("content",),
+                    group_by: Sequence[str] = ("emotion", "post_type"), shingle_size: int = DEFAULT_SHINGLE_SIZE,
+                    num_perm: int = DEFAULT_NUM_PERM, seed: int = 1, verbose: bool = True) -> Iterator[Dict]:
+    """
+    유사 중복 행 제거 (클러스터마다 처음 나온 행 하나만 남김)
+    - fields: 비교할 텍스트 컬럼 (공백으로 이어 붙임)
+    - group_by: 값이 같은 행끼리만 비교 (기본: 같은 원문을 감정/동물별로 변환한 행은 남김)
+    - 비교할 텍스트가 비어 있는 행은 index에 넣지도, 조회하지도 않고 그대로 남김
+    - verbose: 끝나면 클러스터 크기 분포 출력
+    """
+    lsh = MinHashLSH(threshold, num_perm, shingle_size, seed)
+    cluster_sizes, representatives = [], []
+    rep_clusters = []  # 대표 번호(lsh) → 클러스터 번호 (빈 텍스트 행은 대표로 등록되지 않음)
+    for data in rows:
+        text = _text(data, fields)
+        if not normalize_text(text):
+            # 빈 텍스트는 shingle이 없어 서명이 전부 0 → 서로 다른 빈 원문 행이 한 클러스터로 묶이지 않도록
+            cluster_sizes.append(1)
+            representatives.append(text)
+            yield data
+            continue
+        group = tuple(data.get(field) for field in group_by)
+        signature = lsh.signature(text)
+        rep = lsh.query(signature, group)
+        if rep >= 0:
+            cluster_sizes[rep_clusters[rep]] += 1
+            continue
+        lsh.insert(signature, group)
+        rep_clusters.append(len(cluster_sizes))
+        cluster_sizes.append(1)
+        representatives.append(text)
+        yield data
+    if verbose:
+        print_clusters(cluster_sizes, representatives)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MinHash-LSH 유사 중복 제거")
+    parser.add_argument("--input", type=str, required=True, help="입력 JSONL 파일 경로")
+    parser.add_argument("--output", type=str, required=True, help="출력 JSONL 파일 경로")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="같은 클러스터로 볼 Jaccard 유사도")
+    parser.add_argument("--fields", type=str, nargs="+", default=["content"], help="비교할 텍스트 컬럼")
+    parser.add_argument("--shingle_size", type=int, default=DEFAULT_SHINGLE_SIZE, help="문자 k-gram 길이")
+    parser.add_argument("--num_perm", type=int, default=DEFAULT_NUM_PERM, help="MinHash 서명 길이")
+    args = parser.parse_args()
+
+    with open(args.input, "r", encoding="utf-8") as infile, open(args.output, "w", encoding="utf-8") as outfile:
+        rows = (json.loads(line) for line in infile if line.strip())
+        for data in near_dedup_rows(rows, args.threshold, args.fields, shingle_size=args.shingle_size, num_perm=args.num_perm):
+            outfile.write(json.dumps(data, ensure_ascii=False) + "\n")
+
+# python 8_to_near_dedup.py --input ../_dataset/_filtered/dataset_0629_filtered.jsonl --output ../_dataset/_filtered/dataset_0629_near_dedup.jsonl --threshold 0.8
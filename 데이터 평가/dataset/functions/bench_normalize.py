@@ -0,0 +1,196 @@
+import gc
+import os
+import re
+import json
+import time
+import argparse
+from collections import Counter
+from typing import List
+
+import text_normalize
+from pipeline import load_script
+
+# =========================
+# text_normalize 공용 모듈 vs 기존 구현 비교
+# - 기존 구현(함수 안에서 매번 정규식 compile)을 그대로 복사해 두고 같은 텍스트에 돌려서
+#   결과가 한 글자도 다르지 않은지 확인 + 행당 처리 시간(µs) 비교
+# - 입력: _dataset 아래 jsonl 파일들의 content / transformed_content
+# - postprocess_spam: 데이터셋 텍스트 40개를 3번 반복해 이어 붙인 긴 글(크롤링한 SNS 홍보글처럼 반복 단어가 많은 경우)
+# - DataFilter: 행마다 should_remove/should_modify 호출 vs decide(특징 한 번 추출 + 배열 연산) 판별 비교
+# =========================
+DATASET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "_dataset")
+
+# --- 기존 구현 (model_eval/functions/data_cleansing.py) ---
+def legacy_clean_text(text):
+    text = re.sub(r"(\\r\\n|\\n|\\r|rn)", " ", text)
+    text = re.sub(r"https?://\S+|www\.\S+", "", text)
+    text = re.compile(rf'[^{text_normalize.ALLOWED_CHARS}]').sub("", text)
+    text = re.sub(r'(\S{1,5})\1{3,}', r'\1\1', text)
+    emoji_pattern = re.compile(text_normalize.EMOJI_CLASS, flags=re.UNICODE)
+    text = re.sub(r'((?:' + emoji_pattern.pattern + r')){4,}', lambda m: m.group(0)[:3], text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text
+
+# --- 기존 구현 (7_to_simple_filtered_.py preprocess) ---
+def legacy_simple_preprocess(text):
+    if not isinstance(text, str):
+        return text
+    text = re.sub(r'[\r\n\t]', ' ', text)
+    text = re.sub(r'\s+', ' ', text)
+
+    def fix_url(m):
+        url = m.group(1)
+        url_clean = re.sub(r'\s+', '', url)
+        return f'[{url_clean}]'
+    url_broken_pattern = re.compile(
+        r'(https?://[A-Za-z0-9\-\._~:/\?#\[\]@!\$&\'\(\)\*\+,;=%]+)'
+    )
+    text = url_broken_pattern.sub(fix_url, text)
+    text = re.sub(r'\s+([?.!])', r'\1', text)
+    text = re.sub(r'(\.)([가-힣])', r'\1 \2', text)
+    text = re.sub(r'^[\s.,?!·~…]+|[\s.,?!·~…]+$', '', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text
+
+# --- 기존 구현 (2_to_filtered.py TextPostprocessor.process) ---
+def legacy_postprocess(text, original_content=""):
+    emoji_pattern = text_normalize.EMOJI_CLASS
+    text = re.sub(r'[\u2000-\u200B\u2800\u3000]', ' ', text)
+    text = re.sub(r'#\S+', '', text)
+    text = re.sub(r'(\r\n|\r|\n)', '', text)
+    text = re.sub(r'(\\r\\n|\\r|\\n)', '', text)
+    text = re.sub(r"[️‹›／]", '', text)
+    emojis = re.findall(emoji_pattern, text)
+    if len(emojis) > 2:
+        keep = emojis[:2]
+        text = re.sub(emoji_pattern, '', text) + ''.join(keep)
+    words = re.findall(r'\b\w+\b', text)
+    counts = Counter(words)
+    for word, count in counts.items():
+        if count > 2:
+            text = re.sub(rf'\b({re.escape(word)})\b', '', text, count=count - 2)
+    text = re.sub(r'\.\.+', lambda m: m.group(0), text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    if len(text) < 5 or re.fullmatch(r'[\W\d\s]+', text):
+        return "[출력 오류] 결과 생성이 실패했어요."
+    if original_content:
+        max_len = 200
+        if len(text) > max_len:
+            words = text.split()
+            trimmed_text = ""
+            for word in words:
+                if len(trimmed_text) + len(word) + 1 > max_len:
+                    break
+                trimmed_text += word + " "
+            text = trimmed_text.strip()
+    return text
+
+def load_rows(dataset_dir: str = DATASET_DIR) -> List[dict]:
+    rows = []
+    for root, _, files in os.walk(dataset_dir):
+        for name in sorted(files):
+            if not name.endswith(".jsonl"):
+                continue
+            with open(os.path.join(root, name), "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        row = json.loads(line)
+                    except Exception:
+                        continue
+                    if isinstance(row, dict):
+                        rows.append(row)
+    return rows
+
+def load_texts(dataset_dir: str = DATASET_DIR, limit: int = None) -> List[str]:
+    texts = [
+        row[key] for row in load_rows(dataset_dir)
+        for key in ("content", "transformed_content") if isinstance(row.get(key), str)
+    ]
+    return texts[:limit] if limit else texts
+
+def spam_texts(texts: List[str], size: int = 40, repeat: int = 3, limit: int = 500) -> List[str]:
+    return [" ".join(texts[i:i + size] * repeat) for i in range(0, min(len(texts), size * limit), size)]
+
+def _per_row_us(func, texts) -> float:
+    # timeit처럼 측정 중에는 GC를 멈춤
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        func(texts)
+        return (time.perf_counter() - start) / max(len(texts), 1) * 1e6
+    finally:
+        gc.enable()
+
+def run_bench(texts: List[str]) -> List[dict]:
+    spam = spam_texts(texts)
+    # (이름, 기존 구현 batch, 새 구현 batch, 입력)
+    cases = [
+        ("clean_text", lambda ts: [legacy_clean_text(t) for t in ts], text_normalize.clean_texts, texts),
+        ("simple_preprocess", lambda ts: [legacy_simple_preprocess(t) for t in ts],
+         text_normalize.simple_preprocess_texts, texts),
+        ("postprocess", lambda ts: [legacy_postprocess(t, t) for t in ts],
+         lambda ts: text_normalize.postprocess_texts(ts, ts), texts),
+        ("postprocess_spam", lambda ts: [legacy_postprocess(t) for t in ts], text_normalize.postprocess_texts, spam),
+    ]
+    results = []
+    for name, legacy, new, inputs in cases:
+        expected, actual = legacy(inputs), new(inputs)
+        mismatches = sum(1 for a, b in zip(expected, actual) if a != b)
+        results.append({
+            "name": name,
+            "rows": len(inputs),
+            "mismatches": mismatches,
+            "legacy_us": _per_row_us(legacy, inputs),
+            "new_us": _per_row_us(new, inputs),
+        })
+    return results
+
+def run_filter_bench(rows: List[dict], chunk_size: int = 1024) -> dict:
+    data_filter = load_script("2_to_filtered.py").DataFilter
+    # 문자열이 아닌 필드가 있는 행은 기존 구현에서도 오류라서 제외
+    rows = [
+        row for row in rows
+        if all(isinstance(row[key], str) for key in data_filter.FIELDS if key in row)
+    ]
+
+    def legacy(rs):
+        decisions = []
+        for row in rs:
+            remove = data_filter.should_remove(row)
+            decisions.append((remove, not remove and data_filter.should_modify(row)))
+        return decisions
+
+    def new(rs):
+        decisions = []
+        for start in range(0, len(rs), chunk_size):
+            remove, modify = data_filter.decide(rs[start:start + chunk_size])
+            decisions.extend(zip(remove.tolist(), (modify & ~remove).tolist()))
+        return decisions
+
+    expected, actual = legacy(rows), new(rows)
+    return {
+        "name": "DataFilter",
+        "rows": len(rows),
+        "mismatches": sum(1 for a, b in zip(expected, actual) if a != b),
+        "legacy_us": _per_row_us(legacy, rows),
+        "new_us": _per_row_us(new, rows),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="텍스트 정규화 공용 모듈 결과 비교 및 속도 측정")
+    parser.add_argument("--dataset_dir", type=str, default=DATASET_DIR)
+    parser.add_argument("--limit", type=int, default=None, help="비교할 최대 텍스트 개수")
+    args = parser.parse_args()
+
+    texts = load_texts(args.dataset_dir, args.limit)
+    rows = load_rows(args.dataset_dir)[:args.limit] if args.limit else load_rows(args.dataset_dir)
+    print(f"{'함수':<20}{'행':>10}{'불일치':>8}{'기존(µs/행)':>14}{'공용(µs/행)':>14}{'배속':>8}")
+    failed = False
+    for r in run_bench(texts) + [run_filter_bench(rows)]:
+        speedup = r["legacy_us"] / r["new_us"] if r["new_us"] else float("inf")
+        print(f"{r['name']:<20}{r['rows']:>10,}{r['mismatches']:>8}{r['legacy_us']:>14.2f}{r['new_us']:>14.2f}{speedup:>7.2f}x")
+        failed = failed or r["mismatches"] > 0
+    if failed:
+        raise SystemExit("❌ 기존 구현과 결과가 다른 텍스트가 있습니다.")
+    print("✅ 모든 텍스트에서 기존 구현과 결과 동일")
@@ -0,0 +1,67 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List
+
+import model_eval_path  # noqa: F401  (model_eval/functions import 경로 등록)
+from functions.feature_stats import DISTINCT_MODES  # noqa: F401  (4_feature_count에서 이 모듈 이름으로 import)
+from functions.feature_stats import DEFAULT_PRECISION, FeatureStats, new_distinct, sorted_emotions
+
+# =========================
+# 데이터셋 분포 통계: 파일/프로세스 풀/출력 (4_feature_count.py)
+# - 통계 엔진(FeatureStats, ExactDistinct, HyperLogLog)은 model_eval/functions/feature_stats.py 한 곳에만 둠
+#   (model_eval의 get_data_distribution과 같은 엔진)
+# - 파일마다 부분 통계(FeatureStats)를 만들고 merge로 합침 → 여러 jsonl 파일을 프로세스 풀에서 병렬 처리
+# =========================
+
+def count_file(path: str, mode: str = "exact", precision: int = DEFAULT_PRECISION) -> FeatureStats:
+    with open(path, encoding='utf-8') as f:
+        return FeatureStats(mode, precision).add_lines(f)
+
+def _count_file_task(task):
+    return count_file(*task)
+
+def expand_paths(paths: Iterable[str]) -> List[str]:
+    """
+    폴더는 아래 .jsonl 파일 전부로 펼침
+    """
+    expanded = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                expanded.extend(os.path.join(root, name) for name in sorted(files) if name.endswith(".jsonl"))
+        else:
+            expanded.append(path)
+    return expanded
+
+def count_files(paths: Iterable[str], mode: str = "exact", precision: int = DEFAULT_PRECISION,
+                max_workers: int = 1) -> Dict[str, FeatureStats]:
+    """
+    파일별 부분 통계 (max_workers 2 이상이면 파일 단위로 프로세스 풀에서 병렬 처리)
+    Returns: {파일 경로: FeatureStats}
+    """
+    paths = expand_paths(paths)
+    new_distinct(mode, precision)  # mode/precision 검사를 작업 시작 전에
+    tasks = [(path, mode, precision) for path in paths]
+    if max_workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(tasks))) as executor:
+            results = list(executor.map(_count_file_task, tasks))
+    else:
+        results = [_count_file_task(task) for task in tasks]
+    return dict(zip(paths, results))
+
+def merge_stats(stats: Iterable[FeatureStats], mode: str = "exact", precision: int = DEFAULT_PRECISION) -> FeatureStats:
+    merged = FeatureStats(mode, precision)
+    for partial in stats:
+        merged.merge(partial)
+    return merged
+
+def print_stats(stats: FeatureStats) -> None:
+    approx = " (HyperLogLog 근사)" if stats.distinct.mode == "hll" else ""
+    print(f"\n✅ 총 데이터 개수: {stats.total_count}")
+    print(f"✅ 중복 없는 원문 개수: {stats.unique_content_count()}{approx}")
+
+    type_total_counter = stats.type_total_counter
+    for post_type, emotion_counter in stats.type_emotion_counter.items():
+        print(f"\n--- {post_type} : 총 {type_total_counter[post_type]}개 ---")
+        for emotion, count in sorted_emotions(emotion_counter):
+            print(f"{emotion}: {count}")
@@ -0,0 +1,14 @@
+import os
+import sys
+
+# =========================
+# model_eval/functions 모듈을 dataset 스크립트에서 `from functions.xxx import ...`로 쓰기 위한 경로 등록
+# - 통계 엔진(feature_stats), clean_text 규칙(data_cleansing)은 model_eval/functions에 한 벌만 둠
+#   (model_eval docker 이미지는 model_eval/만 복사하므로 model_eval → dataset 방향 import는 불가)
+# - 맨 뒤에 추가해서 dataset/functions 모듈 이름을 가리지 않음
+# =========================
+MODEL_EVAL_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "model_eval"))
+MODEL_EVAL_FUNCTIONS_DIR = os.path.join(MODEL_EVAL_DIR, "functions")
+
+if MODEL_EVAL_DIR not in sys.path:
+    sys.path.append(MODEL_EVAL_DIR)
@@ -0,0 +1,263 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import importlib.util
+from contextlib import ExitStack
+from typing import Dict, Iterable, Iterator, List
+from pipeline_cache import DEFAULT_CACHE_DIR, StageCache, print_entries
+
+# =========================
+# 데이터셋 변환 스크립트(1_to_post, 2_to_filtered, 3_to_instruct, 5_to_notnormal, 7_to_simple_filtered_, 8_to_near_dedup)를
+# generator stage로 이어서 한 번에 스트리밍 처리
+# - 설정 파일(json)에 입력/stage 순서/출력 지정, 중간 파일은 stage에 "save"를 준 경우에만 저장
+# - stage별 입력/출력 행 개수와 처리 시간(앞 stage 시간 제외) 출력
+# - stage 결과는 pipeline_cache에 저장해 두고, 입력/인자/코드가 같은 앞쪽 stage는 다시 계산하지 않음
+# =========================
+FUNCTIONS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# stage 이름 → (스크립트 파일, 함수). 함수는 행 iterator를 받아 행 iterator를 반환
+STAGES = {
+    "to_post": ("1_to_post.py", "to_post"),
+    "filter": ("2_to_filtered.py", "filter_rows"),
+    "instruct": ("3_to_instruct.py", "to_instruction"),
+    "not_normal": ("5_to_notnormal.py", "drop_normal"),
+    "simple_preprocess": ("7_to_simple_filtered_.py", "preprocess_rows"),
+    "near_dedup": ("8_to_near_dedup.py", "near_dedup_rows"),
+}
+
+_modules = {}
+
+def load_script(filename: str):
+    # 숫자로 시작하는 스크립트는 import 문으로 불러올 수 없어서 파일 경로로 로딩
+    if filename not in _modules:
+        name = os.path.splitext(filename)[0]
+        spec = importlib.util.spec_from_file_location(name, os.path.join(FUNCTIONS_DIR, filename))
+        module = importlib.util.module_from_spec(spec)
+        # 프로세스 풀(2_to_filtered max_workers)에서 함수를 pickle할 수 있도록 모듈 등록
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+        _modules[filename] = module
+    return _modules[filename]
+
+def stage_file(name: str) -> str:
+    if name not in STAGES:
+        raise ValueError(f"알 수 없는 stage: {name} (사용 가능: {', '.join(STAGES)})")
+    return STAGES[name][0]
+
+def get_stage(name: str):
+    return getattr(load_script(stage_file(name)), STAGES[name][1])
+
+def read_jsonl(path: str) -> Iterator[Dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except Exception:
+                continue
+
+def read_source(source: Dict) -> Iterator[Dict]:
+    """
+    - format "jsonl": 한 줄씩 읽기 (기본)
+    - format "json": JSON 배열 파일 (6_to_jsonl.read_json_array)
+    """
+    if source.get("format", "jsonl") == "json":
+        return load_script("6_to_jsonl.py").read_json_array(source["path"])
+    return read_jsonl(source["path"])
+
+def _source_hash(cache: StageCache, source: Dict) -> str:
+    if source.get("format", "jsonl") == "json":
+        return cache.source_hash(source["path"], "json", reader="6_to_jsonl.py")
+    return cache.source_hash(source["path"])
+
+class StageStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.rows = 0
+        self.seconds = 0.0  # 이 stage의 next() 호출에 걸린 시간 (앞 stage 시간 포함)
+
+def _timed(rows: Iterable[Dict], stats: StageStats, sinks=()) -> Iterator[Dict]:
+    # sinks: 행마다 json 한 줄을 write할 대상 (stage "save" 파일, 캐시 결과 파일)
+    iterator = iter(rows)
+    while True:
+        start = time.perf_counter()
+        try:
+            row = next(iterator)
+        except StopIteration:
+            stats.seconds += time.perf_counter() - start
+            return
+        if sinks:
+            line = json.dumps(row, ensure_ascii=False) + "\n"
+            for sink in sinks:
+                sink.write(line)
+        stats.seconds += time.perf_counter() - start
+        stats.rows += 1
+        yield row
+
+def _resolve(path: str, base_dir: str) -> str:
+    return path if os.path.isabs(path) else os.path.join(base_dir, path)
+
+def run_pipeline(config: Dict, base_dir: str = ".", use_cache: bool = None, cache_dir: str = None) -> List[Dict]:
+    """
+    config 예시:
+    {
+        "input": {"path": "_dataset/_made/dataset_0629_made.jsonl", "format": "jsonl"},
+        "stages": [
+            {"name": "simple_preprocess"},
+            {"name": "filter", "args": {"remove_duplicates": true}, "save": "_dataset/_filtered/dataset_0629_filtered.jsonl"},
+            {"name": "near_dedup", "args": {"threshold": 0.8}},
+            {"name": "instruct"}
+        ],
+        "output": "_dataset/_instruct/dataset_0629_instruct.jsonl",
+        "cache": true
+    }
+    - output을 {"path": 폴더, "format": "arrow", "tokenizer": 이름/경로, "template": "instruct", "max_length": 512}로 주면
+      jsonl 대신 Arrow 데이터셋 폴더로 저장 (3_to_instruct.write_arrow_dataset, tokenizer 생략 시 토큰화 없이 텍스트만)
+    - use_cache / cache_dir: None이면 config의 "cache"(기본 True) / "cache_dir"(기본 DEFAULT_CACHE_DIR) 사용
+    Returns: stage별 {"stage", "rows_in", "rows_out", "seconds", "cached"} 리스트 (첫 항목은 입력 읽기)
+    """
+    source = dict(config["input"], path=_resolve(config["input"]["path"], base_dir))
+    stages = config.get("stages", [])
+    use_cache = config.get("cache", True) if use_cache is None else use_cache
+    cache = None
+    if use_cache:
+        cache = StageCache(cache_dir or _resolve(config.get("cache_dir", DEFAULT_CACHE_DIR), base_dir))
+
+    # 앞에서부터 캐시에 있는 stage 찾기 (입력 hash → stage key → 결과 hash → 다음 stage key ...)
+    hits = []
+    input_hash = _source_hash(cache, source) if cache else None
+    if cache:
+        for stage in stages:
+            key = cache.stage_key(stage["name"], stage_file(stage["name"]), stage.get("args", {}), input_hash)
+            entry = cache.lookup(key)
+            if entry is None:
+                break
+            hits.append(entry)
+            input_hash = entry["output_hash"]
+
+    with ExitStack() as stack:
+        def output_path(path):
+            path = _resolve(path, base_dir)
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            return path
+
+        def open_output(path):
+            return stack.enter_context(open(output_path(path), "w", encoding="utf-8"))
+
+        head = StageStats("input")
+        if hits:
+            # 캐시된 마지막 stage 결과부터 읽음 ("save" 파일은 캐시 결과 복사)
+            rows = _timed(read_jsonl(cache.object_path(hits[-1]["output_hash"])), head)
+            for stage, entry in zip(stages, hits):
+                if stage.get("save"):
+                    shutil.copyfile(cache.object_path(entry["output_hash"]), output_path(stage["save"]))
+        else:
+            rows = _timed(read_source(source), head)
+
+        all_stats, writers = [], []
+        for stage in stages[len(hits):]:
+            stats = StageStats(stage["name"])
+            sinks = [open_output(stage["save"])] if stage.get("save") else []
+            if cache:
+                writer = stack.enter_context(cache.writer())
+                sinks.append(writer)
+                writers.append(writer)
+            rows = _timed(get_stage(stage["name"])(rows, **stage.get("args", {})), stats, sinks)
+            all_stats.append(stats)
+
+        output = config.get("output")
+        output = {"path": output} if isinstance(output, str) else output
+        start = time.perf_counter()
+        if output and output.get("format") == "arrow":
+            load_script("3_to_instruct.py").write_arrow_dataset(
+                rows, output_path(output["path"]), tokenizer=output.get("tokenizer"),
+                template=output.get("template"), max_length=output.get("max_length", 512)
+            )
+        else:
+            output_file = open_output(output["path"]) if output else None
+            for row in rows:
+                if output_file is not None:
+                    output_file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        write_seconds = time.perf_counter() - start - (all_stats[-1].seconds if all_stats else head.seconds)
+
+        if cache:
+            # 새로 계산한 stage 결과 등록 (다음 stage key는 이 결과 hash로 만듦)
+            rows_in = head.rows
+            for stage, stats, writer in zip(stages[len(hits):], all_stats, writers):
+                output_hash = writer.commit()
+                args = stage.get("args", {})
+                key = cache.stage_key(stage["name"], stage_file(stage["name"]), args, input_hash)
+                cache.put(key, stage["name"], args, input_hash, output_hash, rows_in, stats.rows, writer.bytes)
+                input_hash, rows_in = output_hash, stats.rows
+            cache.save()
+
+    report = []
+    if hits:
+        # 캐시 결과 파일 읽기 시간은 마지막 캐시 stage 시간으로 표시
+        report.append({"stage": "input", "rows_in": None, "rows_out": hits[0]["rows_in"], "seconds": 0.0, "cached": True})
+        for i, (stage, entry) in enumerate(zip(stages, hits)):
+            report.append({
+                "stage": stage["name"],
+                "rows_in": entry["rows_in"],
+                "rows_out": entry["rows_out"],
+                "seconds": head.seconds if i == len(hits) - 1 else 0.0,
+                "cached": True,
+            })
+    else:
+        report.append({"stage": "input", "rows_in": None, "rows_out": head.rows, "seconds": head.seconds, "cached": False})
+    prev_rows, prev_seconds = head.rows, head.seconds
+    for stats in all_stats:
+        report.append({
+            "stage": stats.name,
+            "rows_in": prev_rows,
+            "rows_out": stats.rows,
+            "seconds": stats.seconds - prev_seconds,
+            "cached": False,
+        })
+        prev_rows, prev_seconds = stats.rows, stats.seconds
+    report.append({"stage": "output", "rows_in": prev_rows, "rows_out": prev_rows, "seconds": max(write_seconds, 0.0), "cached": False})
+    return report
+
+def print_report(report: List[Dict]) -> None:
+    print(f"{'stage':<20}{'입력':>10}{'출력':>10}{'시간(초)':>12}")
+    for item in report:
+        rows_in = "-" if item["rows_in"] is None else f"{item['rows_in']:,}"
+        cached = "  (캐시)" if item.get("cached") else ""
+        print(f"{item['stage']:<20}{rows_in:>10}{item['rows_out']:>10,}{item['seconds']:>12.3f}{cached}")
+    print(f"✅ 총 처리 시간: {sum(item['seconds'] for item in report):.3f}초")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="데이터셋 변환 stage를 설정 파일대로 한 번에 실행")
+    parser.add_argument("-c", "--config", type=str, help="파이프라인 설정 json 경로")
+    parser.add_argument("--no_cache", action="store_true", help="stage 결과 캐시를 쓰지 않고 전부 다시 계산")
+    parser.add_argument("--cache_dir", type=str, default=None, help=f"캐시 폴더 (기본: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--cache_list", action="store_true", help="캐시 항목 목록 출력")
+    parser.add_argument("--cache_gc", action="store_true", help="캐시 정리 (--max_age_days, --max_mb 기준)")
+    parser.add_argument("--max_age_days", type=float, default=None, help="마지막 사용 후 이 기간이 지난 항목 삭제")
+    parser.add_argument("--max_mb", type=float, default=None, help="결과 파일 총 크기 상한 (넘으면 오래 안 쓴 항목부터 삭제)")
+    args = parser.parse_args()
+    if not (args.config or args.cache_list or args.cache_gc):
+        parser.error("-c, --cache_list, --cache_gc 중 하나는 필요합니다.")
+
+    if args.config:
+        with open(args.config, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        # 설정 파일의 상대 경로는 설정 파일 위치 기준
+        print_report(run_pipeline(
+            config, base_dir=os.path.dirname(os.path.abspath(args.config)),
+            use_cache=False if args.no_cache else None, cache_dir=args.cache_dir
+        ))
+    if args.cache_gc:
+        max_bytes = None if args.max_mb is None else int(args.max_mb * 1e6)
+        removed = StageCache(args.cache_dir or DEFAULT_CACHE_DIR).gc(args.max_age_days, max_bytes)
+        print(f"✅ 캐시 정리: 항목 {removed['entries']}개, 파일 {removed['objects']}개 삭제 ({removed['bytes'] / 1e6:.2f}MB)")
+    if args.cache_list:
+        print_entries(StageCache(args.cache_dir or DEFAULT_CACHE_DIR).entries())
+
+# python functions/pipeline.py -c functions/pipeline_example.json
+# python functions/pipeline.py --cache_list
+# python functions/pipeline.py --cache_gc --max_age_days 30
@@ -0,0 +1,228 @@
+import os
+import ast
+import json
+import time
+import uuid
+import hashlib
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from model_eval_path import MODEL_EVAL_FUNCTIONS_DIR
+
+# =========================
+# 파이프라인 stage 결과 캐시 (pipeline.py)
+# - stage 결과(jsonl)는 내용 hash(sha256) 이름으로 objects/ 아래 저장
+# - stage key = hash(입력 내용 hash, stage 이름, 인자, stage 코드 버전) → index.json에서 결과 hash 조회
+#   입력 내용 hash는 첫 stage는 입력 파일 hash, 그다음부터는 앞 stage 결과 hash
+#   → 규칙 하나를 고치면 앞쪽 stage는 캐시 결과를 읽고, 고친 stage부터 뒤 stage만 다시 계산
+# - stage 코드 버전: 스크립트와 스크립트가 import하는 functions/ 안 모듈(text_normalize 등)의 소스 hash
+#   (text_normalize가 import하는 model_eval/functions/data_cleansing.py 포함)
+# =========================
+FUNCTIONS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_DIR = os.path.join(FUNCTIONS_DIR, "..", "_dataset", "_cache", "pipeline")
+INDEX_NAME = "index.json"
+OBJECTS_DIR = "objects"
+# 결과에 영향을 주지 않는 실행 옵션은 key에서 제외
+EXECUTION_ARGS = {"max_workers", "chunk_size"}
+
+def _sha256_json(obj) -> str:
+    return hashlib.sha256(json.dumps(obj, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _local_imports(path: str) -> List[str]:
+    # 스크립트가 import하는 모듈 중 functions/ 안에 파일이 있는 것
+    # + model_eval/functions 모듈(`from functions.data_cleansing import ...`, model_eval_path로 경로 등록)
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module)
+    paths = set()
+    for name in names:
+        parts = name.split(".")
+        if len(parts) == 2 and parts[0] == "functions":
+            paths.add(os.path.join(MODEL_EVAL_FUNCTIONS_DIR, parts[1] + ".py"))
+        else:
+            paths.add(os.path.join(FUNCTIONS_DIR, parts[0] + ".py"))
+    return sorted(path for path in paths if os.path.exists(path))
+
+@lru_cache(maxsize=None)
+def code_version(filename: str) -> str:
+    """
+    스크립트 + 스크립트가 (재귀적으로) import하는 functions/, model_eval/functions/ 안 모듈들의 소스 hash
+    """
+    h = hashlib.sha256()
+    pending, done = [os.path.join(FUNCTIONS_DIR, filename)], set()
+    while pending:
+        path = pending.pop()
+        if path in done:
+            continue
+        done.add(path)
+        h.update(os.path.relpath(path, FUNCTIONS_DIR).encode("utf-8"))
+        h.update(file_hash(path).encode("utf-8"))
+        pending.extend(_local_imports(path))
+    return h.hexdigest()
+
+class _ObjectWriter:
+    """
+    stage 결과를 임시 파일에 쓰면서 sha256 계산, commit() 때 objects/{hash}.jsonl로 이동
+    """
+    def __init__(self, objects_dir: str):
+        self.objects_dir = objects_dir
+        self.tmp_path = os.path.join(objects_dir, f".tmp-{uuid.uuid4().hex}.jsonl")
+        self.file = open(self.tmp_path, "wb")
+        self.hash = hashlib.sha256()
+        self.bytes = 0
+        self.committed = False
+
+    def write(self, line: str):
+        data = line.encode("utf-8")
+        self.file.write(data)
+        self.hash.update(data)
+        self.bytes += len(data)
+
+    def commit(self) -> str:
+        self.file.close()
+        digest = self.hash.hexdigest()
+        os.replace(self.tmp_path, os.path.join(self.objects_dir, f"{digest}.jsonl"))
+        self.committed = True
+        return digest
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        # commit하지 못한 결과(중간에 오류)는 버림
+        if not self.committed:
+            self.file.close()
+            if os.path.exists(self.tmp_path):
+                os.remove(self.tmp_path)
+        return False
+
+class StageCache:
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, OBJECTS_DIR)
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self.index_path = os.path.join(cache_dir, INDEX_NAME)
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+
+    def save(self):
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.index_path)
+
+    def object_path(self, output_hash: str) -> str:
+        return os.path.join(self.objects_dir, f"{output_hash}.jsonl")
+
+    @staticmethod
+    def source_hash(path: str, fmt: str = "jsonl", reader: Optional[str] = None) -> str:
+        # 입력 파일 내용 + 형식 (+ JSON 배열을 읽는 스크립트 코드 버전)
+        return _sha256_json({"file": file_hash(path), "format": fmt, "reader": reader and code_version(reader)})
+
+    @staticmethod
+    def stage_key(name: str, filename: str, args: Dict, input_hash: str) -> str:
+        args = {k: v for k, v in args.items() if k not in EXECUTION_ARGS}
+        return _sha256_json({"stage": name, "args": args, "code": code_version(filename), "input": input_hash})
+
+    def lookup(self, key: str) -> Optional[Dict]:
+        entry = self.index.get(key)
+        if entry is None or not os.path.exists(self.object_path(entry["output_hash"])):
+            return None
+        entry["last_used"] = time.time()
+        return entry
+
+    def writer(self) -> _ObjectWriter:
+        return _ObjectWriter(self.objects_dir)
+
+    def put(self, key: str, name: str, args: Dict, input_hash: str, output_hash: str,
+            rows_in: int, rows_out: int, size: int) -> Dict:
+        now = time.time()
+        entry = {
+            "stage": name,
+            "args": args,
+            "input_hash": input_hash,
+            "output_hash": output_hash,
+            "rows_in": rows_in,
+            "rows_out": rows_out,
+            "bytes": size,
+            "created": now,
+            "last_used": now,
+        }
+        self.index[key] = entry
+        return entry
+
+    def entries(self) -> List[Dict]:
+        """
+        캐시 항목 목록 (최근 사용 순)
+        """
+        return sorted(
+            ({"key": key, **entry} for key, entry in self.index.items()),
+            key=lambda entry: entry["last_used"], reverse=True
+        )
+
+    def gc(self, max_age_days: Optional[float] = None, max_bytes: Optional[int] = None) -> Dict:
+        """
+        - max_age_days: 마지막 사용 후 지난 항목 삭제
+        - max_bytes: 결과 파일 총 크기가 넘으면 오래 안 쓴 항목부터 삭제
+        - 결과 파일이 없는 항목, 어떤 항목도 가리키지 않는 결과 파일, 하루 넘게 남은 임시 파일 삭제
+          (하루 안 된 임시 파일은 실행 중인 파이프라인이 쓰는 중일 수 있어서 남김)
+        Returns: {"entries": 삭제한 항목 수, "objects": 삭제한 파일 수, "bytes": 확보한 용량}
+        """
+        before = len(self.index)
+        keep = {
+            key: entry for key, entry in self.index.items()
+            if os.path.exists(self.object_path(entry["output_hash"]))
+        }
+        if max_age_days is not None:
+            cutoff = time.time() - max_age_days * 86400
+            keep = {key: entry for key, entry in keep.items() if entry["last_used"] >= cutoff}
+        if max_bytes is not None:
+            total, kept = 0, {}
+            for key, entry in sorted(keep.items(), key=lambda item: item[1]["last_used"], reverse=True):
+                # 같은 결과 파일을 가리키는 항목은 용량을 한 번만 셈
+                size = 0 if any(e["output_hash"] == entry["output_hash"] for e in kept.values()) else entry["bytes"]
+                if total + size > max_bytes:
+                    continue
+                total += size
+                kept[key] = entry
+            keep = kept
+        self.index = keep
+        self.save()
+
+        referenced = {f"{entry['output_hash']}.jsonl" for entry in keep.values()}
+        removed_objects, freed = 0, 0
+        for fname in os.listdir(self.objects_dir):
+            path = os.path.join(self.objects_dir, fname)
+            if fname.startswith(".tmp-") and time.time() - os.path.getmtime(path) < 86400:
+                continue
+            if fname not in referenced:
+                freed += os.path.getsize(path)
+                os.remove(path)
+                removed_objects += 1
+        return {"entries": before - len(keep), "objects": removed_objects, "bytes": freed}
+
+def print_entries(entries: List[Dict]) -> None:
+    print(f"{'key':<14}{'stage':<20}{'입력':>10}{'출력':>10}{'크기(MB)':>10}  {'마지막 사용':<20}인자")
+    for entry in entries:
+        last_used = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry["last_used"]))
+        print(
+            f"{entry['key'][:12]:<14}{entry['stage']:<20}{entry['rows_in']:>10,}{entry['rows_out']:>10,}"
+            f"{entry['bytes'] / 1e6:>10.2f}  {last_used:<20}{json.dumps(entry['args'], ensure_ascii=False)}"
+        )
+    total = sum(entry["bytes"] for entry in {e["output_hash"]: e for e in entries}.values())
+    print(f"✅ 캐시 항목 {len(entries)}개, 결과 파일 {total / 1e6:.2f}MB")
@@ -0,0 +1,220 @@
+import re
+from functools import lru_cache
+from typing import Iterable, List
+
+import model_eval_path  # noqa: F401  (model_eval/functions import 경로 등록)
+# 이모지/허용 문자 클래스와 clean_text 규칙은 model_eval/functions/data_cleansing.py 한 곳에만 둠
+from functions.data_cleansing import ALLOWED_CHARS, EMOJI_CLASS, EMOJI_RE, WHITESPACE_RE, clean_text  # noqa: F401
+
+# =========================
+# 텍스트 정규화 공용 모듈 (정규식은 모듈 로딩 시 한 번만 compile)
+# - clean_text        : model_eval/functions/data_cleansing.py (패턴과 함수 모두 그쪽에서 import)
+# - simple_preprocess : 7_to_simple_filtered_.py
+# - postprocess       : 2_to_filtered.py TextPostprocessor.process
+# - DataFilter 조건 검사용 패턴, text_features(행 필터링 특징 한 번에 계산)
+# 각 함수는 기존 구현과 같은 결과를 내야 함 (bench_normalize.py로 비교)
+# =========================
+
+# --- clean_text (data_cleansing) ---
+def clean_texts(texts: Iterable[str]) -> List[str]:
+    return [clean_text(text) for text in texts]
+
+# --- simple_preprocess (7_to_simple_filtered_) ---
+CONTROL_WS_RE = re.compile(r'[\r\n\t]')
+# URL: https로 시작, 영어/숫자/특수문자(-._~:/?#[]@!$&'()*+,;=)만 포함, 한글/공백/이모지에서 종료
+URL_BROKEN_RE = re.compile(
+    r'(https?://[A-Za-z0-9\-\._~:/\?#\[\]@!\$&\'\(\)\*\+,;=%]+)'
+)
+SPACE_BEFORE_PUNCT_RE = re.compile(r'\s+([?.!])')
+PERIOD_HANGUL_RE = re.compile(r'(\.)([가-힣])')
+EDGE_PUNCT_RE = re.compile(r'^[\s.,?!·~…]+|[\s.,?!·~…]+$')
+
+def _fix_url(m):
+    # URL 내부 공백만 제거, 마침표 등은 보존
+    url_clean = WHITESPACE_RE.sub('', m.group(1))
+    return f'[{url_clean}]'
+
+def simple_preprocess(text):
+    if not isinstance(text, str):
+        return text
+    # 1. 줄바꿈/탭 → 공백, 연속 공백 정리
+    text = CONTROL_WS_RE.sub(' ', text)
+    text = WHITESPACE_RE.sub(' ', text)
+    # 2. 깨진 URL 감지 및 합치기 (마침표 보존, 공백만 제거)
+    text = URL_BROKEN_RE.sub(_fix_url, text)
+    # 3. 구두점 앞에 붙은 공백 제거
+    text = SPACE_BEFORE_PUNCT_RE.sub(r'\1', text)
+    # 4. 마침표(.) 뒤에 '한글'이 나오면 공백 추가 (영어나 숫자는 영향 X)
+    text = PERIOD_HANGUL_RE.sub(r'\1 \2', text)
+    # 5. 기타 전처리
+    text = EDGE_PUNCT_RE.sub('', text)
+    return WHITESPACE_RE.sub(' ', text).strip()
+
+def simple_preprocess_texts(texts: Iterable[str]) -> List[str]:
+    return [simple_preprocess(text) for text in texts]
+
+# --- postprocess (TextPostprocessor) / DataFilter ---
+SPECIAL_SPACE_RE = re.compile(r'[\u2000-\u200B\u2800\u3000]')
+HASHTAG_RE = re.compile(r'#\S+')
+NEWLINE_RE = re.compile(r'(\r\n|\r|\n)')
+ESCAPED_NEWLINE_ONLY_RE = re.compile(r'(\\r\\n|\\r|\\n)')
+ODD_CHAR_RE = re.compile(r"[️‹›／]")
+WORD_RE = re.compile(r'\b\w+\b')
+MEANINGLESS_RE = re.compile(r'[\W\d\s]+')
+KOR_ENG_RE = re.compile(r'[A-Za-z가-힣]')
+STARTS_WITH_ALPHA_RE = re.compile(r'^[A-Za-z가-힣]')
+OUTPUT_ERROR_MESSAGE = "[출력 오류] 결과 생성이 실패했어요."
+MAX_TRANSFORMED_LEN = 200
+
+@lru_cache(maxsize=None)
+def consecutive_emoji_re(consecutive: int):
+    return re.compile(EMOJI_CLASS + "{" + str(consecutive) + ",}", flags=re.UNICODE)
+
+# 단어(\w+) / 이모지 한 글자를 한 번의 scan으로 나눔 (postprocess 이모지 제한 + 반복 단어 정리)
+WORD_EMOJI_SCAN_RE = re.compile(r'\w+|' + EMOJI_CLASS)
+MAX_WORD_REPEAT = 2
+MAX_EMOJIS = 2
+
+def trim_repeated_words(text: str, max_repeat: int = MAX_WORD_REPEAT, words: List[str] = None) -> str:
+    """
+    max_repeat번 넘게 나온 단어(\b\w+\b)는 앞에서부터 지워서 마지막 max_repeat번만 남김
+    - 단어마다 re.sub로 전체 문자열을 다시 훑던 방식(단어 수 × 길이)과 같은 결과를 한 번의 scan으로 만듦
+    - words: 이미 구한 단어 목록 (없으면 WORD_RE로 구함)
+    """
+    words = WORD_RE.findall(text) if words is None else words
+    counts = {}
+    for word in words:
+        counts[word] = counts.get(word, 0) + 1
+    excess = {word: count - max_repeat for word, count in counts.items() if count > max_repeat}
+    if not excess:
+        return text
+    parts, last = [], 0
+    for m in WORD_RE.finditer(text):
+        left = excess.get(m.group())
+        if left:
+            parts.append(text[last:m.start()])
+            last = m.end()
+            excess[m.group()] = left - 1
+    parts.append(text[last:])
+    return "".join(parts)
+
+def cap_emojis_and_words(text: str, max_emojis: int = MAX_EMOJIS, max_repeat: int = MAX_WORD_REPEAT) -> str:
+    """
+    이모지가 max_emojis개보다 많으면 모두 지우고 앞의 max_emojis개만 끝에 붙인 뒤, 반복 단어 정리
+    - 단어/이모지를 한 번에 scan해서, 이모지를 지울 필요가 없으면 같은 단어 목록으로 반복 단어 정리
+    - 이모지를 지우면 양옆 단어가 붙을 수 있어서 그때만 단어를 다시 구함
+    - 이모지이면서 \w인 문자(❶ 등)가 있으면 단어/이모지를 따로 구함
+    """
+    if EMOJI_WORD_OVERLAP_RE is not None and EMOJI_WORD_OVERLAP_RE.search(text):
+        emojis = EMOJI_RE.findall(text)
+        if len(emojis) > max_emojis:
+            text = EMOJI_RE.sub('', text) + ''.join(emojis[:max_emojis])
+        return trim_repeated_words(text, max_repeat)
+
+    words, emojis = [], []
+    for token in WORD_EMOJI_SCAN_RE.findall(text):
+        # 이모지는 \W 한 글자, 단어는 \w로 시작
+        if len(token) == 1 and EMOJI_RE.match(token):
+            emojis.append(token)
+        else:
+            words.append(token)
+    if len(emojis) > max_emojis:
+        return trim_repeated_words(EMOJI_RE.sub('', text) + ''.join(emojis[:max_emojis]), max_repeat)
+    return trim_repeated_words(text, max_repeat, words)
+
+def clean_special_spaces(text: str) -> str:
+    # 특수 유니코드 공백을 일반 공백으로 치환
+    return SPECIAL_SPACE_RE.sub(' ', text)
+
+def postprocess(text: str, original_content: str = "") -> str:
+    # 특수 공백 치환
+    text = SPECIAL_SPACE_RE.sub(' ', text)
+    # 해시태그 제거
+    text = HASHTAG_RE.sub('', text)
+    # 실제 줄바꿈 문자 제거
+    text = NEWLINE_RE.sub('', text)
+    # 이스케이프된 줄바꿈 문자 제거
+    text = ESCAPED_NEWLINE_ONLY_RE.sub('', text)
+    text = ODD_CHAR_RE.sub('', text)
+    # 이모지 2개만 남기기 + 반복 단어 2회까지만 허용
+    text = cap_emojis_and_words(text)
+    # 불필요한 공백 정리 (... 등 연속 마침표는 그대로 둠)
+    text = WHITESPACE_RE.sub(' ', text).strip()
+    # 5자 미만, 의미 없는 텍스트는 오류 메시지
+    if len(text) < 5 or MEANINGLESS_RE.fullmatch(text):
+        return OUTPUT_ERROR_MESSAGE
+    # 변환 텍스트가 너무 길면 자르기 (최대 200자)
+    if original_content and len(text) > MAX_TRANSFORMED_LEN:
+        trimmed_text = ""
+        for word in text.split():
+            if len(trimmed_text) + len(word) + 1 > MAX_TRANSFORMED_LEN:
+                break
+            trimmed_text += word + " "
+        text = trimmed_text.strip()
+    return text
+
+def postprocess_texts(texts: Iterable[str], original_contents: Iterable[str] = None) -> List[str]:
+    if original_contents is None:
+        return [postprocess(text) for text in texts]
+    return [postprocess(text, original) for text, original in zip(texts, original_contents)]
+
+# --- DataFilter 특징 추출 (텍스트 한 번 scan) ---
+DANGER_KEYWORDS = [
+    "system", "override", "drop table", "select", "union", "script", "해킹", "attack", "hack", "sql", "delete", "insert", "update", "shutdown"
+]
+DANGER_RE = re.compile("|".join(re.escape(kw) for kw in DANGER_KEYWORDS))
+# 단어(\w+) / 이모지 연속 구간 / 해시태그(# 뒤에 공백 아닌 문자)를 한 번의 scan으로 나눔
+TEXT_SCAN_RE = re.compile(r'(\w+)|(' + EMOJI_CLASS + r'+)|(#(?=\S))')
+EMOJI_RUN_ANY_RE = re.compile(EMOJI_CLASS + "+")
+
+def _emoji_word_chars() -> str:
+    # 이모지 범위 중 \w에도 속하는 문자(❶, ➀ 등): TEXT_SCAN_RE에서는 앞 구간에 따라 단어/이모지 어느 쪽으로든 들어감
+    ranges = list(range(0x2600, 0x27C0)) + list(range(0x1F1E0, 0x1FA00))
+    return "".join(c for c in map(chr, ranges) if EMOJI_RE.match(c) and re.match(r"\w", c))
+
+_EMOJI_WORD_CHARS = _emoji_word_chars()
+EMOJI_WORD_OVERLAP_RE = re.compile("[" + re.escape(_EMOJI_WORD_CHARS) + "]") if _EMOJI_WORD_CHARS else None
+
+# text_features 반환 순서
+TEXT_FEATURES = [
+    "length", "meaningful", "danger", "kor_eng", "hashtag", "emoji_count", "emoji_run", "starts_alpha", "max_word_count"
+]
+
+def text_features(text: str) -> tuple:
+    """
+    DataFilter 조건 검사에 필요한 특징을 한 번에 계산 (순서는 TEXT_FEATURES)
+    - meaningful: [\\W\\d\\s]만으로 이루어지지 않음 (숫자가 아닌 단어 문자 포함)
+    - danger: 소문자로 바꾼 텍스트에 DANGER_KEYWORDS 포함
+    - emoji_count / emoji_run: 이모지 개수 / 가장 긴 연속 이모지 길이
+    - starts_alpha: 앞뒤 공백 제거 후 한글/영어로 시작
+    - max_word_count: 가장 많이 나온 단어(\\b\\w+\\b)의 횟수
+    """
+    counts = {}
+    emoji_count = emoji_run = 0
+    hashtag = False
+    for word, emojis, _ in TEXT_SCAN_RE.findall(text):
+        if word:
+            counts[word] = counts.get(word, 0) + 1
+        elif emojis:
+            emoji_count += len(emojis)
+            emoji_run = max(emoji_run, len(emojis))
+        else:
+            hashtag = True
+    if EMOJI_WORD_OVERLAP_RE is not None and EMOJI_WORD_OVERLAP_RE.search(text):
+        # 겹치는 문자가 있으면 단어/이모지를 따로 다시 셈
+        counts = {}
+        for word in WORD_RE.findall(text):
+            counts[word] = counts.get(word, 0) + 1
+        runs = [len(run) for run in EMOJI_RUN_ANY_RE.findall(text)]
+        emoji_count, emoji_run = sum(runs), max(runs, default=0)
+    return (
+        len(text),
+        any(not word.isdecimal() for word in counts),
+        bool(DANGER_RE.search(text.lower())),
+        bool(KOR_ENG_RE.search(text)),
+        hashtag,
+        emoji_count,
+        emoji_run,
+        bool(STARTS_WITH_ALPHA_RE.match(text.strip())),
+        max(counts.values(), default=0),
+    )
@@ -1,5 +1,7 @@
 import argparse
+import json
 import os
+import time
 import numpy as np
 import torch
 import warnings
@@ -8,7 +10,9 @@ from Korpora import Korpora
 from transformers import BertModel, BertTokenizer
 
 from .about import __name__, __version__
-from .score import train_idf, idf_numpy_to_embed
+from .score import BERTScore, load_model, train_idf, idf_numpy_to_embed
+from .near_duplicate import (
+    encode_sentences, embedding_meta, load_embeddings_if_valid, save_embedding_meta, IVFIndex, group_duplicates)
 from .tasks import find_best_layer, compute_average_l2_norm, score_from_all_layers
 
 
@@ -57,6 +61,33 @@ def main():
     parser_l2norm.add_argument('--draw_plot', dest='draw_plot', action='store_true')
     parser_l2norm.set_defaults(func=average_l2_norm)
 
+    # Measure the gain of prefetching tokenized batches
+    parser_prefetch = subparsers.add_parser('prefetch_benchmark', help='Compare sequential and prefetched BERTScore')
+    parser_prefetch.add_argument('--model_name_or_path', type=str, required=True, help='BERT model path or name')
+    parser_prefetch.add_argument('--best_layer', type=int, default=-1, help='The number of BERT layers to use')
+    parser_prefetch.add_argument('--device', type=str, default='cpu', help='cpu, cuda, cuda:0')
+    parser_prefetch.add_argument('--references', type=str, required=True, help='References path')
+    parser_prefetch.add_argument('--batch_size', type=int, default=128, help='BERT embedding batch size')
+    parser_prefetch.add_argument('--prefetch', type=int, default=2, help='Prefetch queue size')
+    parser_prefetch.add_argument('--repeat', type=int, default=3, help='The number of timing repeats')
+    parser_prefetch.add_argument('--output_path', type=str, default=None, help='Result file path')
+    parser_prefetch.set_defaults(func=prefetch_benchmark)
+
+    # Find near-duplicate sentences in JSONL
+    parser_near_dup = subparsers.add_parser('near_duplicates', help='Find near-duplicate sentences with IVF index')
+    parser_near_dup.add_argument('--model_name_or_path', type=str, default='beomi/kcbert-base', help='BERT model path or name')
+    parser_near_dup.add_argument('--best_layer', type=int, default=-1, help='The number of BERT layers to use')
+    parser_near_dup.add_argument('--device', type=str, default=None, help='cpu, cuda, cuda:0, or None')
+    parser_near_dup.add_argument('--input_path', type=str, required=True, help='JSONL path')
+    parser_near_dup.add_argument('--field', type=str, default='content', help='JSONL field to embed')
+    parser_near_dup.add_argument('--embedding_path', type=str, required=True, help='float16 memmap path, reused if its .json sidecar matches')
+    parser_near_dup.add_argument('--threshold', type=float, default=0.95, help='Minimum cosine similarity')
+    parser_near_dup.add_argument('--n_clusters', type=int, default=None, help='The number of IVF partitions')
+    parser_near_dup.add_argument('--n_probe', type=int, default=4, help='The number of partitions searched per row')
+    parser_near_dup.add_argument('--batch_size', type=int, default=128, help='BERT embedding batch size')
+    parser_near_dup.add_argument('--output_path', type=str, required=True, help='Cluster JSONL path')
+    parser_near_dup.set_defaults(func=near_duplicates)
+
     args = parser.parse_args()
     task_function = args.func
     task_function(args)
@@ -220,5 +251,103 @@ def average_l2_norm(args):
         save(figure, f'{args.output_path}.html')
 
 
+def prefetch_benchmark(args):
+    print(f'Compare sequential and prefetched BERTScore with {args.model_name_or_path}')
+
+    # Load pretrained BERT model and tokenizer
+    bertscore = BERTScore(
+        load_model(args.model_name_or_path, args.best_layer), device=args.device)
+
+    # Load references and generate candidates from permutating references
+    with open(args.references, encoding='utf-8') as f:
+        references = [line.strip() for line in f if line.strip()]
+    candidates = [references[idx] for idx in np.random.permutation(len(references))]
+
+    def elapsed(prefetch):
+        times = []
+        for _ in range(args.repeat):
+            begin = time.perf_counter()
+            F = bertscore.score(
+                references, candidates, batch_size=args.batch_size,
+                retrain_idf=False, verbose=False, prefetch=prefetch)
+            times.append(time.perf_counter() - begin)
+        return min(times), F
+
+    # Warm up
+    bertscore.score(references[:args.batch_size], candidates[:args.batch_size],
+                    batch_size=args.batch_size, retrain_idf=False, verbose=False, prefetch=0)
+    sequential, F_sequential = elapsed(0)
+    prefetched, F_prefetched = elapsed(args.prefetch)
+    if not np.allclose(F_sequential, F_prefetched, equal_nan=True):
+        raise ValueError('Prefetched BERTScore differs from sequential BERTScore')
+
+    # Reporting
+    n_sents = len(references)
+    form = '| {} | {} | {} |'
+    report = [form.format('mode', 'seconds', 'sents/sec'), form.format('---', '---', '---')]
+    report.append(form.format('sequential', f'{sequential:.3f}', f'{n_sents / sequential:.1f}'))
+    report.append(form.format(f'prefetch={args.prefetch}', f'{prefetched:.3f}', f'{n_sents / prefetched:.1f}'))
+    report.append(f'\nspeedup: x{sequential / prefetched:.3f} ({n_sents} pairs, batch_size={args.batch_size}, '
+                  f'torch threads={torch.get_num_threads()})')
+    report = '\n'.join(report)
+    print(report)
+
+    # Write report
+    if args.output_path is not None:
+        dirname = os.path.abspath(os.path.dirname(args.output_path))
+        print(f'Saving benchmark at {dirname}')
+        os.makedirs(dirname, exist_ok=True)
+        with open(args.output_path, 'w', encoding='utf-8') as f:
+            f.write(report)
+
+
+def near_duplicates(args):
+    print(f'Finding near-duplicate `{args.field}` in {args.input_path}')
+
+    with open(args.input_path, encoding='utf-8') as f:
+        sents = [str(json.loads(line).get(args.field, '')).strip() for line in f if line.strip()]
+    n_sents = len(sents)
+
+    # Load or compute float16 sentence embeddings
+    tokenizer, encoder = load_model(args.model_name_or_path, args.best_layer)
+    dim = encoder.config.hidden_size
+    # Reuse only when the sidecar (model, layer, field, sentence hash) matches
+    meta = embedding_meta(args.model_name_or_path, args.best_layer, args.field, sents)
+    embeddings = load_embeddings_if_valid(args.embedding_path, dim, meta)
+    if embeddings is None:
+        device = args.device
+        if device is None:
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+        embeddings = encode_sentences(
+            tokenizer, encoder.to(device), sents, args.embedding_path, batch_size=args.batch_size)
+        save_embedding_meta(args.embedding_path, meta)
+    else:
+        print(f'  - Reuse embeddings at {args.embedding_path}')
+
+    # IVF search
+    begin = time.perf_counter()
+    index = IVFIndex(n_clusters=args.n_clusters, n_probe=args.n_probe).fit(embeddings)
+    rows, cols, sims = index.search_pairs(args.threshold)
+    clusters = group_duplicates(n_sents, rows, cols)
+    n_removed = sum(len(cluster) - 1 for cluster in clusters)
+    print(f'  - {len(rows)} pairs, {len(clusters)} clusters, {n_removed} rows to remove '
+          f'({len(index.centroids)} partitions, {time.perf_counter() - begin:.2f} sec)')
+
+    # Write clusters. The first row of each cluster is kept
+    dirname = os.path.abspath(os.path.dirname(args.output_path))
+    os.makedirs(dirname, exist_ok=True)
+    with open(args.output_path, 'w', encoding='utf-8') as f:
+        for cluster_id, cluster in enumerate(clusters):
+            record = {
+                'cluster_id': cluster_id,
+                'size': len(cluster),
+                'keep': cluster[0],
+                'remove': cluster[1:],
+                args.field: [sents[i] for i in cluster]
+            }
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    print(f'Saving near-duplicate clusters at {args.output_path}')
+
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,288 @@
+import hashlib
+import json
+import math
+import os
+import numpy as np
+import torch
+from tqdm import tqdm
+
+from .score import sents_to_tensor, bert_forwarding, prefetch
+
+
+def encode_sentences(bert_tokenizer, bert_model, sents, output_path,
+                     batch_size=128, queue_size=2, verbose=True):
+    """
+    Mean-pooled, L2-normalized sentence embeddings stored as float16 memmap.
+    Pooling uses the last layer of `bert_model`, so with `load_model('beomi/kcbert-base')`
+    it is the layer-4 output which is used for KoBERTScore.
+
+    Args:
+        bert_tokenizer (transformers.PreTrainedTokenizer)
+        bert_model (transformers`s Pretrained models)
+        sents (list of str) : Input sentences
+        output_path (str) : Memmap file path
+        batch_size (int) : Batch size, default = 128
+        queue_size (int) : The number of batches tokenized ahead by a background thread
+        verbose (Boolean) : If True, show progress bar
+
+    Returns:
+        embeddings (numpy.memmap) : shape = (len(sents), D), dtype = float16
+
+    Examples::
+        >>> from KoBERTScore import load_model
+        >>> tokenizer, encoder = load_model('beomi/kcbert-base', best_layer=4)
+        >>> embeddings = encode_sentences(tokenizer, encoder, contents, 'contents.f16')
+        >>> embeddings = load_embeddings('contents.f16', dim=768)
+    """
+    n_sents = len(sents)
+    dim = bert_model.config.hidden_size
+    embeddings = np.memmap(output_path, dtype=np.float16, mode='w+', shape=(max(n_sents, 1), dim))
+
+    batches = (sents_to_tensor(bert_tokenizer, sents[b: b + batch_size]) for b in range(0, n_sents, batch_size))
+    batches = prefetch(batches, queue_size)
+    if verbose:
+        batches = tqdm(batches, desc='Encoding sentences', total=math.ceil(n_sents / batch_size))
+
+    b = 0
+    for input_ids, attention_mask, token_mask in batches:
+        hidden = bert_forwarding(bert_model, input_ids, attention_mask, output_layer_index=-1)
+        mask = token_mask.unsqueeze(-1).to(hidden.dtype)
+        pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+        pooled = torch.nn.functional.normalize(pooled, dim=-1)
+        embeddings[b: b + pooled.size(0)] = pooled.numpy().astype(np.float16)
+        b += pooled.size(0)
+    embeddings.flush()
+    return embeddings[:n_sents]
+
+
+def load_embeddings(path, dim=768):
+    """
+    Args:
+        path (str) : Memmap file path written by `encode_sentences`
+        dim (int) : Embedding dim
+
+    Returns:
+        embeddings (numpy.memmap) : shape = (n, dim), dtype = float16, read-only
+    """
+    return np.memmap(path, dtype=np.float16, mode='r').reshape(-1, dim)
+
+
+def embedding_meta(model_name_or_path, best_layer, field, sents):
+    """
+    Description of the embeddings stored with the memmap.
+    Stored embeddings are reused only when every value matches.
+
+    Args:
+        model_name_or_path (str) : BERT model path or name
+        best_layer (int) : The number of BERT layers used
+        field (str) : JSONL field that was embedded
+        sents (list of str) : Input sentences
+
+    Returns:
+        meta (dict) : {'model_name_or_path', 'best_layer', 'field', 'n_sents', 'sents_sha256'}
+    """
+    h = hashlib.sha256()
+    for sent in sents:
+        data = sent.encode('utf-8')
+        h.update(len(data).to_bytes(8, 'little'))
+        h.update(data)
+    return {
+        'model_name_or_path': model_name_or_path,
+        'best_layer': best_layer,
+        'field': field,
+        'n_sents': len(sents),
+        'sents_sha256': h.hexdigest()
+    }
+
+
+def embedding_meta_path(path):
+    return path + '.json'
+
+
+def save_embedding_meta(path, meta):
+    """
+    Write `meta` next to the memmap at `path`. Call it after `encode_sentences` finishes,
+    so interrupted encodings are never reused.
+    """
+    with open(embedding_meta_path(path), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+
+def load_embeddings_if_valid(path, dim, meta):
+    """
+    Args:
+        path (str) : Memmap file path written by `encode_sentences`
+        dim (int) : Embedding dim
+        meta (dict) : Expected description from `embedding_meta`
+
+    Returns:
+        embeddings (numpy.memmap or None) : None if the memmap or its sidecar is missing,
+            or if the sidecar differs from `meta`
+    """
+    meta_path = embedding_meta_path(path)
+    if not (os.path.exists(path) and os.path.exists(meta_path)):
+        return None
+    try:
+        with open(meta_path, encoding='utf-8') as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if stored != meta:
+        return None
+    embeddings = load_embeddings(path, dim)
+    if embeddings.shape[0] < meta['n_sents']:
+        return None
+    return embeddings[:meta['n_sents']]
+
+
+class IVFIndex:
+    """
+    Inverted file index over unit vectors.
+    Vectors are partitioned by spherical k-means, and each vector is compared
+    only with the members of its `n_probe` nearest partitions.
+
+    Args:
+        n_clusters (int or None) : The number of partitions
+            If None, it uses about sqrt(n) partitions
+        n_probe (int) : The number of partitions searched per vector
+        n_iter (int) : The number of k-means iterations
+        n_train (int or None) : The number of vectors sampled to train centroids
+            If None, it uses 64 vectors per partition
+        chunk_size (int) : The number of vectors converted to float32 at once
+        seed (int) : Random seed
+
+    Examples::
+        >>> index = IVFIndex(n_probe=4).fit(embeddings)
+        >>> rows, cols, sims = index.search_pairs(threshold=0.95)
+    """
+    def __init__(self, n_clusters=None, n_probe=4, n_iter=10, n_train=None, chunk_size=8192, seed=0):
+        self.n_clusters = n_clusters
+        self.n_probe = n_probe
+        self.n_iter = n_iter
+        self.n_train = n_train
+        self.chunk_size = chunk_size
+        self.seed = seed
+        self.centroids = None
+        self.assignment = None
+        self.probes = None
+        self.vectors = None
+
+    def fit(self, vectors):
+        n = vectors.shape[0]
+        n_clusters = self.n_clusters or max(1, int(math.sqrt(n)))
+        n_clusters = min(n_clusters, n)
+        rng = np.random.RandomState(self.seed)
+
+        n_train = min(n, self.n_train or 64 * n_clusters)
+        sample = np.sort(rng.choice(n, n_train, replace=False))
+        sample = np.asarray(vectors[sample], dtype=np.float32)
+        centroids = sample[rng.choice(n_train, n_clusters, replace=False)]
+        for _ in range(self.n_iter):
+            labels = (sample @ centroids.T).argmax(axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            counts = np.bincount(labels, minlength=n_clusters)
+            empty = counts == 0
+            if empty.any():
+                sums[empty] = sample[rng.choice(n_train, int(empty.sum()), replace=False)]
+            centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+        self.centroids = centroids
+
+        n_probe = min(self.n_probe, n_clusters)
+        probes = np.empty((n, n_probe), dtype=np.int32)
+        for b in range(0, n, self.chunk_size):
+            sims = np.asarray(vectors[b: b + self.chunk_size], dtype=np.float32) @ centroids.T
+            if n_probe < n_clusters:
+                top = np.argpartition(-sims, n_probe - 1, axis=1)[:, :n_probe]
+            else:
+                top = np.broadcast_to(np.arange(n_clusters), sims.shape).copy()
+            order = np.argsort(-np.take_along_axis(sims, top, axis=1), axis=1)
+            probes[b: b + len(sims)] = np.take_along_axis(top, order, axis=1)
+        self.probes = probes
+        self.assignment = probes[:, 0]
+        self.vectors = vectors
+        return self
+
+    def search_pairs(self, threshold=0.95):
+        """
+        Args:
+            threshold (float) : Minimum cosine similarity of near-duplicate pairs
+
+        Returns:
+            rows (numpy.ndarray) : Smaller index of each pair
+            cols (numpy.ndarray) : Larger index of each pair
+            sims (numpy.ndarray) : Cosine similarity of each pair
+        """
+        if self.probes is None:
+            raise RuntimeError('Call `fit` before `search_pairs`')
+        n, n_probe = self.probes.shape
+        member_order = np.argsort(self.assignment, kind='stable')
+        member_bounds = np.searchsorted(self.assignment[member_order], np.arange(len(self.centroids) + 1))
+        query_ids = np.repeat(np.arange(n), n_probe)
+        query_targets = self.probes.ravel()
+        query_order = np.argsort(query_targets, kind='stable')
+        query_bounds = np.searchsorted(query_targets[query_order], np.arange(len(self.centroids) + 1))
+
+        found_rows, found_cols, found_sims = [], [], []
+        for c in range(len(self.centroids)):
+            members = member_order[member_bounds[c]: member_bounds[c + 1]]
+            queries = query_ids[query_order[query_bounds[c]: query_bounds[c + 1]]]
+            if len(members) == 0 or len(queries) == 0:
+                continue
+            member_vectors = np.asarray(self.vectors[members], dtype=np.float32)
+            for b in range(0, len(queries), self.chunk_size):
+                query_chunk = queries[b: b + self.chunk_size]
+                sims = np.asarray(self.vectors[query_chunk], dtype=np.float32) @ member_vectors.T
+                qi, mi = np.nonzero(sims >= threshold)
+                rows, cols = query_chunk[qi], members[mi]
+                keep = rows < cols
+                found_rows.append(rows[keep])
+                found_cols.append(cols[keep])
+                found_sims.append(sims[qi[keep], mi[keep]])
+
+        if not found_rows:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        rows = np.concatenate(found_rows)
+        cols = np.concatenate(found_cols)
+        sims = np.concatenate(found_sims)
+        # A pair is found twice when both vectors probe each other's partition
+        _, unique = np.unique(rows.astype(np.int64) * n + cols, return_index=True)
+        return rows[unique], cols[unique], sims[unique]
+
+
+def group_duplicates(n, rows, cols):
+    """
+    Connected components of near-duplicate pairs
+
+    Args:
+        n (int) : The number of vectors
+        rows (numpy.ndarray) : Pair index
+        cols (numpy.ndarray) : Pair index
+
+    Returns:
+        clusters (list of list of int) : Sorted member indices of each component with two or more members
+            The first member is the representative to keep
+
+    Examples::
+        >>> group_duplicates(5, np.array([0, 3]), np.array([2, 4]))
+        $ [[0, 2], [3, 4]]
+    """
+    parent = np.arange(n)
+
+    def find(i):
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        while parent[i] != root:
+            parent[i], i = root, parent[i]
+        return root
+
+    for i, j in zip(rows.tolist(), cols.tolist()):
+        ri, rj = find(i), find(j)
+        if ri != rj:
+            parent[max(ri, rj)] = min(ri, rj)
+
+    roots = np.array([find(i) for i in range(n)])
+    order = np.argsort(roots, kind='stable')
+    bounds = np.flatnonzero(np.diff(roots[order])) + 1
+    return [group.tolist() for group in np.split(order, bounds) if len(group) > 1]
@@ -1,6 +1,8 @@
 import math
 import numpy as np
 import os
+import queue
+import threading
 import torch
 import torch.nn.functional as F
 from collections import Counter
@@ -43,8 +45,33 @@ def bert_score(bert_tokenizer, bert_model, references, candidates,
            tensor([0.5721, 0.8134, 0.8768, 0.6904, 0.7934]))
     """
     # tokenization
-    refer_ids, refer_attention_mask, refer_weight_mask = sents_to_tensor(bert_tokenizer, references)
-    candi_ids, candi_attention_mask, candi_weight_mask = sents_to_tensor(bert_tokenizer, candidates)
+    refer_inputs = sents_to_tensor(bert_tokenizer, references)
+    candi_inputs = sents_to_tensor(bert_tokenizer, candidates)
+    return bert_score_from_tensors(
+        bert_model, refer_inputs, candi_inputs,
+        idf, output_layer_index, rescale_base)
+
+
+def bert_score_from_tensors(bert_model, refer_inputs, candi_inputs,
+                            idf=None, output_layer_index=-1, rescale_base=0):
+    """
+    Args:
+        bert_model (transformers`s Pretrained models)
+        refer_inputs (tuple of torch.LongTensor) : Output of `sents_to_tensor` for references
+        candi_inputs (tuple of torch.LongTensor) : Output of `sents_to_tensor` for candidates
+        idf (torch.nn.Embedding or None) : IDF weights
+        output_layer_index (int)
+            The index of last BERT layer which is used for token embedding
+        rescale_base (float) : 0 <= rescale_base < 1
+            Adjust (R-BERTScore - base) / (1 - base)
+
+    Returns:
+        R (torch.tensor) : R-BERTScore
+        P (torch.tensor) : P-BERTScore
+        F (torch.tensor) : F-BERTScore
+    """
+    refer_ids, refer_attention_mask, refer_weight_mask = refer_inputs
+    candi_ids, candi_attention_mask, candi_weight_mask = candi_inputs
 
     # BERT embedding
     refer_embeds = bert_forwarding(bert_model, refer_ids, refer_attention_mask, output_layer_index)
@@ -103,6 +130,92 @@ def sents_to_tensor(bert_tokenizer, input_sents):
     return padded_input_ids, attention_mask, token_mask
 
 
+def prefetch_batches(bert_tokenizer, references, candidates, batch_size=128, queue_size=2):
+    """
+    Tokenize and pad (reference, candidate) batches in a background thread.
+    While the consumer runs BERT on batch N, batch N+1 is prepared.
+
+    Args:
+        bert_tokenizer (transformers.PreTrainedTokenizer)
+        references (list of str) : True sentences
+        candidates (list of str) : Generated sentences
+        batch_size (int) : Batch size, default = 128
+        queue_size (int) : The maximum number of prepared batches waiting in queue
+            If `queue_size` is 0, batches are prepared in the caller thread
+
+    Yields:
+        refer_inputs (tuple of torch.LongTensor) : Output of `sents_to_tensor` for references
+        candi_inputs (tuple of torch.LongTensor) : Output of `sents_to_tensor` for candidates
+
+    Examples::
+        >>> for refer_inputs, candi_inputs in prefetch_batches(tokenizer, references, candidates):
+        >>>     R, P, F = bert_score_from_tensors(encoder, refer_inputs, candi_inputs)
+    """
+    n_examples = len(references)
+    batches = (
+        (sents_to_tensor(bert_tokenizer, references[b: b + batch_size]),
+         sents_to_tensor(bert_tokenizer, candidates[b: b + batch_size]))
+        for b in range(0, n_examples, batch_size)
+    )
+    return prefetch(batches, queue_size)
+
+
+def prefetch(iterable, queue_size=2):
+    """
+    Consume `iterable` in a background thread and yield its items through a bounded queue.
+    Exceptions raised in the background thread are re-raised in the caller thread.
+
+    Args:
+        iterable (iterable) : Items are produced in the background thread
+        queue_size (int) : The maximum number of produced items waiting in queue
+            If `queue_size` is 0, items are produced in the caller thread
+
+    Yields:
+        item : Items of `iterable` in order
+    """
+    if queue_size <= 0:
+        yield from iterable
+        return
+
+    item_queue = queue.Queue(maxsize=queue_size)
+    stopped = threading.Event()
+    end_of_items = object()
+
+    def put(item):
+        # Bounded put which gives up when the consumer has stopped early
+        while not stopped.is_set():
+            try:
+                item_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+        except Exception as e:
+            put(e)
+            return
+        put(end_of_items)
+
+    producer = threading.Thread(target=produce, name='KoBERTScore-prefetch', daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = item_queue.get()
+            if item is end_of_items:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stopped.set()
+        producer.join()
+
+
 def bert_forwarding(bert_model, input_ids, attention_mask=None, output_layer_index=-1):
     """
     Args:
@@ -272,36 +385,41 @@ class BERTScore:
         self.rescale_base = rescale_base
         self.idf = load_idf(idf_path, self.tokenizer)
 
-    def __call__(self, references, candidates, batch_size=128, retrain_idf=True, verbose=True):
-        return self.score(references, candidates, batch_size, retrain_idf, verbose)
+    def __call__(self, references, candidates, batch_size=128, retrain_idf=True, verbose=True, prefetch=2):
+        return self.score(references, candidates, batch_size, retrain_idf, verbose, prefetch)
+
+    def score(self, references, candidates, batch_size=128, retrain_idf=True, verbose=True, prefetch=2):
+        """
+        Args:
+            references (list of str) : True sentences
+            candidates (list of str) : Generated sentences
+            batch_size (int) : Batch size, default = 128
+            retrain_idf (Boolean) : Not used. Kept for compatibility
+                Scores are always weighted by `self.idf` (set `idf_path` to use trained IDF)
+            verbose (Boolean) : If True, show progress bar
+            prefetch (int) : The number of batches tokenized ahead by a background thread
+                If 0, tokenization and BERT forwarding run sequentially in the caller thread
 
-    def score(self, references, candidates, batch_size=128, retrain_idf=True, verbose=True):
+        Returns:
+            F (list of float) : F-BERTScore
+        """
         n_examples = len(references)
         n_batch = math.ceil(n_examples / batch_size)
+        batches = prefetch_batches(self.tokenizer, references, candidates, batch_size, prefetch)
         if verbose:
-            step_iterator = tqdm(range(n_batch), desc='Calculating BERTScore', total=n_batch)
+            step_iterator = tqdm(batches, desc='Calculating BERTScore', total=n_batch)
         else:
-            step_iterator = range(n_batch)
-
-        if retrain_idf:
-            idf = train_idf(self.tokenizer, references, batch_size=1000, verbose=verbose)
-            idf = idf_numpy_to_embed(idf)
-        else:
-            idf = self.idf
+            step_iterator = batches
 
         F = []
-        for step in step_iterator:
-            b = step * batch_size
-            e = min((step + 1) * batch_size, n_examples)
-            refer_batch = references[b: e]
-            candi_batch = candidates[b: e]
-
-            _, _, F_batch = bert_score(
-                self.tokenizer, self.encoder,
-                refer_batch, candi_batch,
+        for refer_inputs, candi_inputs in step_iterator:
+            _, _, F_batch = bert_score_from_tensors(
+                self.encoder, refer_inputs, candi_inputs,
                 idf=self.idf, rescale_base=self.rescale_base)
-            F += F_batch.detach().numpy().tolist()
-        return F
+            F.append(F_batch.detach())
+        if not F:
+            return []
+        return torch.cat(F).numpy().tolist()
 
     def plot_bertscore_detail(self, reference, candidate,
         idf=None, height='auto', width='auto', title=None, return_gridplot=True):
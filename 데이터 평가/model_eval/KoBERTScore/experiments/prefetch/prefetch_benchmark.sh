@@ -0,0 +1,20 @@
+korpora lmdata \
+  --corpus all \
+  --output_dir ./ \
+  --sampling_ratio 0.2 \
+  --n_first_samples 100000 \
+  --min_length 10 \
+  --max_length 100
+
+head -n 4096 all.train > references.txt
+
+models="beomi/kcbert-base"
+for model in ${models}; do
+    kobertscore prefetch_benchmark \
+      --model_name_or_path ${model} \
+      --device cpu \
+      --references references.txt \
+      --batch_size 64 \
+      --prefetch 2 \
+      --output_path ${model}
+done
@@ -0,0 +1,44 @@
+# Offline setup used for the table in README.md (no model download, no Korpora)
+# - encoder: kcbert-base shape (hidden 768, 12 heads, intermediate 3072) with 4 layers and random weights
+# - vocab: characters of dataset_0530_made (WordPiece tokenizer)
+# - references: first 1,024 `content` / `transformed_content` lines of dataset_0530_made
+dataset=../../../../dataset/_dataset/_made/dataset_0530_made.jsonl
+
+python - ${dataset} <<'EOF'
+import collections
+import json
+import os
+import sys
+
+import torch
+from transformers import BertConfig, BertModel, BertTokenizer
+
+texts = []
+with open(sys.argv[1], encoding='utf-8') as f:
+    for line in f:
+        data = json.loads(line)
+        texts += [data['content'], data['transformed_content']]
+chars = collections.Counter(c for text in texts for word in text.split() for c in word)
+top = [c for c, _ in chars.most_common(3000)]
+vocab = ['[PAD]', '[UNK]', '[CLS]', '[SEP]', '[MASK]'] + top + ['##' + c for c in top]
+
+os.makedirs('kcbert-random', exist_ok=True)
+with open('kcbert-random/vocab.txt', 'w', encoding='utf-8') as f:
+    f.write('\n'.join(vocab))
+BertTokenizer('kcbert-random/vocab.txt', do_lower_case=False).save_pretrained('kcbert-random')
+torch.manual_seed(0)
+config = BertConfig(vocab_size=len(vocab), hidden_size=768, num_hidden_layers=4, num_attention_heads=12,
+                    intermediate_size=3072, max_position_embeddings=300)
+BertModel(config).save_pretrained('kcbert-random')
+
+with open('references.txt', 'w', encoding='utf-8') as f:
+    f.write('\n'.join(texts[:1024]))
+EOF
+
+kobertscore prefetch_benchmark \
+  --model_name_or_path kcbert-random \
+  --device cpu \
+  --references references.txt \
+  --batch_size 64 \
+  --prefetch 2 \
+  --output_path kcbert-random.md
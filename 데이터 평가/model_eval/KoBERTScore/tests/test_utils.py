@@ -8,3 +8,92 @@ def test_pairwise_cosine():
     input2 = torch.randn(3, 7, 5)
     assert list(compute_pairwise_cosine(input1, input2).size()) == [3, 4, 7]
 
+
+
+def _tiny_bert(tmp_path):
+    from transformers import BertConfig, BertModel, BertTokenizer
+    vocab = ['[PAD]', '[UNK]', '[CLS]', '[SEP]', '[MASK]'] + list('날씨는좋고할일은많다영화정말재밌었어요')
+    vocab_file = tmp_path / 'vocab.txt'
+    vocab_file.write_text('\n'.join(vocab), encoding='utf-8')
+    tokenizer = BertTokenizer(str(vocab_file), do_lower_case=False)
+    config = BertConfig(vocab_size=len(vocab), hidden_size=16, num_hidden_layers=2,
+                        num_attention_heads=2, intermediate_size=32)
+    torch.manual_seed(0)
+    encoder = BertModel(config).eval()
+    return tokenizer, encoder
+
+
+def test_prefetch_batches(tmp_path):
+    from KoBERTScore.score import prefetch_batches, sents_to_tensor
+    tokenizer, _ = _tiny_bert(tmp_path)
+    references = ['날씨는 좋고', '할일은 많다', '영화 정말', '재밌었어요', '날씨']
+    candidates = ['좋고 날씨는', '많다', '정말 영화', '재밌', '날씨는 좋다']
+    batches = list(prefetch_batches(tokenizer, references, candidates, batch_size=2, queue_size=1))
+    assert len(batches) == 3
+    refer_inputs, candi_inputs = batches[-1]
+    for actual, expected in zip(refer_inputs, sents_to_tensor(tokenizer, references[4:])):
+        assert torch.equal(actual, expected)
+    for actual, expected in zip(candi_inputs, sents_to_tensor(tokenizer, candidates[4:])):
+        assert torch.equal(actual, expected)
+
+
+def test_prefetch_score_equals_sequential(tmp_path):
+    from KoBERTScore.score import BERTScore
+    bertscore = BERTScore(_tiny_bert(tmp_path), device='cpu')
+    references = ['날씨는 좋고 할일은 많다', '영화 정말 재밌었어요', '날씨는 좋다'] * 3
+    candidates = ['할일은 많고 날씨는 좋다', '재밌었어요 영화', '영화 정말'] * 3
+    sequential = bertscore.score(references, candidates, batch_size=2, retrain_idf=False, verbose=False, prefetch=0)
+    prefetched = bertscore.score(references, candidates, batch_size=2, retrain_idf=False, verbose=False, prefetch=2)
+    assert len(prefetched) == len(references)
+    assert sequential == prefetched
+
+
+def test_ivf_near_duplicates():
+    import numpy as np
+    from KoBERTScore.near_duplicate import IVFIndex, group_duplicates
+    rng = np.random.RandomState(0)
+    vectors = rng.randn(500, 32).astype(np.float32)
+    vectors[100] = vectors[3] + 0.01 * rng.randn(32)
+    vectors[200] = vectors[3] + 0.01 * rng.randn(32)
+    vectors[400] = vectors[7] + 0.01 * rng.randn(32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = vectors.astype(np.float16)
+
+    index = IVFIndex(n_clusters=8, n_probe=3).fit(vectors)
+    rows, cols, sims = index.search_pairs(threshold=0.95)
+    assert sorted(zip(rows.tolist(), cols.tolist())) == [(3, 100), (3, 200), (7, 400), (100, 200)]
+    assert (sims >= 0.95).all()
+    assert group_duplicates(len(vectors), rows, cols) == [[3, 100, 200], [7, 400]]
+
+
+def test_encode_sentences(tmp_path):
+    import numpy as np
+    from KoBERTScore.near_duplicate import encode_sentences, load_embeddings
+    tokenizer, encoder = _tiny_bert(tmp_path)
+    sents = ['날씨는 좋고', '할일은 많다', '날씨는 좋고', '영화']
+    path = str(tmp_path / 'sents.f16')
+    embeddings = encode_sentences(tokenizer, encoder, sents, path, batch_size=3, verbose=False)
+    loaded = load_embeddings(path, dim=16)
+    assert loaded.shape == (4, 16) and loaded.dtype == np.float16
+    assert np.array_equal(embeddings, loaded)
+    assert np.allclose(np.linalg.norm(loaded.astype(np.float32), axis=1), 1, atol=1e-2)
+    assert np.array_equal(loaded[0], loaded[2])
+
+
+def test_embedding_meta_reuse(tmp_path):
+    import numpy as np
+    from KoBERTScore.near_duplicate import (
+        embedding_meta, load_embeddings_if_valid, save_embedding_meta)
+    sents = ['날씨는 좋고', '할일은 많다']
+    path = str(tmp_path / 'sents.f16')
+    memmap = np.memmap(path, dtype=np.float16, mode='w+', shape=(2, 4))
+    memmap[:] = 1
+    memmap.flush()
+    meta = embedding_meta('beomi/kcbert-base', 4, 'content', sents)
+    assert load_embeddings_if_valid(path, 4, meta) is None
+    save_embedding_meta(path, meta)
+    assert load_embeddings_if_valid(path, 4, meta).shape == (2, 4)
+    # Same row count, but different sentences / field / layer
+    assert load_embeddings_if_valid(path, 4, embedding_meta('beomi/kcbert-base', 4, 'content', ['영화', '할일은 많다'])) is None
+    assert load_embeddings_if_valid(path, 4, embedding_meta('beomi/kcbert-base', 4, 'transformed_content', sents)) is None
+    assert load_embeddings_if_valid(path, 4, embedding_meta('beomi/kcbert-base', 2, 'content', sents)) is None
@@ -1,78 +1,209 @@
 import streamlit as st
-import os, json
-import tempfile
-import subprocess
+import os
 import pandas as pd
-from io import BytesIO
-from functions.visualize import load_eval_results, get_mean_scores, plot_radar_chart_multi, plot_score_distribution, show_mean_score_table
-from functions.feature_count import get_data_distribution
-from functions.filtering import filter_jsonl_bytes_by_threshold
-
-# =========================
-# 캐시 폴더 관련 함수
-# =========================
-CACHE_DIR = "./cache"
-
-def ensure_cache_dir():
-    if not os.path.exists(CACHE_DIR):
-        os.makedirs(CACHE_DIR)
-
-def save_eval_to_cache(filename: str, eval_bytes: bytes, mean_scores: dict, dist: dict, data_bytes: bytes):
-    ensure_cache_dir()
-    base = os.path.splitext(filename)[0]
-    with open(os.path.join(CACHE_DIR, f"{base}_eval.jsonl"), "wb") as f:
-        f.write(eval_bytes)
-    with open(os.path.join(CACHE_DIR, f"{base}_mean.json"), "w", encoding="utf-8") as f:
-        json.dump(mean_scores, f, ensure_ascii=False)
-    with open(os.path.join(CACHE_DIR, f"{base}_dist.json"), "w", encoding="utf-8") as f:
-        json.dump(dist, f, ensure_ascii=False)
-    with open(os.path.join(CACHE_DIR, f"{base}_data.jsonl"), "wb") as f:
-        f.write(data_bytes)
-
-def load_all_cached_files():
-    ensure_cache_dir()
-    cached = {}
-    for fname in os.listdir(CACHE_DIR):
-        if fname.endswith("_eval.jsonl"):
-            base = fname.replace("_eval.jsonl", "")
-            try:
-                with open(os.path.join(CACHE_DIR, f"{base}_eval.jsonl"), "rb") as f:
-                    eval_bytes = f.read()
-                with open(os.path.join(CACHE_DIR, f"{base}_mean.json"), "r", encoding="utf-8") as f:
-                    mean_scores = json.load(f)
-                with open(os.path.join(CACHE_DIR, f"{base}_dist.json"), "r", encoding="utf-8") as f:
-                    dist = json.load(f)
-                with open(os.path.join(CACHE_DIR, f"{base}_data.jsonl"), "rb") as f:
-                    data_bytes = f.read()
-                cached[f"{base}.jsonl"] = {
-                    "data": data_bytes,
-                    "eval": eval_bytes,
-                    "mean_scores": mean_scores,
-                    "dist": dist
-                }
-            except Exception as e:
-                continue
-    return cached
+from functions.visualize import plot_radar_chart_multi, plot_score_distribution, show_mean_score_table
+from functions.feature_count import get_data_distribution, get_distribution_from_indices
+from functions.filtering import passed_row_indices, pass_count_preview
+from functions.sampling import build_cells, stratified_sample
+from functions.row_catalog import search_rows
+from functions.dataset_diff import diff_datasets, summarize_deltas, fetch_rows
+from functions.eval_cache import CACHE_DIR, cache_path, remove_from_cache, spool_upload, open_file_view, load_score_summary
+from functions.export import available_compressions, write_jsonl_export, link_export, export_url
+from functions.shared_cache import SharedDatasetCache, SessionHandle
+from functions.eval_jobs import (
+    DEFAULT_MAX_WORKERS, HELD_STATUSES, enqueue_job, list_jobs, start_workers, collect_finished_jobs,
+    active_job_files, remove_job, continue_job
+)
 
 # Streamlit 업로드-캐시-세션 관리 
+@st.cache_resource
+def get_shared_cache():
+    # 모든 세션이 공유하는 manifest/점수 컬럼/평가 파일 memory map
+    return SharedDatasetCache(CACHE_DIR)
+
+def refresh_cached_files():
+    # 공유 manifest + 이 세션에서 평가 대기 중인 업로드
+    st.session_state["cached_files"] = {**st.session_state["pending_files"], **get_shared_cache().manifest()}
+
 def remove_file_from_cache(filename):
-    base = os.path.splitext(filename)[0]
-    if filename in st.session_state["cached_files"]:
-        del st.session_state["cached_files"][filename]
-    for suffix in ["_eval.jsonl", "_mean.json", "_dist.json", "_data.jsonl"]:
-        try:
-            os.remove(os.path.join(CACHE_DIR, f"{base}{suffix}"))
-        except Exception:
-            pass
+    st.session_state["pending_files"].pop(filename, None)
+    st.session_state["cached_files"].pop(filename, None)
+    remove_from_cache(filename, CACHE_DIR)
+    get_shared_cache().invalidate(filename)
+
+def ensure_row_catalog():
+    # 행 카탈로그(SQLite)를 쓰는 화면에서만 동기화 (첫 화면 목록 로딩은 manifest만 읽음)
+    with st.spinner("행 카탈로그 확인 중..."):
+        get_shared_cache().ensure_catalog()
+
+def get_eval_view(filename):
+    # 선택/다운로드 시점에만 평가 결과 파일을 memory map으로 연결 (세션 간 공유)
+    return get_shared_cache().get(st.session_state["session_handle"], filename)[0]
+
+def get_score_summary(filename):
+    # (평가 파일 hash, 지표)별 히스토그램/박스플롯 요약은 디스크에 한 번만 계산
+    eval_hash = st.session_state["cached_files"][filename].get("eval_hash")
+    if eval_hash is None:
+        return None
+    return load_score_summary(filename, eval_hash, all_metrics, CACHE_DIR)
+
+def offer_download(path, label, file_name):
+    # static 서빙이 켜져 있으면 디스크 파일 링크로 전송, 아니면 download_button으로 파일 전달
+    if st.get_option("server.enableStaticServing"):
+        st.markdown(f'<a href="{export_url(path)}" download="{file_name}">⬇️ {label}</a>', unsafe_allow_html=True)
+    else:
+        with open(path, "rb") as f:
+            st.download_button(label=label, data=f, file_name=file_name, mime="application/octet-stream")
+
+def make_pivot_df(type_emotion_counter, emotion_order):
+    pivot_data = []
+    for post_type, emotion_counter in type_emotion_counter.items():
+        row = {"post_type": post_type}
+        for emotion in emotion_order:
+            row[emotion] = emotion_counter.get(emotion, 0)
+        for emotion, count in emotion_counter.items():
+            if emotion not in emotion_order:
+                row[emotion] = count
+        pivot_data.append(row)
+    if not pivot_data:
+        return pd.DataFrame(columns=["post_type"] + list(emotion_order)).set_index("post_type")
+    return pd.DataFrame(pivot_data).set_index("post_type")
+
+def sync_eval_jobs():
+    # 끝난 평가 작업은 캐시/manifest로 옮기고, 남은 워커 수만큼 대기 작업 시작
+    # Returns: 이번에 캐시로 옮긴 파일명 목록
+    collected = list(collect_finished_jobs(all_metrics, CACHE_DIR))
+    for fname in collected:
+        st.session_state["pending_files"].pop(fname, None)
+        get_shared_cache().invalidate(fname)
+        st.toast(f"✅ {fname} 평가 및 통계 완료!")
+    start_workers(st.session_state.get("eval_max_workers", DEFAULT_MAX_WORKERS), CACHE_DIR)
+    return collected
+
+JOB_STATUS_LABELS = {
+    "queued": "⏳ 대기", "running": "🔄 평가 중", "sampled": "🎯 표본 평가 완료", "done": "✅ 완료", "failed": "❌ 실패"
+}
+
+def show_sample_summary(job):
+    # 표본 평가 결과: 층화 평균과 bootstrap 신뢰구간
+    sample = job["sample"]
+    st.caption(
+        f"표본 {sample['rows']:,}개 / 전체 {sample['total_rows']:,}개 (셀 {sample['cells']}개), "
+        f"{sample.get('elapsed', 0):.1f}초, {sample['confidence'] * 100:.0f}% 신뢰구간"
+    )
+    st.dataframe(pd.DataFrame([
+        {
+            "지표": metric_labels.get(metric, metric), "표본 평균": stat["mean"],
+            "CI 하한": stat["ci_low"], "CI 상한": stat["ci_high"], "표본 수": stat["count"],
+        }
+        for metric, stat in sample["metrics"].items()
+    ]), use_container_width=True, hide_index=True)
+
+def show_eval_jobs():
+    # 이번 갱신에서 실제로 캐시에 옮긴 작업이 있을 때만 전체 화면 다시 그림
+    # (다른 세션이 수집 중인 done 작업은 그 세션이 끝낼 때까지 목록에만 표시)
+    if sync_eval_jobs():
+        st.rerun()
+    jobs = list_jobs(CACHE_DIR)
+    if not jobs:
+        return
+    st.markdown("#### 평가 작업 진행 상황")
+    for job in jobs:
+        col_name, col_progress, col_remove = st.columns([3, 5, 1])
+        with col_name:
+            cascade = " · 🪜 cascade" if job.get("cascade_thresholds") else ""
+            st.markdown(f"**{job['filename']}**  \n{JOB_STATUS_LABELS.get(job['status'], job['status'])}{cascade}")
+        with col_progress:
+            stage = f" ({job['stage']})" if job["status"] == "running" and job.get("stage") else ""
+            if job["status"] == "running" and job.get("phase") == "sample":
+                stage = f" (표본{', ' + job['stage'] if job.get('stage') else ''})"
+            st.progress(job["progress"], text=f"{job['progress'] * 100:.1f}%{stage}")
+        with col_remove:
+            if st.button("삭제", key=f"remove_job_{job['job_id']}"):
+                remove_job(job["job_id"], CACHE_DIR)
+                st.session_state["pending_files"].pop(job["filename"], None)
+                st.rerun()
+        if job.get("sample"):
+            show_sample_summary(job)
+        if job["status"] == "sampled" and st.button("전체 평가 계속", key=f"continue_job_{job['job_id']}"):
+            continue_job(job["job_id"], CACHE_DIR)
+            st.rerun()
+        if job["status"] == "failed":
+            st.error(f"평가 실패: {job['filename']}\n{job.get('error', '')}")
+
+def get_score_store(filename):
+    if st.session_state["cached_files"][filename].get("rows") is None:
+        return None
+    return get_shared_cache().get(st.session_state["session_handle"], filename)[1]
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def get_dataset_diff(base, target, base_hash, target_hash):
+    # 두 평가 파일 hash가 같으면 비교 결과 재사용 (행 카탈로그 hash index join)
+    return diff_datasets(base, target, all_metrics, CACHE_DIR)
+
+def show_dataset_diff(selected_metrics):
+    diff_files = [fname for fname, entry in st.session_state["cached_files"].items() if entry.get("eval_hash")]
+    if len(diff_files) < 2:
+        st.info("비교할 평가 완료 데이터셋이 2개 이상 필요합니다.")
+        return
+    diff_cols = st.columns(2)
+    with diff_cols[0]:
+        base = st.selectbox("이전 버전", diff_files, index=0, key="diff_base")
+    with diff_cols[1]:
+        target = st.selectbox("새 버전", diff_files, index=len(diff_files) - 1, key="diff_target")
+    if base == target:
+        st.info("서로 다른 데이터셋을 선택하세요.")
+        return
+    ensure_row_catalog()
+    diff = get_dataset_diff(
+        base, target,
+        st.session_state["cached_files"][base]["eval_hash"], st.session_state["cached_files"][target]["eval_hash"]
+    )
+    count_cols = st.columns(4)
+    for col, (label, count) in zip(count_cols, [
+        ("동일", len(diff["unchanged"][0])), ("변경", len(diff["rewritten"][0])),
+        ("삭제", len(diff["removed"])), ("추가", len(diff["added"])),
+    ]):
+        col.metric(label, f"{count:,}")
+
+    delta_summary = summarize_deltas({metric: diff["deltas"][metric] for metric in selected_metrics})
+    st.caption("변경된 행의 지표별 점수 변화 (새 버전 - 이전 버전)")
+    st.dataframe(pd.DataFrame([
+        {"지표": metric_labels[metric], "행 개수": summary["count"], "평균 변화": summary["mean"], "상승": summary["improved"], "하락": summary["worsened"]}
+        for metric, summary in delta_summary.items()
+    ]), use_container_width=True)
+
+    kind = st.radio("확인할 행 (최대 100개)", ["변경", "삭제", "추가"], horizontal=True, key="diff_kind")
+    if kind == "변경":
+        base_rows = fetch_rows(base, diff["rewritten"][0], limit=100, cache_dir=CACHE_DIR)
+        target_rows = fetch_rows(target, diff["rewritten"][1], limit=100, cache_dir=CACHE_DIR)
+        table = []
+        for i, (old, new) in enumerate(zip(base_rows, target_rows)):
+            row = {
+                "content": new["content"],
+                "이전 post_type/emotion": f"{old['post_type']}/{old['emotion']}",
+                "새 post_type/emotion": f"{new['post_type']}/{new['emotion']}",
+                "이전 변환문": old["transformed_content"],
+                "새 변환문": new["transformed_content"],
+            }
+            row.update({f"Δ {metric_labels[metric]}": diff["deltas"][metric][i] for metric in selected_metrics})
+            table.append(row)
+        st.dataframe(pd.DataFrame(table), use_container_width=True)
+    elif kind == "삭제":
+        st.dataframe(pd.DataFrame(fetch_rows(base, diff["removed"], limit=100, cache_dir=CACHE_DIR)), use_container_width=True)
+    else:
+        st.dataframe(pd.DataFrame(fetch_rows(target, diff["added"], limit=100, cache_dir=CACHE_DIR)), use_container_width=True)
 
 # =========================
 # Streamlit 앱 시작
 # =========================
 st.title("말투변환 모델 성능 테스트")
 
-# --- 캐시 폴더에서 기존 평가 결과 자동 로딩 ---
-if "cached_files" not in st.session_state:
-    st.session_state["cached_files"] = load_all_cached_files()
+# --- 캐시 폴더의 manifest(데이터셋 목록/행 개수/평균/분포)만 로딩, 행 데이터는 선택 시 로딩 ---
+if "session_handle" not in st.session_state:
+    st.session_state["session_handle"] = SessionHandle()
+    st.session_state["pending_files"] = {}
+refresh_cached_files()
 
 # 규칙 보기 toggle
 if st.toggle("데이터 업로드 규칙 보기(업로드 중 금지)"):
@@ -159,6 +290,16 @@ metric_labels = {
 
 all_metrics = list(metric_labels.keys())
 
+default_thresholds = {
+    "kobertscore_f1": 0.6,
+    "type_score": 0.8,
+    "quality_score": 0.8,
+    "bleu_score": 0.2,
+    "perplexity_score": 0.5,
+}
+# cascade 평가에서 먼저 계산하는 가벼운 지표 (통과한 행만 KoBERT/Perplexity 계산)
+CASCADE_METRICS = ["type_score", "quality_score", "bleu_score"]
+
 # --- 업로드 파일 및 평가 결과 캐싱 ---
 uploaded_files = st.file_uploader(
     "여러 개의 JSONL 데이터 파일을 업로드하세요. (분포 통계 및 모델 평가 자동 진행)",
@@ -167,51 +308,65 @@ uploaded_files = st.file_uploader(
     key="data_and_eval"
 )
 
-# 새로 업로드된 파일을 캐시에 저장 및 평가/통계 수행
+st.number_input(
+    "동시에 실행할 평가 작업 수",
+    min_value=1, max_value=8, value=DEFAULT_MAX_WORKERS, step=1,
+    key="eval_max_workers"
+)
+
+eval_sample_cols = st.columns(3)
+with eval_sample_cols[0]:
+    sample_first = st.toggle("표본 평가 먼저 (post_type × emotion 셀별)", value=False, key="sample_first")
+if sample_first:
+    with eval_sample_cols[1]:
+        sample_per_cell = st.number_input("셀당 표본 개수", min_value=1, value=20, step=5, key="eval_sample_per_cell")
+    with eval_sample_cols[2]:
+        sample_continue = st.checkbox("표본 평가 후 전체 평가 계속", value=True, key="eval_sample_continue")
+
+# 필터링용 평가: 현재 선택한 type/quality/BLEU threshold를 통과한 행만 모델 지표(KoBERT/Perplexity) 계산
+cascade_eval = st.toggle(
+    "필터링용 cascade 평가 (Type/Quality/BLEU threshold 미달 행은 KoBERT/Perplexity 생략)",
+    value=False, key="cascade_eval"
+)
+cascade_thresholds = {
+    metric: float(st.session_state.get(f"thres_{metric}", default_thresholds[metric]))
+    for metric in CASCADE_METRICS
+    if st.session_state.get(f"metric_{metric}", True)
+} if cascade_eval else None
+if cascade_eval:
+    st.caption("cascade 기준: " + ", ".join(f"{metric_labels[m]} ≥ {t}" for m, t in cascade_thresholds.items()))
+
+# 새로 업로드된 파일은 평가 작업 큐에 등록 (평가는 별도 워커 프로세스에서 진행)
 if uploaded_files:
+    queued_files = active_job_files(CACHE_DIR, HELD_STATUSES)
     for f in uploaded_files:
         fname = f.name
         if not fname or not isinstance(fname, str):
             st.error("잘못된 파일명입니다. 파일을 다시 업로드 해주세요.")
             continue
-        if fname not in st.session_state["cached_files"]:
+        if fname not in st.session_state["cached_files"] and fname not in queued_files:
             remove_file_from_cache(fname)
-            st.session_state["cached_files"][fname] = {"data": f.getvalue(), "eval": None, "mean_scores": None, "dist": None}
-            dist = get_data_distribution(f.getvalue())
-            st.session_state["cached_files"][fname]["dist"] = dist
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".jsonl") as tmp_file:
-                tmp_file.write(f.getvalue())
-                tmp_path = tmp_file.name
-            eval_path = tmp_path.replace(".jsonl", "_eval.jsonl")
-            main_eval_path = os.path.join(os.path.dirname(__file__), "functions", "main_eval.py")
-            with st.spinner(f"모델 평가 수행 중: {fname}"):
-                result = subprocess.run(
-                    [
-                        "python", main_eval_path,
-                        "--input_path", tmp_path,
-                        "--output_path", eval_path,
-                        "--use_kobert", "--use_type", "--use_quality", "--use_bleu", "--use_perplexity"
-                    ],
-                    capture_output=True, text=True
-                )
-            if result.returncode != 0:
-                st.error(f"평가 실패: {fname}\n{result.stderr}")
-                continue
-            with open(eval_path, "rb") as f_eval:
-                eval_jsonl_bytes = f_eval.read()
-                st.session_state["cached_files"][fname]["eval"] = eval_jsonl_bytes
-            results = load_eval_results(eval_path)
-            mean_scores = get_mean_scores(results, all_metrics)
-            st.session_state["cached_files"][fname]["mean_scores"] = mean_scores
-            st.success(f"✅ {fname} 평가 및 통계 완료!")
-            save_eval_to_cache(
-                fname,
-                eval_jsonl_bytes,
-                mean_scores,
-                dist,
-                f.getvalue()
+            # 업로드 파일은 청크 단위로 디스크에 한 번만 저장하고, 이후에는 경로/memory map으로만 사용
+            input_path = spool_upload(f, CACHE_DIR)
+            input_view = open_file_view(input_path)
+            dist = get_data_distribution(input_view)
+            if hasattr(input_view, "close"):
+                input_view.close()
+            st.session_state["pending_files"][fname] = {"rows": None, "mean_scores": None, "dist": dist}
+            enqueue_job(
+                fname, input_path, CACHE_DIR,
+                sample_per_cell=int(sample_per_cell) if sample_first else None,
+                sample_only=sample_first and not sample_continue,
+                cascade_thresholds=cascade_thresholds
             )
 
+sync_eval_jobs()
+refresh_cached_files()
+
+# 작업이 남아있는 동안에만 2초마다 진행률 갱신
+has_active_jobs = bool(active_job_files(CACHE_DIR))
+st.fragment(run_every=2 if has_active_jobs else None)(show_eval_jobs)()
+
 # 캐시 파일명 리스트 생성 시 문자열만 포함
 cached_file_names = [k for k in st.session_state["cached_files"].keys() if isinstance(k, str) and k]
 
@@ -220,55 +375,54 @@ selected_cached_files = st.multiselect(
     cached_file_names,
     default=[],
 )
+# 선택 해제된 데이터셋의 공유 캐시 참조는 해제 (참조가 없는 항목만 메모리 예산 초과 시 내려감)
+get_shared_cache().retain(st.session_state["session_handle"], selected_cached_files)
 
 st.markdown("#### 평가 결과 파일(jsonl) 다운로드")
 download_file = st.selectbox(
     "다운로드할 평가 결과 파일을 선택하세요.",
-    cached_file_names
+    cached_file_names,
+    index=None
 )
 if download_file:
-    eval_bytes = st.session_state["cached_files"][download_file].get("eval")
-    if eval_bytes is not None:
-        st.download_button(
-            label=f"다운로드",
-            data=eval_bytes,
-            file_name=f"{os.path.splitext(download_file)[0]}_eval.jsonl",
-            mime="application/json"
-        )
+    if st.session_state["cached_files"][download_file].get("rows") is not None:
+        # 캐시 파일을 exports 폴더에 link 해두고 (평가 파일 hash별로 한 번) 디스크에서 전송
+        link_key = (download_file, st.session_state["cached_files"][download_file].get("eval_hash"))
+        eval_links = st.session_state.setdefault("eval_export_links", {})
+        if link_key not in eval_links or not os.path.exists(eval_links[link_key]):
+            eval_links[link_key] = link_export(
+                cache_path(download_file, "_eval.jsonl", CACHE_DIR), f"{os.path.splitext(download_file)[0]}_eval.jsonl"
+            )
+        offer_download(eval_links[link_key], "다운로드", f"{os.path.splitext(download_file)[0]}_eval.jsonl")
     else:
         st.warning("다운로드할 데이터가 없습니다.")
 
-file_objs = []
+# 선택된 파일은 manifest 정보(분포/평균)만 사용, 행 데이터는 시각화/필터링 시점에 로딩
+file_names = []
 for fname in selected_cached_files:
     if not isinstance(fname, str):
         st.error(f"잘못된 fname: {fname} (type: {type(fname)})")
         continue
-    file_obj = BytesIO(st.session_state["cached_files"][fname]["data"])
-    file_obj.name = fname
-    file_objs.append(file_obj)
+    file_names.append(fname)
 
 scores_list = []
 model_names = []
 table_rows = []
 
-if file_objs:
+if file_names:
     st.markdown("-----------------------")
-    for uploaded_file in file_objs:
-        fname = uploaded_file.name
+    for fname in file_names:
         dist = st.session_state["cached_files"][fname]["dist"]
         st.markdown(f"#### ⬇️ {fname} 데이터 분포 (동물별/감정별)")
-        pivot_data = []
-        for post_type, emotion_counter in dist["type_emotion_counter"].items():
-            row = {"post_type": post_type}
-            for emotion in dist["emotion_order"]:
-                row[emotion] = emotion_counter.get(emotion, 0)
-            for emotion, count in emotion_counter.items():
-                if emotion not in dist["emotion_order"]:
-                    row[emotion] = count
-            pivot_data.append(row)
-        pivot_df = pd.DataFrame(pivot_data).set_index("post_type")
+        pivot_df = make_pivot_df(dist["type_emotion_counter"], dist["emotion_order"])
         st.dataframe(pivot_df, use_container_width=True)
         st.success(f"✅ 총 데이터 개수: {dist['total_count']} / 중복 없는 원문 개수: {dist['unique_content_count']}")
+        cascade_skipped = st.session_state["cached_files"][fname].get("cascade_skipped", 0)
+        if cascade_skipped:
+            st.info(
+                f"🪜 cascade 평가: {cascade_skipped}개 행은 Type/Quality/BLEU threshold 미달로 KoBERT/Perplexity 생략 "
+                "(해당 지표 평균은 계산된 행 기준)"
+            )
 
         model_name = os.path.splitext(fname)[0]
         model_names.append(model_name)
@@ -288,13 +442,6 @@ if file_objs:
         thresholds = {}
         cols = st.columns(len(all_metrics))
 
-        default_thresholds = {
-            "kobertscore_f1": 0.6,
-            "type_score": 0.8,
-            "quality_score": 0.8,
-            "bleu_score": 0.2,
-            "perplexity_score": 0.5,
-        }
         for i, metric in enumerate(all_metrics):
             label = metric_labels[metric]
             with cols[i]:
@@ -316,17 +463,20 @@ if file_objs:
 
 
             st.markdown("#### 선택한 지표별 점수 분포 (히스토그램 & 박스플롯)")
-            eval_jsonl_bytes_list = [
-                st.session_state["cached_files"][fname]["eval"] for fname in selected_cached_files
-            ]
+            score_stores = [get_score_store(fname) for fname in selected_cached_files]
             plot_score_distribution(
-                eval_jsonl_bytes_list,
+                [get_score_summary(fname) for fname in selected_cached_files],
                 [os.path.splitext(fname)[0] for fname in selected_cached_files],
                 selected_metrics,
                 metric_labels=metric_labels,
-                thresholds=thresholds
+                thresholds=thresholds,
+                summary_keys=[st.session_state["cached_files"][fname].get("eval_hash") for fname in selected_cached_files]
             )
 
+            st.markdown("-----------------------")
+            st.markdown("#### 데이터셋 버전 비교 (행 단위: 동일/변경/삭제/추가)")
+            show_dataset_diff(selected_metrics)
+
             st.markdown("-----------------------")
             st.markdown("#### 선택된 데이터 전체를 합쳐서 필터링 및 다운로드")
             if selected_cached_files:
@@ -337,53 +487,82 @@ if file_objs:
             thres_str = ", ".join([f"{metric_labels[m]}: {thresholds[m]}" for m in thresholds])
             st.success(f"✅ 적용된 threshold 값: {thres_str}")
 
-            eval_jsonl_bytes_list = [
-                st.session_state["cached_files"][fname]["eval"] for fname in selected_cached_files
+            evaluated_files = [
+                fname for fname, store in zip(selected_cached_files, score_stores) if store is not None
             ]
+            evaluated_stores = [store for store in score_stores if store is not None]
+
+            # threshold 변경 즉시 통과 개수 미리보기 (점수 컬럼 mask만 사용)
+            preview = pass_count_preview(evaluated_stores, thresholds)
+            st.markdown("#### threshold 통과 데이터 개수 (미리보기)")
+            preview_cols = st.columns(len(thresholds) + 1)
+            for i, metric in enumerate(thresholds):
+                with preview_cols[i]:
+                    st.metric(metric_labels[metric], f"{preview['metric_pass'][metric]:,}")
+            with preview_cols[-1]:
+                st.metric("전체 통과", f"{preview['passed_count']:,}", f"-{preview['total_count'] - preview['passed_count']:,}")
+            emotion_order = ["normal", "happy", "sad", "grumpy", "angry", "curious"]
+            st.caption(f"threshold 통과 행의 중복 없는 원문 개수: {preview['unique_content_count']:,}")
+            st.dataframe(make_pivot_df(preview["type_emotion_counter"], emotion_order), use_container_width=True)
+
+            with st.expander("threshold 통과 행 검색 (원문/변환문)"):
+                search_text = st.text_input("검색어", key="row_search_text")
+                if search_text:
+                    ensure_row_catalog()
+                    found = search_rows(evaluated_files, thresholds, search_text, limit=100)
+                    st.caption(f"최대 100개까지 표시: {len(found)}개")
+                    st.dataframe(pd.DataFrame(found), use_container_width=True)
+
+            dedup = st.checkbox("데이터셋 간 중복 행 제거", value=True, key="dedup_rows")
+            balance = st.checkbox("post_type × emotion 셀별 균형 샘플링", value=False, key="balance_rows")
+            if balance:
+                sample_cols = st.columns(3)
+                with sample_cols[0]:
+                    per_cell = st.number_input("셀당 개수", min_value=1, value=500, step=50, key="sample_per_cell")
+                with sample_cols[1]:
+                    sample_seed = st.number_input("seed", min_value=0, value=42, step=1, key="sample_seed")
+                with sample_cols[2]:
+                    prefer_high = st.checkbox("점수 평균이 높은 행 우선", value=False, key="sample_prefer_high")
+
+            compressions = available_compressions()
+            compression = st.selectbox(
+                "내보내기 압축 형식", compressions, index=compressions.index("gzip"), key="export_compression"
+            )
 
             if st.button("필터링"):
-                total_before = sum(
-                    len(st.session_state["cached_files"][fname]["eval"].decode("utf-8").splitlines())
-                    for fname in selected_cached_files
+                total_before = preview["total_count"]
+                eval_views = [get_eval_view(fname) for fname in evaluated_files]
+                # threshold 통과 행 인덱스 (중복 제거 시 행 카탈로그 index 조회, 아니면 점수 컬럼 mask)
+                if dedup:
+                    ensure_row_catalog()
+                indices_list = passed_row_indices(evaluated_files, evaluated_stores, thresholds, dedup=dedup)
+                if balance:
+                    # 셀별 행 인덱스 배열을 한 번 만들고, 셀마다 per_cell 개씩 추출
+                    cells = build_cells(evaluated_stores, indices_list)
+                    indices_list, cell_counts = stratified_sample(
+                        cells, len(evaluated_stores), int(per_cell), seed=int(sample_seed),
+                        prefer_high_scores=prefer_high, score_stores=evaluated_stores, metrics=list(thresholds)
+                    )
+                    short_cells = [f"{pt}/{emo}: {n}" for (pt, emo), n in cell_counts.items() if n < per_cell]
+                    if short_cells:
+                        st.warning(f"셀당 {int(per_cell)}개보다 적은 셀: " + ", ".join(short_cells))
+                total_after = int(sum(len(indices) for indices in indices_list))
+
+                # 다운로드 파일은 행 인덱스 청크 단위로 디스크에 바로 기록 (점수 필드 제외, 선택 시 압축)
+                export_path = write_jsonl_export(
+                    eval_views, evaluated_stores, indices_list, compression=compression
                 )
-                # threshold 기준 필터링
-                filtered_data = filter_jsonl_bytes_by_threshold(eval_jsonl_bytes_list, thresholds)
-
-                total_after = len(filtered_data)
-
-                score_keys = set(metric_labels.keys())
-                filtered_data_no_scores = []
-                for d in filtered_data:
-                    filtered = {k: v for k, v in d.items() if k not in score_keys}
-                    filtered_data_no_scores.append(filtered)
-
-                filtered_jsonl = "\n".join([json.dumps(d, ensure_ascii=False) for d in filtered_data_no_scores])
 
                 st.write(f"필터링 전 데이터 개수: {total_before} → 필터링 후 데이터 개수: {total_after} (감소: {total_before - total_after})")
 
                 st.markdown("#### 필터링된 데이터셋 분포 통계 (테이블)")
-                from functions.feature_count import get_data_distribution
-                filtered_jsonl_bytes = filtered_jsonl.encode("utf-8")
-                dist = get_data_distribution(filtered_jsonl_bytes)
+                # 분포 통계는 JSONL을 다시 파싱하지 않고 행 인덱스 + 범주 코드/원문 hash 컬럼으로 계산
+                dist = get_distribution_from_indices(evaluated_stores, indices_list)
                 st.success(f"✅ 총 데이터 개수: {dist['total_count']} / 중복 없는 원문 개수: {dist['unique_content_count']}")
 
-                pivot_data = []
-                for post_type, emotion_counter in dist["type_emotion_counter"].items():
-                    row = {"post_type": post_type}
-                    for emotion in dist["emotion_order"]:
-                        row[emotion] = emotion_counter.get(emotion, 0)
-                    for emotion, count in emotion_counter.items():
-                        if emotion not in dist["emotion_order"]:
-                            row[emotion] = count
-                    pivot_data.append(row)
-                pivot_df = pd.DataFrame(pivot_data).set_index("post_type")
+                pivot_df = make_pivot_df(dist["type_emotion_counter"], dist["emotion_order"])
                 st.dataframe(pivot_df, use_container_width=True)
 
-                st.download_button(
-                    label="다운로드",
-                    data=filtered_jsonl.encode("utf-8"),
-                    file_name="filtered_all.jsonl",
-                    mime="application/json"
-                )
+                offer_download(export_path, "다운로드", os.path.basename(export_path))
 else:
     st.info("JSONL 파일을 업로드하거나, 캐시에서 파일을 선택하면 모델 평가와 데이터 분포를 확인할 수 있습니다.")
\ No newline at end of file
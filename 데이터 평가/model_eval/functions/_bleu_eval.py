@@ -17,7 +17,8 @@ class BleuEvaluator:
     def evaluate_jsonl(
         self,
         jsonl_path: str,
-        output_path: Optional[str] = None
+        output_path: Optional[str] = None,
+        progress=None
     ) -> List[Optional[float]]:
         bleu_scores: List[Optional[float]] = []
         output_data: List[Dict] = []
@@ -37,6 +38,8 @@ class BleuEvaluator:
                     data["bleu"] = None
                     data["bleu_score"] = None
                 output_data.append(data)
+                if progress is not None:
+                    progress(1)
         if output_path is not None:
             with open(output_path, "w", encoding="utf-8") as f:
                 for item in output_data:
@@ -19,7 +19,7 @@ class KobertEvaluator:
             input_ids = input_ids[:self.max_tokens]
         return self.tokenizer.decode(input_ids, skip_special_tokens=True)
 
-    def evaluate(self, input_path: str, batch_size: int = 128, save_path: str = None) -> float:
+    def evaluate(self, input_path: str, batch_size: int = 128, save_path: str = None, progress=None) -> float:
         results = []
         data_list = []
         candidates = []
@@ -46,9 +46,24 @@ class KobertEvaluator:
         print(f"⭕ 총 {len(data_list)}개 데이터, BERTScore 계산 시작...")
         print(f"-> 데이터셋 : {filename}")
 
-        scores = self.bertscore(references, candidates, batch_size=batch_size)
-        if isinstance(scores, tuple) and len(scores) == 3:
-            _, _, scores = scores  # F1만 사용
+        # 점수는 항상 BERTScore의 기본 IDF(self.bertscore.idf)로 계산 → 행 묶음을 어떻게 나눠도 같은 점수
+        if progress is None:
+            scores = self.bertscore(references, candidates, batch_size=batch_size, retrain_idf=False)
+            if isinstance(scores, tuple) and len(scores) == 3:
+                _, _, scores = scores  # F1만 사용
+        else:
+            # 진행률 보고용: 여러 배치 단위로 나눠 계산하고 끝난 행 수만큼 progress 호출
+            scores = []
+            chunk_size = batch_size * 8
+            for start in range(0, len(references), chunk_size):
+                chunk_scores = self.bertscore(
+                    references[start:start + chunk_size], candidates[start:start + chunk_size],
+                    batch_size=batch_size, retrain_idf=False
+                )
+                if isinstance(chunk_scores, tuple) and len(chunk_scores) == 3:
+                    _, _, chunk_scores = chunk_scores
+                scores.extend(chunk_scores)
+                progress(len(chunk_scores))
 
         f1_list = []
         for idx, (data, f1) in enumerate(zip(data_list, scores), 1):
@@ -75,7 +75,8 @@ class PerplexityEvaluator:
     def calc_perplexity_batch(
         self,
         texts: List[str],
-        batch_size: int = 32
+        batch_size: int = 32,
+        progress=None
     ) -> list:
         """
         텍스트 리스트로 배치 평가 (main.py에서 별도 래핑 필요 없음)
@@ -90,6 +91,8 @@ class PerplexityEvaluator:
                 except Exception:
                     score = 0.0
                 score_list.append(score)
+            if progress is not None:
+                progress(len(batch))
         return score_list
 
 if __name__ == "__main__":
@@ -112,7 +112,7 @@ class QualityEvaluator:
         return min(1.0, max(0.0, ratio))
 
 
-    def evaluate(self, input_path: str):
+    def evaluate(self, input_path: str, progress=None):
         """
         입력 파일의 각 줄에 대해 품질 점수(0~1) 딕셔너리 리스트 반환
         """
@@ -136,6 +136,8 @@ class QualityEvaluator:
                 emoji_scores.append(e_score)
                 total_scores.append(total_score)
                 results.append({"quality_score": total_score})
+                if progress is not None:
+                    progress(1)
 
         print(f"금지어(비속어) 점수 평균: {sum(forbidden_scores)/len(forbidden_scores):.3f}")
         print(f"반복 점수 평균: {sum(repeat_scores)/len(repeat_scores):.3f}")
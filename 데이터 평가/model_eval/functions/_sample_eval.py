@@ -0,0 +1,96 @@
+import json
+import numpy as np
+from typing import Dict, List, Optional
+
+# =========================
+# 표본 평가 (main_eval.py --sample_per_cell)
+# - post_type × emotion 셀마다 최대 per_cell 개를 뽑아 먼저 평가
+# - 셀 비율(전체 행 기준)로 가중한 층화 평균과 bootstrap 신뢰구간 계산
+# - 표본 평가 결과는 row_idx와 함께 저장해서 전체 평가 때 다시 계산하지 않음
+# =========================
+SAMPLE_METRICS = ["kobertscore_f1", "type_score", "quality_score", "bleu_score", "perplexity_score"]
+
+def cell_key(data: dict) -> tuple:
+    return (str(data.get("post_type", "unknown")), str(data.get("emotion", "unknown")))
+
+def stratified_sample_indices(data: List[Dict], per_cell: int, seed: int = 42) -> List[int]:
+    """
+    셀마다 per_cell 개씩 비복원 추출 (셀 행이 부족하면 전부), 원래 행 순서로 반환
+    """
+    cells = {}
+    for idx, row in enumerate(data):
+        cells.setdefault(cell_key(row), []).append(idx)
+    rng = np.random.default_rng(seed)
+    picked = []
+    for key in sorted(cells):
+        rows = cells[key]
+        if len(rows) <= per_cell:
+            picked.extend(rows)
+        else:
+            picked.extend(int(rows[i]) for i in rng.choice(len(rows), size=per_cell, replace=False))
+    return sorted(picked)
+
+def bootstrap_summary(data: List[Dict], sample_indices: List[int], sample_results: List[Dict],
+                      n_boot: int = 1000, confidence: float = 0.95, seed: int = 42) -> Dict:
+    """
+    지표별 층화 평균과 bootstrap 신뢰구간
+    - 셀 가중치: 전체 데이터에서 셀이 차지하는 비율 (점수가 없는 셀은 빼고 다시 정규화)
+    - bootstrap: 셀 안에서 복원 추출한 평균을 가중합 (n_boot 번)
+    """
+    population = {}
+    for row in data:
+        key = cell_key(row)
+        population[key] = population.get(key, 0) + 1
+    rng = np.random.default_rng(seed)
+    alpha = (1.0 - confidence) / 2
+    metrics = {}
+    for metric in SAMPLE_METRICS:
+        cell_scores = {}
+        for idx, result in zip(sample_indices, sample_results):
+            score = result.get(metric)
+            if score is not None:
+                cell_scores.setdefault(cell_key(data[idx]), []).append(float(score))
+        if not cell_scores:
+            continue
+        weights = np.asarray([population[key] for key in cell_scores], dtype=np.float64)
+        weights /= weights.sum()
+        means = np.asarray([np.mean(scores) for scores in cell_scores.values()])
+        boot = np.zeros(n_boot, dtype=np.float64)
+        for weight, scores in zip(weights, cell_scores.values()):
+            scores = np.asarray(scores)
+            boot += weight * scores[rng.integers(0, len(scores), size=(n_boot, len(scores)))].mean(axis=1)
+        metrics[metric] = {
+            "mean": float(weights @ means),
+            "ci_low": float(np.quantile(boot, alpha)),
+            "ci_high": float(np.quantile(boot, 1.0 - alpha)),
+            "count": int(sum(len(scores) for scores in cell_scores.values())),
+        }
+    return {
+        "rows": len(sample_indices),
+        "total_rows": len(data),
+        "cells": len(population),
+        "confidence": confidence,
+        "metrics": metrics,
+    }
+
+def save_sample_results(sample_path: str, data: List[Dict], sample_indices: List[int], sample_results: List[Dict]):
+    with open(sample_path, "w", encoding="utf-8") as f:
+        for idx, result in zip(sample_indices, sample_results):
+            f.write(json.dumps({"row_idx": idx, "data": data[idx], "scores": result}, ensure_ascii=False) + "\n")
+
+def load_sample_results(sample_path: str, data: List[Dict]) -> Optional[Dict[int, Dict]]:
+    """
+    저장된 표본 평가 결과 {row_idx: 점수} 로딩. 입력 데이터와 행이 다르면 None (다시 평가)
+    """
+    results = {}
+    try:
+        with open(sample_path, "r", encoding="utf-8") as f:
+            for line in f:
+                saved = json.loads(line)
+                idx = saved["row_idx"]
+                if idx >= len(data) or saved["data"] != data[idx]:
+                    return None
+                results[idx] = saved["scores"]
+    except (OSError, ValueError, KeyError):
+        return None
+    return results
@@ -94,7 +94,7 @@ class TypeEvaluator:
         else:
             return -1
 
-    def evaluate(self, input_path: str, output_path:str =None) -> float:
+    def evaluate(self, input_path: str, output_path:str =None, progress=None) -> float:
         results = []
         total_score = 0.0
         count = 0
@@ -110,6 +110,8 @@ class TypeEvaluator:
                 if score is not None:
                     total_score += score
                     count += 1
+                if progress is not None:
+                    progress(1)
 
         # output_path 지정 시만 저장
         if output_path is not None:
@@ -1,49 +1,65 @@
 import re
 import json
 
+# 정규식은 모듈 로딩 시 한 번만 compile
+# 이모지/허용 문자 클래스와 clean_text 규칙은 여기 한 곳에만 둠
+# (dataset/functions/text_normalize.py가 import해서 씀. model_eval 이미지에는 dataset/가 없어서 반대 방향은 불가)
+EMOJI_CLASS = (
+    "[" +
+    "\U0001F600-\U0001F64F"
+    "\U0001F300-\U0001F5FF"
+    "\U0001F680-\U0001F6FF"
+    "\U0001F1E0-\U0001F1FF"
+    "\U00002700-\U000027BF"
+    "\U0001F900-\U0001F9FF"
+    "\U00002600-\U000026FF"
+    "]"
+)
+EMOJI_RE = re.compile(EMOJI_CLASS, flags=re.UNICODE)
+ALLOWED_CHARS = (
+    r'가-힣'
+    r'a-zA-Z0-9'
+    r' .,!?~'
+    r'🐾😢🔥😤❓❤️🧡💛💚💙💜🖤🤍🤎'
+    r'🐕🐩🐈🐈‍⬛🐱🐶😹😺😸😻😼😽😾😿🫨'
+    r'😀😁😂🤣😃😄😅😆😉😊😋😎😍😘🥰😗😙😚🙂🤗🤩'
+    r'🤔🤨😐😑😶🙄😏😣😥😮🤐😯😪😫🥱😴😌😛😜😝🤤'
+    r'😒😓😔😕🙃🤑😲☹️🙁😖😞😟😤😢😭😦😧😨😩🤯😬😰😱😳🥺😵🥶🥵😡😠🤬😷🤒🤕🤢🤮🥵🥶🥴🤧'
+    r'🐻🦊🐼🐷🐮🐸🐵🐔🦄🦁🐯🐴🦓🦍🐧🦆🦉🦇🦜🦋'
+    r'🍖🍗🍕🍔🍟🌭🍿🍩🍪🍫🍬🍭🍡🍨🍧🍦🍤🍣🍚🍙🍘🥚🥞🥯🥐🥖🍞🥨'
+    r'❤️🧡💛💚💙💜🖤🤍🤎💔💕💞💓💗💖💘💝💟'
+    r'💤💢💦💧💫💥💬💭🗯️✨⭐🌟🔥🌈☁️⛈️❄️🌤️🌙☀️'
+)
+# 허용 문자 "이외"의 문자에 매칭 (sub("")로 지우는 용도, 기존 get_allowed_char_pattern 반환값과 같음)
+NOT_ALLOWED_CHAR_RE = re.compile(rf'[^{ALLOWED_CHARS}]')
+ESCAPED_NEWLINE_RE = re.compile(r"(\\r\\n|\\n|\\r|rn)")
+URL_REMOVE_RE = re.compile(r"https?://\S+|www\.\S+")
+REPEATED_CHUNK_RE = re.compile(r'(\S{1,5})\1{3,}')
+EMOJI_RUN_RE = re.compile(r'((?:' + EMOJI_RE.pattern + r')){4,}')
+WHITESPACE_RE = re.compile(r'\s+')
+
 def get_emoji_pattern():
-    return re.compile(
-        "[" +
-        "\U0001F600-\U0001F64F"
-        "\U0001F300-\U0001F5FF"
-        "\U0001F680-\U0001F6FF"
-        "\U0001F1E0-\U0001F1FF"
-        "\U00002700-\U000027BF"
-        "\U0001F900-\U0001F9FF"
-        "\U00002600-\U000026FF"
-        "]", flags=re.UNICODE
-    )
+    return EMOJI_RE
 
 def get_allowed_char_pattern():
-    allowed = (
-        r'가-힣'
-        r'a-zA-Z0-9'
-        r' .,!?~'
-        r'🐾😢🔥😤❓❤️🧡💛💚💙💜🖤🤍🤎'
-        r'🐕🐩🐈🐈‍⬛🐱🐶😹😺😸😻😼😽😾😿🫨'
-        r'😀😁😂🤣😃😄😅😆😉😊😋😎😍😘🥰😗😙😚🙂🤗🤩'
-        r'🤔🤨😐😑😶🙄😏😣😥😮🤐😯😪😫🥱😴😌😛😜😝🤤'
-        r'😒😓😔😕🙃🤑😲☹️🙁😖😞😟😤😢😭😦😧😨😩🤯😬😰😱😳🥺😵🥶🥵😡😠🤬😷🤒🤕🤢🤮🥵🥶🥴🤧'
-        r'🐻🦊🐼🐷🐮🐸🐵🐔🦄🦁🐯🐴🦓🦍🐧🦆🦉🦇🦜🦋'
-        r'🍖🍗🍕🍔🍟🌭🍿🍩🍪🍫🍬🍭🍡🍨🍧🍦🍤🍣🍚🍙🍘🥚🥞🥯🥐🥖🍞🥨'
-        r'❤️🧡💛💚💙💜🖤🤍🤎💔💕💞💓💗💖💘💝💟'
-        r'💤💢💦💧💫💥💬💭🗯️✨⭐🌟🔥🌈☁️⛈️❄️🌤️🌙☀️'
-    )
-    return re.compile(rf'[^{allowed}]')
+    # 이름과 달리 허용 문자 이외의 문자에 매칭하는 패턴 (기존 동작 유지)
+    return NOT_ALLOWED_CHAR_RE
+
+def _first_three(m):
+    return m.group(0)[:3]
 
 def clean_text(text):
     # 1. rn, \r\n, \n, \r → 공백
-    text = re.sub(r"(\\r\\n|\\n|\\r|rn)", " ", text)
+    text = ESCAPED_NEWLINE_RE.sub(" ", text)
     # 2. URL 제거
-    text = re.sub(r"https?://\S+|www\.\S+", "", text)
+    text = URL_REMOVE_RE.sub("", text)
     # 3. 허용 문자 이외 삭제
-    text = get_allowed_char_pattern().sub("", text)
+    text = NOT_ALLOWED_CHAR_RE.sub("", text)
     # 4. 동일 문자 4회 이상 반복 → 2회, 동일 이모지 4회 이상 반복 → 3회
-    text = re.sub(r'(\S{1,5})\1{3,}', r'\1\1', text)
-    text = re.sub(r'((?:' + get_emoji_pattern().pattern + r')){4,}', lambda m: m.group(0)[:3], text)
+    text = REPEATED_CHUNK_RE.sub(r'\1\1', text)
+    text = EMOJI_RUN_RE.sub(_first_three, text)
     # 5. 다중 공백 정리
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+    return WHITESPACE_RE.sub(' ', text).strip()
 
 def clean_jsonl_replace_fields(
     input_path,
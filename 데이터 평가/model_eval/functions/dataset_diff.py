@@ -0,0 +1,132 @@
+import numpy as np
+from functions.score_store import SCORE_METRICS
+from functions.eval_cache import CACHE_DIR
+from functions.row_catalog import TEXT_FIELDS, connect
+
+# =========================
+# 두 데이터셋 버전의 행 단위 비교 (행 카탈로그의 hash 컬럼 index로 join)
+# - unchanged: 입력과 변환문이 모두 같은 행 (content_hash 일치)
+# - rewritten: 원문은 같고 변환문(또는 post_type/emotion)이 바뀐 행
+#   (source_hash(원문+post_type+emotion) 일치를 먼저, 남은 행은 text_hash(원문) 일치로 짝지음)
+# - removed / added: 이전 버전에만 / 새 버전에만 있는 행
+# 같은 hash가 여러 번 나오면 row_idx 순서대로 하나씩 짝지음
+# =========================
+
+# 이미 짝지어진 행(matched_base/matched_target temp table)은 빼고 {key}로 묶어 row_idx 순서대로 번호(occ)를 매김
+_OCC_SQL = """
+    SELECT {key}, ROW_NUMBER() OVER (PARTITION BY {key} ORDER BY row_idx) AS occ, row_idx
+    FROM rows WHERE dataset = ? AND row_idx NOT IN (SELECT row_idx FROM matched_{side})
+"""
+MATCH_KEYS = ["content_hash", "source_hash", "text_hash"]
+
+def _pairs(conn, key: str, base: str, target: str):
+    """
+    target 쪽 (hash, occ)를 primary key temp table로 만들고 base 쪽 행을 index 조회로 join
+    """
+    conn.execute("DELETE FROM target_occ")
+    conn.execute(f"INSERT INTO target_occ {_OCC_SQL.format(key=key, side='target')}", (target,))
+    pairs = conn.execute(
+        f"""SELECT base.row_idx, target_occ.row_idx
+            FROM ({_OCC_SQL.format(key=key, side='base')}) AS base
+            JOIN target_occ ON target_occ.hash = base.{key} AND target_occ.occ = base.occ""",
+        (base,)
+    ).fetchall()
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+    for side, indices in (("base", pairs[:, 0]), ("target", pairs[:, 1])):
+        conn.executemany(f"INSERT INTO matched_{side} VALUES (?)", ((int(i),) for i in indices))
+    return pairs
+
+def _row_count(conn, dataset: str) -> int:
+    return conn.execute("SELECT COUNT(*) FROM rows WHERE dataset = ?", (dataset,)).fetchone()[0]
+
+def _metric_values(conn, dataset: str, indices, metrics) -> dict:
+    # 행 카탈로그의 점수(float32 값)를 row_idx 순서로 읽기
+    values = {metric: np.full(len(indices), np.nan, dtype=np.float64) for metric in metrics}
+    if not len(indices):
+        return values
+    rows = conn.execute(
+        f"SELECT row_idx, {', '.join(metrics)} FROM rows WHERE dataset = ?", (dataset,)
+    ).fetchall()
+    table = np.asarray([[np.nan if v is None else v for v in row] for row in rows], dtype=np.float64)
+    position = np.full(int(table[:, 0].max()) + 1, -1, dtype=np.int64)
+    position[table[:, 0].astype(np.int64)] = np.arange(len(table))
+    for i, metric in enumerate(metrics):
+        values[metric] = table[position[np.asarray(indices)], i + 1]
+    return values
+
+def diff_datasets(base: str, target: str, metrics=SCORE_METRICS, cache_dir: str = CACHE_DIR) -> dict:
+    """
+    base(이전 버전) → target(새 버전) 행 단위 비교
+    Returns: {
+        "unchanged": (base row_idx 배열, target row_idx 배열),
+        "rewritten": (base row_idx 배열, target row_idx 배열),
+        "removed": base row_idx 배열, "added": target row_idx 배열,
+        "deltas": {지표: rewritten 행의 점수 차이(target - base) 배열}
+    }
+    """
+    metrics = [metric for metric in metrics if metric in SCORE_METRICS]
+    conn = connect(cache_dir)
+    try:
+        for side in ("base", "target"):
+            conn.execute(f"CREATE TEMP TABLE matched_{side} (row_idx INTEGER PRIMARY KEY)")
+        conn.execute(
+            "CREATE TEMP TABLE target_occ (hash TEXT, occ INTEGER, row_idx INTEGER, PRIMARY KEY (hash, occ)) WITHOUT ROWID"
+        )
+        unchanged, *rewritten = [_pairs(conn, key, base, target) for key in MATCH_KEYS]
+        # target row_idx 순서로 정렬해서 (base 배열, target 배열)로 분리
+        unchanged, rewritten = [
+            (pairs[order, 0], pairs[order, 1])
+            for pairs in (unchanged, np.concatenate(rewritten))
+            for order in [np.argsort(pairs[:, 1], kind="stable")]
+        ]
+        removed = np.setdiff1d(
+            np.arange(_row_count(conn, base)), np.concatenate([unchanged[0], rewritten[0]]), assume_unique=True
+        )
+        added = np.setdiff1d(
+            np.arange(_row_count(conn, target)), np.concatenate([unchanged[1], rewritten[1]]), assume_unique=True
+        )
+        base_scores = _metric_values(conn, base, rewritten[0], metrics)
+        target_scores = _metric_values(conn, target, rewritten[1], metrics)
+    finally:
+        conn.close()
+    return {
+        "unchanged": unchanged,
+        "rewritten": rewritten,
+        "removed": removed,
+        "added": added,
+        "deltas": {metric: target_scores[metric] - base_scores[metric] for metric in metrics},
+    }
+
+def summarize_deltas(deltas: dict) -> dict:
+    """
+    지표별 rewritten 행의 점수 변화 요약 (점수가 없는 행 제외)
+    """
+    summary = {}
+    for metric, values in deltas.items():
+        values = values[~np.isnan(values)]
+        summary[metric] = {
+            "count": int(values.size),
+            "mean": float(values.mean()) if values.size else None,
+            "improved": int((values > 0).sum()),
+            "worsened": int((values < 0).sum()),
+        }
+    return summary
+
+def fetch_rows(dataset: str, indices, limit: int = 100, cache_dir: str = CACHE_DIR) -> list:
+    """
+    비교 결과 확인용으로 행 카탈로그에서 post_type/emotion/원문/변환문 읽기 (앞에서부터 limit개)
+    """
+    indices = [int(i) for i in np.asarray(indices)[:limit]]
+    if not indices:
+        return []
+    columns = ["row_idx", "post_type", "emotion"] + TEXT_FIELDS
+    conn = connect(cache_dir)
+    try:
+        rows = conn.execute(
+            f"SELECT {', '.join(columns)} FROM rows WHERE dataset = ? AND row_idx IN ({', '.join(['?'] * len(indices))})",
+            [dataset] + indices
+        ).fetchall()
+    finally:
+        conn.close()
+    by_idx = {row[0]: dict(zip(columns, row)) for row in rows}
+    return [by_idx[i] for i in indices if i in by_idx]
@@ -0,0 +1,198 @@
+import os
+import json
+import mmap
+import shutil
+import hashlib
+from functions.score_store import save_score_store, load_or_build_score_store, row_count, summarize_scores
+
+# =========================
+# 캐시 폴더 관련 함수
+# =========================
+CACHE_DIR = "./cache"
+MANIFEST_NAME = "manifest.json"
+SUMMARY_DIR = "_summary"
+UPLOAD_DIR = "_uploads"
+CACHE_SUFFIXES = ["_eval.jsonl", "_scores.npz", "_mean.json", "_dist.json", "_data.jsonl"]
+
+def ensure_cache_dir(cache_dir: str = CACHE_DIR):
+    if not os.path.exists(cache_dir):
+        os.makedirs(cache_dir)
+
+def cache_path(filename: str, suffix: str, cache_dir: str = CACHE_DIR) -> str:
+    base = os.path.splitext(filename)[0]
+    return os.path.join(cache_dir, f"{base}{suffix}")
+
+def _read_json(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _write_json(path: str, obj):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def build_manifest_entry(filename: str, cache_dir: str = CACHE_DIR) -> dict:
+    """
+    데이터셋 하나의 목록용 요약 정보(행 개수, 평균 점수, 분포) 생성
+    """
+    eval_path = cache_path(filename, "_eval.jsonl", cache_dir)
+    score_store = load_or_build_score_store(eval_path, cache_path(filename, "_scores.npz", cache_dir))
+    return {
+        "rows": row_count(score_store),
+        "cascade_skipped": int(score_store["cascade_skipped"].sum()),
+        "mean_scores": _read_json(cache_path(filename, "_mean.json", cache_dir)),
+        "dist": _read_json(cache_path(filename, "_dist.json", cache_dir)),
+        "eval_mtime": os.path.getmtime(eval_path),
+        "eval_hash": file_hash(eval_path),
+    }
+
+def load_manifest(cache_dir: str = CACHE_DIR) -> dict:
+    """
+    manifest.json을 읽고, 캐시 폴더와 다른 항목(새로 생긴/삭제된/수정된 평가 파일)만 갱신
+    - 행 단위 데이터(_eval.jsonl, _data.jsonl)는 읽지 않음
+    """
+    ensure_cache_dir(cache_dir)
+    manifest_path = os.path.join(cache_dir, MANIFEST_NAME)
+    try:
+        manifest = _read_json(manifest_path)
+    except Exception:
+        manifest = {}
+
+    changed = False
+    current = {}
+    for fname in os.listdir(cache_dir):
+        if not fname.endswith("_eval.jsonl"):
+            continue
+        name = fname.replace("_eval.jsonl", "") + ".jsonl"
+        entry = manifest.get(name)
+        eval_mtime = os.path.getmtime(os.path.join(cache_dir, fname))
+        if entry is None or entry.get("eval_mtime") != eval_mtime or "eval_hash" not in entry:
+            try:
+                entry = build_manifest_entry(name, cache_dir)
+            except Exception:
+                continue
+            changed = True
+        current[name] = entry
+    if changed or set(current) != set(manifest):
+        _write_json(manifest_path, current)
+    return current
+
+def update_manifest(filename: str, entry: dict, cache_dir: str = CACHE_DIR):
+    manifest_path = os.path.join(cache_dir, MANIFEST_NAME)
+    try:
+        manifest = _read_json(manifest_path)
+    except Exception:
+        manifest = {}
+    if entry is None:
+        manifest.pop(filename, None)
+    else:
+        manifest[filename] = entry
+    _write_json(manifest_path, manifest)
+
+def spool_upload(fileobj, cache_dir: str = CACHE_DIR, chunk_size: int = 1 << 20) -> str:
+    """
+    업로드 파일을 청크 단위로 디스크에 한 번만 기록하고 내용 hash(sha256) 이름의 경로 반환
+    - 같은 내용이 이미 있으면 기존 파일 재사용
+    """
+    upload_dir = os.path.join(cache_dir, UPLOAD_DIR)
+    os.makedirs(upload_dir, exist_ok=True)
+    h = hashlib.sha256()
+    fileobj.seek(0)
+    tmp_path = os.path.join(upload_dir, f".spool_{os.getpid()}_{id(fileobj)}.tmp")
+    with open(tmp_path, "wb") as f:
+        for chunk in iter(lambda: fileobj.read(chunk_size), b""):
+            h.update(chunk)
+            f.write(chunk)
+    path = os.path.join(upload_dir, f"{h.hexdigest()}.jsonl")
+    if os.path.exists(path):
+        os.remove(tmp_path)
+    else:
+        os.replace(tmp_path, path)
+    return path
+
+def _link_or_copy(src: str, dst: str):
+    # 같은 파일시스템이면 hard link(복사 없음), 아니면 복사
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+def save_eval_to_cache(filename: str, eval_path: str, data_path: str, mean_scores: dict, dist: dict, score_store: dict,
+                       cache_dir: str = CACHE_DIR) -> dict:
+    """
+    평가 결과 파일은 캐시로 이동(os.replace), 원본 데이터 파일은 link 해서 저장 (bytes로 다시 읽지 않음)
+    """
+    ensure_cache_dir(cache_dir)
+    cached_eval_path = cache_path(filename, "_eval.jsonl", cache_dir)
+    os.replace(eval_path, cached_eval_path)
+    save_score_store(score_store, cache_path(filename, "_scores.npz", cache_dir))
+    _write_json(cache_path(filename, "_mean.json", cache_dir), mean_scores)
+    _write_json(cache_path(filename, "_dist.json", cache_dir), dist)
+    _link_or_copy(data_path, cache_path(filename, "_data.jsonl", cache_dir))
+    entry = {
+        "rows": row_count(score_store),
+        "cascade_skipped": int(score_store["cascade_skipped"].sum()),
+        "mean_scores": mean_scores,
+        "dist": dist,
+        "eval_mtime": os.path.getmtime(cached_eval_path),
+        "eval_hash": file_hash(cached_eval_path),
+    }
+    update_manifest(filename, entry, cache_dir)
+    return entry
+
+def remove_from_cache(filename: str, cache_dir: str = CACHE_DIR):
+    for suffix in CACHE_SUFFIXES:
+        try:
+            os.remove(cache_path(filename, suffix, cache_dir))
+        except Exception:
+            pass
+    try:
+        update_manifest(filename, None, cache_dir)
+    except Exception:
+        pass
+
+def open_file_view(path: str):
+    """
+    파일을 읽기 전용 memory map으로 열기 (bytes처럼 슬라이싱 가능, 실제 읽기는 접근할 때)
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def open_eval_view(filename: str, cache_dir: str = CACHE_DIR):
+    return open_file_view(cache_path(filename, "_eval.jsonl", cache_dir))
+
+def load_scores(filename: str, cache_dir: str = CACHE_DIR) -> dict:
+    return load_or_build_score_store(
+        cache_path(filename, "_eval.jsonl", cache_dir),
+        cache_path(filename, "_scores.npz", cache_dir)
+    )
+
+def load_score_summary(filename: str, eval_hash: str, metrics, cache_dir: str = CACHE_DIR) -> dict:
+    """
+    히스토그램/분위수/박스플롯 요약을 평가 파일 hash 기준으로 디스크에 저장해두고 재사용
+    (요약에 없는 지표가 요청되면 다시 계산)
+    """
+    summary_dir = os.path.join(cache_dir, SUMMARY_DIR)
+    os.makedirs(summary_dir, exist_ok=True)
+    summary_path = os.path.join(summary_dir, f"{eval_hash}.json")
+    try:
+        summary = _read_json(summary_path)
+        if all(metric in summary["metrics"] for metric in metrics):
+            return summary["summaries"]
+    except Exception:
+        pass
+    summaries = summarize_scores(load_scores(filename, cache_dir), metrics)
+    _write_json(summary_path, {"metrics": list(metrics), "summaries": summaries})
+    return summaries
@@ -0,0 +1,280 @@
+import os
+import sys
+import time
+import shutil
+import uuid
+import json
+import subprocess
+from functions.eval_cache import CACHE_DIR, _read_json, _write_json, save_eval_to_cache, open_file_view, open_eval_view
+from functions.row_catalog import index_dataset
+from functions.score_store import build_score_columns, mean_scores_from_store
+from functions.feature_count import get_data_distribution
+
+# =========================
+# 평가 작업 큐 (cache/_jobs/{job_id}/)
+# - job.json     : 파일명, 상태(queued/running/sampled/done/failed), pid, 입력 파일 경로(cache/_uploads/{sha256}.jsonl),
+#                  표본 평가 옵션(sample_per_cell, sample_only), cascade 평가 threshold(cascade_thresholds)
+# - progress.json: main_eval.py가 단계별 처리 행 개수와 표본 평균/신뢰구간을 기록
+# - eval.jsonl   : 평가 결과, eval_sample.jsonl: 표본 평가 결과(전체 평가 때 재사용), log.txt: 표준 출력/에러
+# 워커는 앱과 분리된 프로세스로 실행되므로 새로고침해도 평가가 이어지고,
+# 끝난 작업은 다음 실행 때 캐시로 옮겨짐
+# =========================
+JOBS_DIR = "_jobs"
+MAIN_EVAL_PATH = os.path.join(os.path.dirname(__file__), "main_eval.py")
+EVAL_FLAGS = ["--use_kobert", "--use_type", "--use_quality", "--use_bleu", "--use_perplexity"]
+DEFAULT_MAX_WORKERS = int(os.environ.get("EVAL_MAX_WORKERS", "1"))
+ACTIVE_STATUSES = ("queued", "running")
+# 표본 평가만 끝난 작업도 같은 파일을 다시 등록하지 않도록 포함
+HELD_STATUSES = ACTIVE_STATUSES + ("sampled",)
+
+# 이 프로세스가 띄운 워커 (종료 코드 확인 및 좀비 프로세스 정리용)
+_workers = {}
+
+def jobs_dir(cache_dir: str = CACHE_DIR) -> str:
+    path = os.path.join(cache_dir, JOBS_DIR)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def job_path(job_id: str, name: str, cache_dir: str = CACHE_DIR) -> str:
+    return os.path.join(jobs_dir(cache_dir), job_id, name)
+
+def _update_job(job: dict, cache_dir: str = CACHE_DIR, **changes) -> dict:
+    job.update(changes)
+    _write_json(job_path(job["job_id"], "job.json", cache_dir), job)
+    return job
+
+def enqueue_job(filename: str, input_path: str, cache_dir: str = CACHE_DIR,
+                sample_per_cell: int = None, sample_only: bool = False, cascade_thresholds: dict = None) -> dict:
+    """
+    업로드 파일(spool_upload로 저장된 경로)을 입력으로 하는 작업을 대기(queued) 상태로 등록
+    - sample_per_cell: post_type × emotion 셀별 표본을 먼저 평가 (sample_only=True 이면 표본 평가 후 sampled 상태로 대기)
+    - cascade_thresholds: type/quality/BLEU threshold를 통과한 행만 KoBERTScore/perplexity 계산
+    """
+    created = time.time()
+    job_id = f"{int(created * 1000)}_{uuid.uuid4().hex[:8]}"
+    os.makedirs(os.path.join(jobs_dir(cache_dir), job_id))
+    job = {
+        "job_id": job_id, "filename": filename, "status": "queued", "created": created, "pid": None,
+        "input_path": os.path.abspath(input_path),
+        "sample_per_cell": sample_per_cell, "sample_only": bool(sample_per_cell and sample_only),
+        "cascade_thresholds": cascade_thresholds or None
+    }
+    return _update_job(job, cache_dir)
+
+def _release_input(job: dict, cache_dir: str = CACHE_DIR):
+    # 다른 작업이 같은 업로드 파일을 쓰고 있지 않으면 삭제 (캐시에는 link로 남아 있음)
+    others = [other for other in list_jobs(cache_dir) if other["job_id"] != job["job_id"]]
+    if all(other.get("input_path") != job.get("input_path") for other in others):
+        try:
+            os.remove(job["input_path"])
+        except Exception:
+            pass
+
+def _pid_alive(pid) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def _read_progress(job_id: str, cache_dir: str = CACHE_DIR) -> dict:
+    try:
+        return _read_json(job_path(job_id, "progress.json", cache_dir))
+    except Exception:
+        return {}
+
+def _log_tail(job_id: str, cache_dir: str = CACHE_DIR, n_chars: int = 2000) -> str:
+    try:
+        with open(job_path(job_id, "log.txt", cache_dir), "r", encoding="utf-8", errors="replace") as f:
+            return f.read()[-n_chars:]
+    except Exception:
+        return ""
+
+def _refresh_job(job: dict, cache_dir: str = CACHE_DIR) -> dict:
+    """
+    실행 중인 작업의 진행 파일/프로세스 상태를 보고 done/failed로 전환
+    """
+    if job["status"] != "running":
+        return job
+    progress = _read_progress(job["job_id"], cache_dir)
+    worker = _workers.get(job["job_id"])
+    if worker is not None:
+        returncode = worker.poll()
+        alive = returncode is None
+    else:
+        returncode = None
+        alive = _pid_alive(job.get("pid"))
+    if alive:
+        return job
+    _workers.pop(job["job_id"], None)
+    if progress.get("status") in ("done", "sampled") and returncode in (None, 0):
+        return _update_job(job, cache_dir, status=progress["status"], finished=time.time())
+    error = progress.get("error") or _log_tail(job["job_id"], cache_dir) or f"exit code {returncode}"
+    return _update_job(job, cache_dir, status="failed", finished=time.time(), error=error)
+
+def list_jobs(cache_dir: str = CACHE_DIR) -> list:
+    """
+    작업 목록(생성 순)과 진행률 반환
+    - progress: 0~1, 전체 단계의 처리 행 수 합 / (행 수 * 단계 수)
+    """
+    jobs = []
+    root = jobs_dir(cache_dir)
+    for job_id in sorted(os.listdir(root)):
+        try:
+            job = _read_json(os.path.join(root, job_id, "job.json"))
+        except Exception:
+            continue
+        job = _refresh_job(job, cache_dir)
+        progress = _read_progress(job_id, cache_dir) if job["status"] != "queued" else {}
+        total = progress.get("total_rows", 0) * len(progress.get("stages", []))
+        done = sum(progress.get("done_rows", {}).values())
+        job["stage"] = progress.get("stage")
+        job["phase"] = progress.get("phase")
+        job["sample"] = progress.get("sample")
+        job["progress"] = 1.0 if job["status"] == "done" else (min(done / total, 1.0) if total else 0.0)
+        jobs.append(job)
+    return sorted(jobs, key=lambda job: job["created"])
+
+def _claim(job_id: str, lock_name: str, cache_dir: str = CACHE_DIR) -> bool:
+    # 여러 세션이 동시에 같은 작업을 시작/수집하지 않도록 lock 파일을 원자적으로 생성
+    try:
+        fd = os.open(job_path(job_id, lock_name, cache_dir), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return False
+    os.close(fd)
+    return True
+
+def _option_flags(job: dict) -> list:
+    flags = []
+    if job.get("sample_per_cell"):
+        flags += ["--sample_per_cell", str(job["sample_per_cell"])] + (["--sample_only"] if job.get("sample_only") else [])
+    if job.get("cascade_thresholds"):
+        flags += ["--cascade_thresholds", json.dumps(job["cascade_thresholds"])]
+    return flags
+
+def continue_job(job_id: str, cache_dir: str = CACHE_DIR) -> dict:
+    """
+    표본 평가만 끝난(sampled) 작업을 전체 평가로 다시 대기열에 등록 (표본 결과는 main_eval.py가 재사용)
+    """
+    job = _read_json(job_path(job_id, "job.json", cache_dir))
+    if job["status"] != "sampled":
+        return job
+    try:
+        os.remove(job_path(job_id, "start.lock", cache_dir))
+    except FileNotFoundError:
+        pass
+    return _update_job(job, cache_dir, status="queued", sample_only=False, pid=None)
+
+def start_workers(max_workers: int = DEFAULT_MAX_WORKERS, cache_dir: str = CACHE_DIR) -> list:
+    """
+    실행 중인 작업이 max_workers 개가 될 때까지 대기 작업을 오래된 순서로 시작
+    """
+    jobs = list_jobs(cache_dir)
+    running = sum(1 for job in jobs if job["status"] == "running")
+    started = []
+    for job in jobs:
+        if running >= max_workers:
+            break
+        if job["status"] != "queued" or not _claim(job["job_id"], "start.lock", cache_dir):
+            continue
+        job_id = job["job_id"]
+        log_file = open(job_path(job_id, "log.txt", cache_dir), "w", encoding="utf-8")
+        worker = subprocess.Popen(
+            [
+                sys.executable, MAIN_EVAL_PATH,
+                "--input_path", job["input_path"],
+                "--output_path", os.path.abspath(job_path(job_id, "eval.jsonl", cache_dir)),
+                "--progress_path", os.path.abspath(job_path(job_id, "progress.json", cache_dir)),
+            ] + EVAL_FLAGS + _option_flags(job),
+            stdout=log_file, stderr=subprocess.STDOUT, start_new_session=True
+        )
+        log_file.close()
+        _workers[job_id] = worker
+        for key in ("stage", "phase", "sample", "progress"):
+            job.pop(key, None)
+        _update_job(job, cache_dir, status="running", pid=worker.pid, started=time.time())
+        started.append(job)
+        running += 1
+    return started
+
+def _collect_job(job: dict, metrics, cache_dir: str = CACHE_DIR) -> dict:
+    # 작업 하나의 평가 결과를 캐시와 행 카탈로그에 등록, manifest 항목 반환
+    eval_path = job_path(job["job_id"], "eval.jsonl", cache_dir)
+    data_view = open_file_view(job["input_path"])
+    eval_view = open_file_view(eval_path)
+    try:
+        dist = get_data_distribution(data_view)
+        score_store = build_score_columns(eval_view)
+    finally:
+        for view in (data_view, eval_view):
+            if hasattr(view, "close"):
+                view.close()
+    entry = save_eval_to_cache(
+        job["filename"],
+        eval_path,
+        job["input_path"],
+        mean_scores_from_store(score_store, metrics),
+        dist,
+        score_store,
+        cache_dir
+    )
+    # 평가 시점에 행 카탈로그(SQLite)도 함께 등록
+    eval_view = open_eval_view(job["filename"], cache_dir)
+    try:
+        index_dataset(job["filename"], eval_view, score_store, entry["eval_hash"], cache_dir)
+    finally:
+        if hasattr(eval_view, "close"):
+            eval_view.close()
+    return entry
+
+def collect_finished_jobs(metrics, cache_dir: str = CACHE_DIR) -> dict:
+    """
+    끝난(done) 작업의 평가 결과를 캐시(save_eval_to_cache)로 옮기고 작업 폴더 삭제
+    - 수집 중 오류가 나면 작업을 failed로 바꾸고 오류 메시지를 남김
+    Returns: {파일명: manifest 항목}
+    """
+    collected = {}
+    for job in list_jobs(cache_dir):
+        if job["status"] != "done" or not _claim(job["job_id"], "collect.lock", cache_dir):
+            continue
+        job_id = job["job_id"]
+        try:
+            collected[job["filename"]] = _collect_job(job, metrics, cache_dir)
+        except Exception as e:
+            # 수집 중 오류: collect.lock은 남지만 failed로 바꿔 화면이 done 작업을 계속 기다리지 않도록
+            for key in ("stage", "phase", "sample", "progress"):
+                job.pop(key, None)
+            _update_job(job, cache_dir, status="failed", finished=time.time(), error=f"결과 수집 실패: {e!r}")
+            continue
+        shutil.rmtree(os.path.join(jobs_dir(cache_dir), job_id), ignore_errors=True)
+        _release_input(job, cache_dir)
+    return collected
+
+def active_job_files(cache_dir: str = CACHE_DIR, statuses=ACTIVE_STATUSES) -> set:
+    return {job["filename"] for job in list_jobs(cache_dir) if job["status"] in statuses}
+
+def remove_job(job_id: str, cache_dir: str = CACHE_DIR):
+    """
+    작업 삭제 (실행 중이면 워커 프로세스 종료)
+    """
+    try:
+        job = _read_json(job_path(job_id, "job.json", cache_dir))
+    except Exception:
+        job = {}
+    if job.get("status") == "running":
+        worker = _workers.pop(job_id, None)
+        try:
+            if worker is not None:
+                worker.terminate()
+                worker.wait(timeout=5)
+            elif _pid_alive(job.get("pid")):
+                os.kill(job["pid"], 15)
+        except Exception:
+            pass
+    shutil.rmtree(os.path.join(jobs_dir(cache_dir), job_id), ignore_errors=True)
+    if job.get("input_path"):
+        _release_input(job, cache_dir)
@@ -0,0 +1,88 @@
+import os
+import gzip
+import json
+import time
+import uuid
+import shutil
+from functions.score_store import EVAL_FIELDS, get_rows
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# =========================
+# 필터링 결과 내보내기
+# - 행 인덱스 청크 단위로 memory map에서 읽어 파일(선택 시 gzip/zstd 압축)로 바로 기록
+# - 파일은 static/exports/ 에 두고 Streamlit static 서빙(server.enableStaticServing)으로 디스크에서 전송
+# =========================
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+EXPORT_DIR = os.path.join(STATIC_DIR, "exports")
+EXPORT_MAX_AGE = 60 * 60  # 1시간 지난 내보내기 파일은 정리
+COMPRESSION_SUFFIXES = {"none": ".jsonl", "gzip": ".jsonl.gz", "zstd": ".jsonl.zst"}
+
+def available_compressions() -> list:
+    return [name for name in COMPRESSION_SUFFIXES if name != "zstd" or zstandard is not None]
+
+def _open_writer(path: str, compression: str):
+    if compression == "gzip":
+        return gzip.open(path, "wb", compresslevel=6)
+    if compression == "zstd":
+        if zstandard is None:
+            raise ImportError("zstd 압축은 zstandard 패키지가 필요합니다. (pip install zstandard)")
+        return zstandard.ZstdCompressor(level=3).stream_writer(open(path, "wb"), closefd=True)
+    return open(path, "wb")
+
+def cleanup_exports(export_dir: str = EXPORT_DIR, max_age: int = EXPORT_MAX_AGE):
+    if not os.path.isdir(export_dir):
+        return
+    now = time.time()
+    for name in os.listdir(export_dir):
+        path = os.path.join(export_dir, name)
+        try:
+            if now - os.path.getmtime(path) > max_age:
+                os.remove(path)
+        except Exception:
+            pass
+
+def write_jsonl_export(eval_jsonl_bytes_list, score_stores, indices_list, prefix: str = "filtered_all",
+                       compression: str = "gzip", drop_keys=EVAL_FIELDS, chunk_rows: int = 1000,
+                       export_dir: str = EXPORT_DIR) -> str:
+    """
+    선택된 행을 chunk_rows 개씩 읽어서 JSONL 파일로 기록하고 경로 반환 (메모리에는 청크 하나만 유지)
+    - drop_keys: 내보낼 때 제거할 필드 (기본: 평가 점수, cascade 생략 표시)
+    """
+    cleanup_exports(export_dir)
+    os.makedirs(export_dir, exist_ok=True)
+    name = f"{prefix}_{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}{COMPRESSION_SUFFIXES[compression]}"
+    path = os.path.join(export_dir, name)
+    tmp_path = path + ".tmp"
+    drop_keys = set(drop_keys or [])
+    with _open_writer(tmp_path, compression) as writer:
+        for eval_bytes, store, indices in zip(eval_jsonl_bytes_list, score_stores, indices_list):
+            for start in range(0, len(indices), chunk_rows):
+                rows = get_rows(eval_bytes, store, indices[start:start + chunk_rows])
+                chunk = "".join(
+                    json.dumps({k: v for k, v in row.items() if k not in drop_keys}, ensure_ascii=False) + "\n"
+                    for row in rows
+                )
+                writer.write(chunk.encode("utf-8"))
+    os.replace(tmp_path, path)
+    return path
+
+def link_export(src_path: str, name: str, export_dir: str = EXPORT_DIR) -> str:
+    """
+    캐시 파일을 복사하지 않고 exports 폴더에 hard link (다른 파일시스템이면 복사)
+    """
+    cleanup_exports(export_dir)
+    os.makedirs(export_dir, exist_ok=True)
+    path = os.path.join(export_dir, f"{uuid.uuid4().hex[:6]}_{name}")
+    try:
+        os.link(src_path, path)
+    except OSError:
+        shutil.copyfile(src_path, path)
+    return path
+
+def export_url(path: str) -> str:
+    # Streamlit static 서빙 경로 (static/ 아래 상대 경로)
+    return "app/static/" + os.path.relpath(path, STATIC_DIR).replace(os.sep, "/")
@@ -1,34 +1,52 @@
-import json
+import numpy as np
 from collections import Counter, defaultdict
+from functions.score_store import iter_lines
+from functions.feature_stats import DEFAULT_PRECISION, FeatureStats
 
-def get_data_distribution(jsonl_bytes) -> dict:
+def get_data_distribution(jsonl_bytes, mode: str = "exact", precision: int = DEFAULT_PRECISION) -> dict:
     """
-    업로드된 jsonl 파일(바이트)을 받아 데이터 분포 통계 반환
+    업로드된 jsonl 파일(바이트 또는 memory map)을 받아 데이터 분포 통계 반환
+    - 중복 없는 원문 개수: exact(64bit hash 집합) 또는 hll(HyperLogLog 근사, 메모리 고정)
     """
-    emotion_order = ["normal", "happy", "sad", "grumpy", "angry", "curious"]
-    type_emotion_counter = defaultdict(lambda: Counter())
-    type_total_counter = Counter()
-    content_set = set()
-    total_count = 0
+    return FeatureStats(mode, precision).add_lines(iter_lines(jsonl_bytes)).to_distribution()
 
-    for line in jsonl_bytes.splitlines():
-        line = line.decode("utf-8").strip()
-        if not line:
+def type_emotion_counts(score_stores, indices_list):
+    """
+    선택된 행의 post_type × emotion 개수 (범주 코드 컬럼 bincount, 행 파싱 없음)
+    """
+    type_emotion_counter = defaultdict(lambda: Counter())
+    for store, indices in zip(score_stores, indices_list):
+        type_names = store["post_type_names"]
+        emotion_names = store["emotion_names"]
+        if not len(indices):
             continue
-        data = json.loads(line)
-        total_count += 1
-        post_type = data.get('post_type', 'unknown')
-        emotion = data.get('emotion', 'unknown')
-        content = data.get('content', '').strip()
-        if content:
-            content_set.add(content)
-        type_emotion_counter[post_type][emotion] += 1
-        type_total_counter[post_type] += 1
+        codes = store["post_type_codes"][indices].astype(np.int64) * len(emotion_names) + store["emotion_codes"][indices]
+        cells = np.bincount(codes, minlength=len(type_names) * len(emotion_names))
+        for cell in np.flatnonzero(cells):
+            post_type = str(type_names[cell // len(emotion_names)])
+            emotion = str(emotion_names[cell % len(emotion_names)])
+            type_emotion_counter[post_type][emotion] += int(cells[cell])
+    return type_emotion_counter
 
+def unique_content_count(score_stores, indices_list) -> int:
+    hashes = [store["content_hash"][indices] for store, indices in zip(score_stores, indices_list)]
+    if not hashes:
+        return 0
+    hashes = np.unique(np.concatenate(hashes))
+    return int(np.count_nonzero(hashes))
+
+def get_distribution_from_indices(score_stores, indices_list) -> dict:
+    """
+    필터링된 행 인덱스로 get_data_distribution과 같은 형태의 분포 통계 계산
+    (점수 저장소의 범주 코드/원문 hash 컬럼만 사용)
+    """
+    emotion_order = ["normal", "happy", "sad", "grumpy", "angry", "curious"]
+    type_emotion_counter = type_emotion_counts(score_stores, indices_list)
+    type_total_counter = Counter({post_type: sum(counter.values()) for post_type, counter in type_emotion_counter.items()})
     return {
-        "total_count": total_count,
-        "unique_content_count": len(content_set),
+        "total_count": int(sum(len(indices) for indices in indices_list)),
+        "unique_content_count": unique_content_count(score_stores, indices_list),
         "type_emotion_counter": type_emotion_counter,
         "type_total_counter": type_total_counter,
         "emotion_order": emotion_order
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,206 @@
+import json
+import hashlib
+from collections import Counter, defaultdict
+from typing import Dict, Iterable
+
+import numpy as np
+
+# =========================
+# 데이터셋 분포 통계 엔진 (feature_count.get_data_distribution)
+# - dataset/functions/feature_stats.py(4_feature_count)도 이 엔진을 import해서 씀 (엔진은 여기 한 곳에만)
+# - 중복 없는 원문 개수: 원문(content, 앞뒤 공백 제거)의 64bit hash(blake2b)로 셈
+#   - exact: hash를 numpy uint64 배열로 모아 np.unique (원문 문자열 대신 행당 8바이트)
+#   - hll: HyperLogLog, 2^precision개 register(uint8)만 유지 → 행이 수백만 개여도 메모리 고정
+# - FeatureStats는 merge로 부분 통계를 합칠 수 있음
+# =========================
+EMOTION_ORDER = ["normal", "happy", "sad", "grumpy", "angry", "curious"]
+DISTINCT_MODES = ("exact", "hll")
+DEFAULT_PRECISION = 14
+# register index(상위 precision bit)를 뺀 나머지 bit가 float64로 정확히 표현되는 범위 (64 - precision <= 53)
+MIN_PRECISION, MAX_PRECISION = 11, 18
+BATCH_SIZE = 65536
+
+def content_hash64(content) -> int:
+    """
+    원문(앞뒤 공백 제거)의 64bit hash (unsigned), 빈 원문은 0
+    """
+    content = content.strip() if isinstance(content, str) else ""
+    if not content:
+        return 0
+    return int.from_bytes(hashlib.blake2b(content.encode("utf-8"), digest_size=8).digest(), "little")
+
+class ExactDistinct:
+    """
+    64bit hash 집합 (정확한 개수, hash 충돌 확률은 무시할 수준)
+    """
+    mode = "exact"
+
+    def __init__(self):
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.pending = []
+        self.pending_count = 0
+
+    def add_hashes(self, hashes: np.ndarray):
+        self.pending.append(hashes)
+        self.pending_count += len(hashes)
+        if self.pending_count >= BATCH_SIZE:
+            self._compact()
+
+    def _compact(self):
+        if self.pending:
+            self.hashes = np.unique(np.concatenate([self.hashes] + self.pending))
+            self.pending, self.pending_count = [], 0
+
+    def merge(self, other: "ExactDistinct"):
+        other._compact()
+        self.add_hashes(other.hashes)
+
+    def count(self) -> int:
+        self._compact()
+        return int(len(self.hashes))
+
+    def __getstate__(self):
+        self._compact()
+        return self.__dict__
+
+class HyperLogLog:
+    """
+    HyperLogLog 근사 개수 (register: 상위 precision bit로 고른 칸에 나머지 bit의 선행 0 개수 + 1의 최댓값)
+    """
+    mode = "hll"
+
+    def __init__(self, precision: int = DEFAULT_PRECISION):
+        if not MIN_PRECISION <= precision <= MAX_PRECISION:
+            raise ValueError(f"precision은 {MIN_PRECISION}~{MAX_PRECISION} 사이여야 합니다: {precision}")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_hashes(self, hashes: np.ndarray):
+        if not len(hashes):
+            return
+        width = 64 - self.precision
+        index = (hashes >> np.uint64(width)).astype(np.int64)
+        rest = (hashes & np.uint64((1 << width) - 1)).astype(np.float64)
+        # frexp 지수 = bit 길이 (0이면 0) → 선행 0 개수 + 1 = width - bit 길이 + 1
+        ranks = (width + 1 - np.frexp(rest)[1]).astype(np.uint8)
+        np.maximum.at(self.registers, index, ranks)
+
+    def merge(self, other: "HyperLogLog"):
+        if other.precision != self.precision:
+            raise ValueError(f"precision이 다른 HyperLogLog는 합칠 수 없습니다: {self.precision} != {other.precision}")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        # 작은 개수는 linear counting으로 보정 (64bit hash라 큰 개수 보정은 필요 없음)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+def new_distinct(mode: str = "exact", precision: int = DEFAULT_PRECISION):
+    if mode == "exact":
+        return ExactDistinct()
+    if mode == "hll":
+        return HyperLogLog(precision)
+    raise ValueError(f"지원하지 않는 mode: {mode} (가능: {', '.join(DISTINCT_MODES)})")
+
+class FeatureStats:
+    """
+    부분 통계: 총 행 수, post_type × emotion 개수, 중복 없는 원문 개수 (merge로 합칠 수 있음)
+    """
+    def __init__(self, mode: str = "exact", precision: int = DEFAULT_PRECISION):
+        self.total_count = 0
+        self.type_emotion_counter = defaultdict(Counter)
+        self.distinct = new_distinct(mode, precision)
+        self.pending_hashes = []
+
+    def add(self, data: Dict):
+        self.total_count += 1
+        self.type_emotion_counter[data.get('post_type', 'unknown')][data.get('emotion', 'unknown')] += 1
+        content_hash = content_hash64(data.get('content', ''))
+        if content_hash:
+            self.pending_hashes.append(content_hash)
+            if len(self.pending_hashes) >= BATCH_SIZE:
+                self._flush()
+
+    def add_lines(self, lines: Iterable):
+        """
+        jsonl 줄(str 또는 bytes) 묶음 추가, 빈 줄은 건너뜀
+        """
+        for line in lines:
+            if isinstance(line, bytes):
+                line = line.decode("utf-8")
+            if not line.strip():
+                continue
+            self.add(json.loads(line))
+        return self
+
+    def _flush(self):
+        if self.pending_hashes:
+            self.distinct.add_hashes(np.asarray(self.pending_hashes, dtype=np.uint64))
+            self.pending_hashes = []
+
+    def merge(self, other: "FeatureStats"):
+        if other.distinct.mode != self.distinct.mode:
+            raise ValueError(f"mode가 다른 통계는 합칠 수 없습니다: {self.distinct.mode} != {other.distinct.mode}")
+        other._flush()
+        self.total_count += other.total_count
+        for post_type, counter in other.type_emotion_counter.items():
+            self.type_emotion_counter[post_type].update(counter)
+        self.distinct.merge(other.distinct)
+        return self
+
+    @property
+    def type_total_counter(self) -> Counter:
+        return Counter({post_type: sum(counter.values()) for post_type, counter in self.type_emotion_counter.items()})
+
+    def unique_content_count(self) -> int:
+        self._flush()
+        return self.distinct.count()
+
+    def to_distribution(self) -> Dict:
+        """
+        get_data_distribution과 같은 형태의 dict
+        """
+        return {
+            "total_count": self.total_count,
+            "unique_content_count": self.unique_content_count(),
+            "type_emotion_counter": self.type_emotion_counter,
+            "type_total_counter": self.type_total_counter,
+            "emotion_order": EMOTION_ORDER
+        }
+
+    def to_json(self) -> Dict:
+        type_total_counter = self.type_total_counter
+        return {
+            "total_count": self.total_count,
+            "unique_content_count": self.unique_content_count(),
+            "unique_content_mode": self.distinct.mode,
+            "post_types": {
+                post_type: {"total": type_total_counter[post_type], "emotions": dict(sorted_emotions(counter))}
+                for post_type, counter in self.type_emotion_counter.items()
+            }
+        }
+
+    def __getstate__(self):
+        # 프로세스 간 전달 시 defaultdict(lambda 없이)와 모아둔 hash 정리
+        self._flush()
+        state = dict(self.__dict__)
+        state["type_emotion_counter"] = dict(self.type_emotion_counter)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.type_emotion_counter = defaultdict(Counter, self.type_emotion_counter)
+
+def sorted_emotions(counter: Counter):
+    # emotion_order 순서 먼저, 나머지는 나온 순서대로
+    for emotion in EMOTION_ORDER:
+        if emotion in counter:
+            yield emotion, counter[emotion]
+    for emotion, count in counter.items():
+        if emotion not in EMOTION_ORDER:
+            yield emotion, count
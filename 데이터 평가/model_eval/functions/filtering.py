@@ -1,23 +1,54 @@
-import json
+import numpy as np
+from functions.row_catalog import query_filtered_rows
+from functions.feature_count import type_emotion_counts, unique_content_count
 
-def filter_jsonl_bytes_by_threshold(
-    eval_jsonl_bytes_list,
-    thresholds: dict
-):
-    filtered = []
-    for eval_bytes in eval_jsonl_bytes_list:
-        lines = eval_bytes.decode("utf-8").splitlines()
-        for line in lines:
-            data = json.loads(line)
-            passed = True
-            for key, thres in thresholds.items():
-                value = data.get(key)
-                if value is None or float(value) < thres:
-                    passed = False
-                    break
-            if passed:
-                filtered.append(data)
-    return filtered
+def threshold_mask(score_store: dict, thresholds: dict) -> np.ndarray:
+    """
+    컬럼 저장소의 점수 컬럼으로 threshold 통과 여부 boolean mask 계산
+    (점수가 없는 NaN 행은 통과하지 못함)
+    """
+    mask = np.ones(len(score_store["offsets"]), dtype=bool)
+    for key, thres in thresholds.items():
+        mask &= score_store[key] >= thres
+    return mask
+
+def pass_count_preview(score_stores, thresholds: dict) -> dict:
+    """
+    threshold 변경 시 바로 보여줄 통과 개수 미리보기 (행 파싱 없이 점수/범주 컬럼만 사용)
+    - metric_pass: 지표별로 해당 threshold만 적용했을 때 통과 개수
+    - type_emotion_counter: 모든 threshold 통과 행의 post_type × emotion 개수
+    - unique_content_count: 모든 threshold 통과 행의 중복 없는 원문 개수
+    """
+    total_count = 0
+    passed_count = 0
+    metric_pass = {key: 0 for key in thresholds}
+    passed_indices = []
+    for store in score_stores:
+        total_count += len(store["offsets"])
+        mask = np.ones(len(store["offsets"]), dtype=bool)
+        for key, thres in thresholds.items():
+            metric_mask = store[key] >= thres
+            metric_pass[key] += int(metric_mask.sum())
+            mask &= metric_mask
+        passed_count += int(mask.sum())
+        passed_indices.append(np.flatnonzero(mask))
+    return {
+        "total_count": total_count,
+        "passed_count": passed_count,
+        "metric_pass": metric_pass,
+        "type_emotion_counter": type_emotion_counts(score_stores, passed_indices),
+        "unique_content_count": unique_content_count(score_stores, passed_indices),
+    }
+
+def passed_row_indices(filenames, score_stores, thresholds: dict, dedup: bool = False) -> list:
+    """
+    데이터셋별 threshold 통과 행 인덱스 배열 리스트
+    - dedup=True 이면 행 카탈로그(SQLite) index로 조회하고 데이터셋 간 같은 행(content hash)은 한 번만 포함
+    """
+    if dedup:
+        passed = query_filtered_rows(list(filenames), thresholds, dedup=True)
+        return [passed[fname] for fname in filenames]
+    return [np.flatnonzero(threshold_mask(store, thresholds)) for store in score_stores]
 
 # def filter_normal_kobertscore(data_list, kobertscore_threshold=0.6):
 #     """
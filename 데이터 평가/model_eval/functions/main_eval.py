@@ -1,11 +1,15 @@
 import csv
 import os
 import json
+import time
+import tempfile
+import numpy as np
 from _kobert_eval import KobertEvaluator
 from _type_eval import TypeEvaluator
 from _quality_eval import QualityEvaluator
 from _perplex_eval import PerplexityEvaluator
 from _bleu_eval import BleuEvaluator
+from _sample_eval import stratified_sample_indices, bootstrap_summary, save_sample_results, load_sample_results
 from typing import Optional, List, Dict
 import argparse
 
@@ -53,6 +57,77 @@ def print_eval_stats(results, prefix=""):
         total = len(scores)
         print(f"⭐ perplexity_score 평균: {mean_score:.3f} (bad-data count : {below_thres}개 / {total}개)")
 
+# cascade 평가: 가벼운 지표(type/quality/BLEU)를 먼저 계산하고, threshold를 통과한 행만 모델 지표 계산
+# 생략된 지표는 None, 생략한 지표 목록은 행의 CASCADE_SKIP_FIELD에 기록 (score_store.CASCADE_SKIP_FIELD와 같은 이름)
+CHEAP_METRICS = ["type_score", "quality_score", "bleu_score"]
+CASCADE_SKIP_FIELD = "cascade_skipped"
+
+def cascade_passes(scores: Dict, thresholds: Dict) -> bool:
+    # 앱의 threshold_mask와 같은 기준 (float32 비교, 점수가 없으면 통과 못함)
+    for metric, thres in thresholds.items():
+        value = scores.get(metric)
+        if value is None or not np.float32(value) >= np.float32(thres):
+            return False
+    return True
+
+class ProgressCounter:
+    """
+    평가 단계별 처리 행 개수를 json 파일로 기록 (앱의 작업 큐가 읽어서 진행률 표시)
+    - 파일 쓰기는 interval 초에 한 번만 (단계 시작/종료 시에는 항상 기록)
+    """
+    def __init__(self, progress_path: Optional[str], stages: List[str], total_rows: int, interval: float = 0.5):
+        self.progress_path = progress_path
+        self.state = {
+            "status": "running",
+            "phase": "full",
+            "stages": stages,
+            "stage": None,
+            "total_rows": total_rows,
+            "done_rows": {stage: 0 for stage in stages},
+        }
+        self.interval = interval
+        self.last_write = 0.0
+        self.write(force=True)
+
+    def write(self, force: bool = False):
+        if self.progress_path is None:
+            return
+        now = time.time()
+        if not force and now - self.last_write < self.interval:
+            return
+        self.last_write = now
+        self.state["updated"] = now
+        tmp_path = self.progress_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False)
+        os.replace(tmp_path, self.progress_path)
+
+    def begin_phase(self, phase: str, total_rows: int):
+        # 표본 평가(sample) → 나머지 행 전체 평가(full) 단계 전환 시 처리 행 개수 초기화
+        self.state["phase"] = phase
+        self.state["total_rows"] = total_rows
+        self.state["done_rows"] = {stage: 0 for stage in self.state["stages"]}
+        self.write(force=True)
+
+    def start(self, stage: str):
+        self.state["stage"] = stage
+        self.write(force=True)
+
+    def advance(self, n: int = 1):
+        self.state["done_rows"][self.state["stage"]] += n
+        self.write()
+
+    def skip(self, stage: str, n: int):
+        # cascade로 생략한 행도 처리한 것으로 계산
+        self.state["done_rows"][stage] += n
+        self.write()
+
+    def finish(self, status: str = "done", error: Optional[str] = None):
+        self.state["status"] = status
+        if error is not None:
+            self.state["error"] = error
+        self.write(force=True)
+
 def run_all_evals(
     input_path: str,
     use_kobert: bool = False,
@@ -60,42 +135,183 @@ def run_all_evals(
     use_quality: bool = False,
     use_bleu: bool = False,
     use_perplexity: bool = False,
-    output_path: str = None
+    output_path: str = None,
+    progress_path: str = None,
+    sample_per_cell: Optional[int] = None,
+    sample_only: bool = False,
+    sample_path: Optional[str] = None,
+    seed: int = 42,
+    cascade_thresholds: Optional[Dict] = None
 ):
+    """
+    sample_per_cell 지정 시 post_type × emotion 셀별 표본을 먼저 평가해서 평균/신뢰구간을 progress에 기록
+    - sample_only=True 이면 표본 평가만 하고 종료 (status: sampled)
+    - 아니면 표본 결과는 그대로 쓰고 나머지 행만 평가해서 합침
+    - 표본 결과는 sample_path(기본: {output_path}_sample.jsonl)에 저장해서 다시 실행해도 재사용
+    cascade_thresholds 지정 시 (표본이 아닌) 전체 평가 행은 type/quality/BLEU threshold를 통과한 행만
+    KoBERTScore/perplexity 계산
+    """
     with open(input_path, "r", encoding="utf-8") as f:
         original_data = [json.loads(line) for line in f]
 
     n = len(original_data)
     results: List[Dict] = [{} for _ in range(n)]
+    flags = (use_kobert, use_type, use_quality, use_bleu, use_perplexity)
+    # 일부 행만 평가할 때 임시 입력 파일을 둘 폴더 (작업 폴더)
+    work_dir = os.path.dirname(os.path.abspath(output_path or input_path))
 
+    stages = [
+        stage for stage, used in [
+            ("kobert", use_kobert), ("type", use_type), ("quality", use_quality),
+            ("bleu", use_bleu), ("perplexity", use_perplexity)
+        ] if used
+    ]
+    progress = ProgressCounter(progress_path, stages, n)
+    try:
+        sampled = {}
+        if sample_per_cell:
+            if sample_path is None:
+                sample_path = os.path.splitext(output_path or input_path)[0] + "_sample.jsonl"
+            start = time.time()
+            sampled = load_sample_results(sample_path, original_data) or {}
+            if sampled:
+                print(f"♻️ 저장된 표본 평가 결과 재사용: {len(sampled)}개")
+            else:
+                sample_indices = stratified_sample_indices(original_data, sample_per_cell, seed)
+                progress.begin_phase("sample", len(sample_indices))
+                sample_results = _evaluate_rows(input_path, original_data, sample_indices, progress, flags, work_dir)
+                save_sample_results(sample_path, original_data, sample_indices, sample_results)
+                sampled = dict(zip(sample_indices, sample_results))
+            summary = bootstrap_summary(original_data, list(sampled), list(sampled.values()), seed=seed)
+            summary["elapsed"] = time.time() - start
+            progress.state["sample"] = summary
+            for metric, stat in summary["metrics"].items():
+                print(f"🎯 {metric} 표본 평균: {stat['mean']:.3f} "
+                      f"({summary['confidence'] * 100:.0f}% CI {stat['ci_low']:.3f} ~ {stat['ci_high']:.3f})")
+            if sample_only:
+                progress.finish("sampled")
+                return
+            for idx, scores in sampled.items():
+                results[idx].update(scores)
+
+        rest_indices = [idx for idx in range(n) if idx not in sampled]
+        progress.begin_phase("full", len(rest_indices))
+        if cascade_thresholds:
+            rest_results = _cascade_rows(input_path, original_data, rest_indices, progress, flags, work_dir, cascade_thresholds)
+        else:
+            rest_results = _evaluate_rows(input_path, original_data, rest_indices, progress, flags, work_dir)
+        for idx, scores in zip(rest_indices, rest_results):
+            results[idx].update(scores)
+
+        # 통합 저장
+        if output_path is not None:
+            with open(output_path, "w", encoding="utf-8") as f:
+                for orig, res in zip(original_data, results):
+                    merged = orig.copy()
+                    merged.update(res)
+                    f.write(json.dumps(merged, ensure_ascii=False) + "\n")
+            print(f"✅ 최종 통합 평가 결과 저장: {output_path}")
+    except Exception as e:
+        progress.finish("failed", error=repr(e))
+        raise
+    progress.finish("done")
+
+# 표본 평가 → 전체 평가에서 모델을 다시 로딩하지 않도록 평가기 재사용
+_evaluators = {}
+
+def _get_evaluator(name: str, factory):
+    if name not in _evaluators:
+        _evaluators[name] = factory()
+    return _evaluators[name]
+
+def _evaluate_rows(input_path, original_data, indices, progress, flags, work_dir) -> List[Dict]:
+    """
+    indices 행만 평가해서 행별 점수 dict 리스트 반환 (전체 행이 아니면 임시 jsonl을 만들어 평가기에 전달)
+    """
+    results: List[Dict] = [{} for _ in indices]
+    if not indices:
+        return results
+    if len(indices) == len(original_data):
+        _run_stages(input_path, original_data, results, progress, *flags)
+        return results
+    subset = [original_data[idx] for idx in indices]
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", suffix=".jsonl", dir=work_dir, delete=False
+    ) as f:
+        for row in subset:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        subset_path = f.name
+    try:
+        _run_stages(subset_path, subset, results, progress, *flags)
+    finally:
+        os.remove(subset_path)
+    return results
+
+def _cascade_rows(input_path, original_data, indices, progress, flags, work_dir, thresholds) -> List[Dict]:
+    """
+    가벼운 지표를 먼저 계산하고 threshold(가벼운 지표에 대한 것만 사용)를 통과한 행만 모델 지표 계산
+    """
+    use_kobert, use_type, use_quality, use_bleu, use_perplexity = flags
+    thresholds = {metric: thres for metric, thres in thresholds.items() if metric in CHEAP_METRICS}
+    results = _evaluate_rows(
+        input_path, original_data, indices, progress, (False, use_type, use_quality, use_bleu, False), work_dir
+    )
+    survivors = [pos for pos, scores in enumerate(results) if cascade_passes(scores, thresholds)]
+    skipped_metrics = [
+        metric for metric, used in [("kobertscore_f1", use_kobert), ("perplexity_score", use_perplexity)] if used
+    ]
+    n_skipped = len(indices) - len(survivors)
+    print(f"🪜 cascade: {len(indices)}개 중 {len(survivors)}개만 모델 지표 계산 ({n_skipped}개 생략)")
+    for stage, used in [("kobert", use_kobert), ("perplexity", use_perplexity)]:
+        if used:
+            progress.skip(stage, n_skipped)
+    model_results = _evaluate_rows(
+        input_path, original_data, [indices[pos] for pos in survivors], progress,
+        (use_kobert, False, False, False, use_perplexity), work_dir
+    )
+    for pos, scores in zip(survivors, model_results):
+        results[pos].update(scores)
+    survivor_set = set(survivors)
+    for pos, scores in enumerate(results):
+        if pos not in survivor_set and skipped_metrics:
+            scores.update({metric: None for metric in skipped_metrics})
+            scores[CASCADE_SKIP_FIELD] = skipped_metrics
+    return results
+
+def _run_stages(input_path, original_data, results, progress,
+                use_kobert, use_type, use_quality, use_bleu, use_perplexity):
     # KoBERTScore
     if use_kobert:
-        kobert_eval = KobertEvaluator(model_name="beomi/kcbert-base", best_layer=4)
-        kbs_results = kobert_eval.evaluate(input_path)
+        progress.start("kobert")
+        kobert_eval = _get_evaluator("kobert", lambda: KobertEvaluator(model_name="beomi/kcbert-base", best_layer=4))
+        kbs_results = kobert_eval.evaluate(input_path, progress=progress.advance)
         print_eval_stats(kbs_results)
         for i, r in enumerate(kbs_results):
             results[i]["kobertscore_f1"] = r.get("kobertscore_f1")
 
     # Type Score
     if use_type:
-        type_eval = TypeEvaluator()
-        type_results = type_eval.evaluate(input_path)
+        progress.start("type")
+        type_eval = _get_evaluator("type", TypeEvaluator)
+        type_results = type_eval.evaluate(input_path, progress=progress.advance)
         print_eval_stats(type_results)
         for i, r in enumerate(type_results):
             results[i]["type_score"] = r.get("type_score")
 
     # Quality Score
     if use_quality:
-        quality_eval = QualityEvaluator()
-        quality_results = quality_eval.evaluate(input_path)
+        progress.start("quality")
+        quality_eval = _get_evaluator("quality", QualityEvaluator)
+        quality_results = quality_eval.evaluate(input_path, progress=progress.advance)
         print_eval_stats(quality_results)
         for i, r in enumerate(quality_results):
             results[i]["quality_score"] = r.get("quality_score")
 
     # BLEU Score (BleuEvaluator에서 점수만 받아옴)
     if use_bleu:
-        bleu_evaluator = BleuEvaluator()
-        bleu_scores = bleu_evaluator.evaluate_jsonl(input_path, output_path=None)
+        progress.start("bleu")
+        bleu_evaluator = _get_evaluator("bleu", BleuEvaluator)
+        bleu_scores = bleu_evaluator.evaluate_jsonl(input_path, output_path=None, progress=progress.advance)
         for i, bleu in enumerate(bleu_scores):
             results[i]["bleu_score"] = bleu
         bleu_valid = [b for b in bleu_scores if b is not None]
@@ -106,26 +322,18 @@ def run_all_evals(
 
     # Perplexity Score
     if use_perplexity:
+        progress.start("perplexity")
         texts = [orig.get("transformed_content", "") for orig in original_data]
-        evaluator = PerplexityEvaluator(model_name="skt/kogpt2-base-v2")
+        evaluator = _get_evaluator("perplexity", lambda: PerplexityEvaluator(model_name="skt/kogpt2-base-v2"))
         perplexity_scores = evaluator.calc_perplexity_batch(
             texts,
             batch_size=8,
+            progress=progress.advance
         )
         for i, score in enumerate(perplexity_scores):
             results[i]["perplexity_score"] = score
         print_eval_stats([{"perplexity_score": r.get("perplexity_score")} for r in results])
 
-
-    # 통합 저장
-    if output_path is not None:
-        with open(output_path, "w", encoding="utf-8") as f:
-            for orig, res in zip(original_data, results):
-                merged = orig.copy()
-                merged.update(res)
-                f.write(json.dumps(merged, ensure_ascii=False) + "\n")
-        print(f"✅ 최종 통합 평가 결과 저장: {output_path}")
-
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--input_path", type=str, required=True)
@@ -135,6 +343,14 @@ if __name__ == "__main__":
     parser.add_argument("--use_quality", action="store_true")
     parser.add_argument("--use_bleu", action="store_true")
     parser.add_argument("--use_perplexity", action="store_true")
+    parser.add_argument("--progress_path", type=str, default=None)
+    parser.add_argument("--sample_per_cell", type=int, default=None,
+                        help="post_type × emotion 셀별 표본 개수 (표본 평균/신뢰구간을 먼저 계산)")
+    parser.add_argument("--sample_only", action="store_true", help="표본 평가만 하고 종료")
+    parser.add_argument("--sample_path", type=str, default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cascade_thresholds", type=str, default=None,
+                        help='cascade 평가 threshold (json, 예: {"type_score": 0.8, "quality_score": 0.8, "bleu_score": 0.2})')
     args = parser.parse_args()
 
     os.makedirs(os.path.dirname(args.output_path), exist_ok=True)
@@ -146,5 +362,11 @@ if __name__ == "__main__":
         use_quality=args.use_quality,
         use_bleu=args.use_bleu,
         use_perplexity=args.use_perplexity,
-        output_path=args.output_path
+        output_path=args.output_path,
+        progress_path=args.progress_path,
+        sample_per_cell=args.sample_per_cell,
+        sample_only=args.sample_only,
+        sample_path=args.sample_path,
+        seed=args.seed,
+        cascade_thresholds=json.loads(args.cascade_thresholds) if args.cascade_thresholds else None
     )
\ No newline at end of file
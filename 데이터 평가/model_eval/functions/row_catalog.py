@@ -0,0 +1,214 @@
+import os
+import json
+import sqlite3
+import hashlib
+import numpy as np
+from functions.score_store import SCORE_METRICS, EVAL_FIELDS, iter_lines
+from functions.eval_cache import CACHE_DIR, open_eval_view, load_scores
+
+# =========================
+# 여러 데이터셋 행을 한 번에 조회하기 위한 SQLite 행 카탈로그 (cache/catalog.sqlite)
+# - 행 위치(offset/length), content/source/text hash, post_type/emotion/level, 검색용 원문/변환문, 지표 점수 저장
+# - hash/지표 컬럼마다 index를 두고, 내보낼 행 데이터는 평가 결과 파일(memory map)에서 offset으로 읽음
+# - 스키마가 바뀌면 CATALOG_VERSION을 올림 (이전 카탈로그는 지우고 sync_catalog에서 다시 등록)
+# =========================
+CATALOG_NAME = "catalog.sqlite"
+CATALOG_VERSION = 2
+TEXT_FIELDS = ["content", "transformed_content"]
+TARGET_FIELD = "transformed_content"
+
+def connect(cache_dir: str = CACHE_DIR) -> sqlite3.Connection:
+    conn = sqlite3.connect(os.path.join(cache_dir, CATALOG_NAME), timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    if conn.execute("PRAGMA user_version").fetchone()[0] != CATALOG_VERSION:
+        conn.executescript("DROP TABLE IF EXISTS rows; DROP TABLE IF EXISTS datasets;")
+        conn.execute(f"PRAGMA user_version = {CATALOG_VERSION}")
+    metric_columns = ", ".join(f"{metric} REAL" for metric in SCORE_METRICS)
+    text_columns = ", ".join(f"{field} TEXT" for field in TEXT_FIELDS)
+    conn.executescript(f"""
+        CREATE TABLE IF NOT EXISTS datasets (
+            dataset TEXT PRIMARY KEY,
+            eval_hash TEXT
+        );
+        CREATE TABLE IF NOT EXISTS rows (
+            dataset TEXT NOT NULL,
+            row_idx INTEGER NOT NULL,
+            offset INTEGER NOT NULL,
+            length INTEGER NOT NULL,
+            content_hash TEXT NOT NULL,
+            source_hash TEXT NOT NULL,
+            text_hash TEXT NOT NULL,
+            post_type TEXT,
+            emotion TEXT,
+            level TEXT,
+            {text_columns},
+            {metric_columns},
+            PRIMARY KEY (dataset, row_idx)
+        );
+        CREATE INDEX IF NOT EXISTS idx_rows_hash ON rows (content_hash);
+        CREATE INDEX IF NOT EXISTS idx_rows_dataset_hash ON rows (dataset, content_hash, row_idx);
+        CREATE INDEX IF NOT EXISTS idx_rows_dataset_source ON rows (dataset, source_hash, row_idx);
+        CREATE INDEX IF NOT EXISTS idx_rows_dataset_text ON rows (dataset, text_hash, row_idx);
+    """)
+    for metric in SCORE_METRICS:
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_rows_{metric} ON rows ({metric})")
+    return conn
+
+def content_hash(data: dict) -> str:
+    """
+    평가 필드(점수, cascade 생략 표시)를 뺀 나머지 필드로 행 hash 계산 (데이터셋이 달라도 같은 데이터면 같은 hash)
+    """
+    fields = {key: value for key, value in data.items() if key not in EVAL_FIELDS}
+    return hashlib.sha1(json.dumps(fields, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+def source_hash(data: dict) -> str:
+    """
+    변환문(transformed_content)과 점수 필드를 뺀 입력 필드(원문, post_type, emotion 등)로 hash 계산
+    (데이터셋 버전 비교 시 같은 입력의 변환문이 바뀌었는지 찾는 용도)
+    """
+    fields = {key: value for key, value in data.items() if key not in EVAL_FIELDS and key != TARGET_FIELD}
+    return hashlib.sha1(json.dumps(fields, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+def text_hash(data: dict) -> str:
+    # 원문(content)만으로 계산한 hash (post_type/emotion이 바뀐 행도 같은 원문끼리 비교)
+    return hashlib.sha1(str(data.get("content", "")).encode("utf-8")).hexdigest()
+
+def _catalog_rows(filename: str, eval_view, score_store: dict):
+    row_idx = 0
+    offsets = score_store["offsets"]
+    metric_values = {metric: score_store[metric].tolist() for metric in SCORE_METRICS}
+    for line in iter_lines(eval_view):
+        if not line.strip():
+            continue
+        data = json.loads(line)
+        level = data.get("level")
+        yield (
+            filename, row_idx, int(offsets[row_idx]), int(score_store["lengths"][row_idx]), content_hash(data), source_hash(data), text_hash(data),
+            str(data.get("post_type", "unknown")), str(data.get("emotion", "unknown")),
+            None if level is None else str(level),
+            *[None if data.get(field) is None else str(data.get(field)) for field in TEXT_FIELDS],
+            *[None if np.isnan(metric_values[metric][row_idx]) else metric_values[metric][row_idx] for metric in SCORE_METRICS]
+        )
+        row_idx += 1
+
+def index_dataset(filename: str, eval_view, score_store: dict, eval_hash: str, cache_dir: str = CACHE_DIR):
+    """
+    데이터셋 하나의 행을 카탈로그에 등록 (같은 eval_hash로 이미 등록돼 있으면 건너뜀)
+    - 점수는 점수 컬럼(float32) 값을 그대로 저장해서 threshold_mask와 같은 결과가 나오게 함
+    """
+    conn = connect(cache_dir)
+    try:
+        indexed = conn.execute("SELECT eval_hash FROM datasets WHERE dataset = ?", (filename,)).fetchone()
+        if indexed is not None and indexed[0] == eval_hash:
+            return
+        n_columns = 10 + len(TEXT_FIELDS) + len(SCORE_METRICS)
+        with conn:
+            conn.execute("DELETE FROM rows WHERE dataset = ?", (filename,))
+            conn.executemany(
+                f"INSERT INTO rows VALUES ({', '.join(['?'] * n_columns)})",
+                _catalog_rows(filename, eval_view, score_store)
+            )
+            conn.execute("INSERT OR REPLACE INTO datasets VALUES (?, ?)", (filename, eval_hash))
+    finally:
+        conn.close()
+
+def remove_dataset(filename: str, cache_dir: str = CACHE_DIR):
+    conn = connect(cache_dir)
+    try:
+        with conn:
+            conn.execute("DELETE FROM rows WHERE dataset = ?", (filename,))
+            conn.execute("DELETE FROM datasets WHERE dataset = ?", (filename,))
+    finally:
+        conn.close()
+
+def indexed_datasets(cache_dir: str = CACHE_DIR) -> dict:
+    conn = connect(cache_dir)
+    try:
+        return dict(conn.execute("SELECT dataset, eval_hash FROM datasets").fetchall())
+    finally:
+        conn.close()
+
+def sync_catalog(manifest: dict, cache_dir: str = CACHE_DIR):
+    """
+    manifest 기준으로 카탈로그가 없거나(이전 버전 캐시) eval_hash가 다른 데이터셋을 등록하고, 삭제된 데이터셋 제거
+    """
+    indexed = indexed_datasets(cache_dir)
+    for filename, entry in manifest.items():
+        eval_hash = entry.get("eval_hash")
+        if eval_hash is None or indexed.get(filename) == eval_hash:
+            continue
+        eval_view = open_eval_view(filename, cache_dir)
+        try:
+            index_dataset(filename, eval_view, load_scores(filename, cache_dir), eval_hash, cache_dir)
+        finally:
+            if hasattr(eval_view, "close"):
+                eval_view.close()
+    for filename in indexed:
+        if filename not in manifest:
+            remove_dataset(filename, cache_dir)
+
+def _where_clause(datasets, thresholds: dict, text: str = None):
+    clauses = [f"dataset IN ({', '.join(['?'] * len(datasets))})"]
+    params = list(datasets)
+    for metric, thres in thresholds.items():
+        if metric not in SCORE_METRICS:
+            raise ValueError(f"알 수 없는 지표: {metric}")
+        clauses.append(f"{metric} >= ?")
+        params.append(float(np.float32(thres)))
+    if text:
+        clauses.append("(" + " OR ".join(f"{field} LIKE ?" for field in TEXT_FIELDS) + ")")
+        params.extend([f"%{text}%"] * len(TEXT_FIELDS))
+    return " AND ".join(clauses), params
+
+def query_filtered_rows(datasets, thresholds: dict, dedup: bool = True, cache_dir: str = CACHE_DIR) -> dict:
+    """
+    threshold를 통과한 행 위치 조회
+    - dedup=True 이면 같은 content hash 중 datasets 순서상 가장 먼저 나온 행만 남김
+    Returns: {데이터셋: 통과한 row_idx 배열(오름차순)}
+    """
+    result = {dataset: np.zeros(0, dtype=np.int64) for dataset in datasets}
+    if not datasets:
+        return result
+    where, params = _where_clause(datasets, thresholds)
+    rank = "CASE dataset " + " ".join(f"WHEN ? THEN {i}" for i in range(len(datasets))) + " END"
+    if dedup:
+        sql = f"""
+            SELECT dataset, row_idx FROM (
+                SELECT dataset, row_idx, ROW_NUMBER() OVER (
+                    PARTITION BY content_hash ORDER BY {rank}, row_idx
+                ) AS dup_rank
+                FROM rows WHERE {where}
+            ) WHERE dup_rank = 1
+        """
+        params = list(datasets) + params
+    else:
+        sql = f"SELECT dataset, row_idx FROM rows WHERE {where}"
+    conn = connect(cache_dir)
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+    grouped = {dataset: [] for dataset in datasets}
+    for dataset, row_idx in rows:
+        grouped[dataset].append(row_idx)
+    for dataset, indices in grouped.items():
+        result[dataset] = np.sort(np.asarray(indices, dtype=np.int64))
+    return result
+
+def search_rows(datasets, thresholds: dict = None, text: str = None, limit: int = 100, cache_dir: str = CACHE_DIR) -> list:
+    """
+    점수 범위/문장 검색 (content, transformed_content 부분 일치)
+    """
+    if not datasets:
+        return []
+    where, params = _where_clause(datasets, thresholds or {}, text)
+    columns = ["dataset", "row_idx", "post_type", "emotion", "level"] + TEXT_FIELDS + SCORE_METRICS
+    conn = connect(cache_dir)
+    try:
+        rows = conn.execute(
+            f"SELECT {', '.join(columns)} FROM rows WHERE {where} ORDER BY dataset, row_idx LIMIT ?",
+            params + [limit]
+        ).fetchall()
+    finally:
+        conn.close()
+    return [dict(zip(columns, row)) for row in rows]
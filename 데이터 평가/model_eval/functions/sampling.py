@@ -0,0 +1,72 @@
+import numpy as np
+
+def build_cells(score_stores, indices_list) -> dict:
+    """
+    필터링된 행 인덱스를 post_type × emotion 셀별로 한 번에 묶기 (범주 코드 컬럼만 사용)
+    Returns: {(post_type, emotion): (데이터셋 번호 배열, 행 인덱스 배열)}
+    """
+    parts = {}
+    for ds, (store, indices) in enumerate(zip(score_stores, indices_list)):
+        indices = np.asarray(indices, dtype=np.int64)
+        if not indices.size:
+            continue
+        type_names = store["post_type_names"]
+        emotion_names = store["emotion_names"]
+        codes = store["post_type_codes"][indices].astype(np.int64) * len(emotion_names) + store["emotion_codes"][indices]
+        order = np.argsort(codes, kind="stable")
+        bounds = np.flatnonzero(np.diff(codes[order])) + 1
+        for group in np.split(order, bounds):
+            code = int(codes[group[0]])
+            key = (str(type_names[code // len(emotion_names)]), str(emotion_names[code % len(emotion_names)]))
+            parts.setdefault(key, []).append((ds, indices[group]))
+    return {
+        key: (
+            np.concatenate([np.full(len(rows), ds, dtype=np.int64) for ds, rows in cell_parts]),
+            np.concatenate([rows for _, rows in cell_parts]),
+        )
+        for key, cell_parts in parts.items()
+    }
+
+def combined_scores(score_stores, ds_ids, rows, metrics) -> np.ndarray:
+    """
+    선택한 지표 점수의 평균 (점수가 없는 지표는 0으로 계산)
+    """
+    total = np.zeros(len(rows), dtype=np.float64)
+    for ds in np.unique(ds_ids):
+        mask = ds_ids == ds
+        store = score_stores[ds]
+        for metric in metrics:
+            total[mask] += np.nan_to_num(store[metric][rows[mask]], nan=0.0)
+    return total / max(len(metrics), 1)
+
+def stratified_sample(cells: dict, n_datasets: int, per_cell: int, seed: int = None,
+                      prefer_high_scores: bool = False, score_stores=None, metrics=None):
+    """
+    셀마다 per_cell 개씩 추출 (셀의 행이 부족하면 전부 사용)
+    - 무작위 추출은 비복원 추출(rng.choice)로 셀 크기가 아닌 추출 개수에 비례
+    - prefer_high_scores=True 이면 선택한 지표 평균이 높은 행부터 사용
+    Returns: (데이터셋별 행 인덱스 배열 리스트(오름차순), {셀: 추출 개수})
+    """
+    rng = np.random.default_rng(seed)
+    picked = [[] for _ in range(n_datasets)]
+    cell_counts = {}
+    for key in sorted(cells):
+        ds_ids, rows = cells[key]
+        k = min(per_cell, len(rows))
+        if k == len(rows):
+            chosen = np.arange(len(rows))
+        elif prefer_high_scores:
+            scores = combined_scores(score_stores, ds_ids, rows, metrics)
+            chosen = np.argpartition(-scores, k - 1)[:k]
+        else:
+            chosen = rng.choice(len(rows), size=k, replace=False, shuffle=False)
+        for ds in range(n_datasets):
+            selected = rows[chosen][ds_ids[chosen] == ds]
+            if selected.size:
+                picked[ds].append(selected)
+        cell_counts[key] = int(k)
+    indices_list = [
+        np.sort(np.concatenate(parts)) if parts else np.zeros(0, dtype=np.int64)
+        for parts in picked
+    ]
+    return indices_list, cell_counts
@@ -0,0 +1,168 @@
+import os
+import json
+import mmap
+import hashlib
+import numpy as np
+from matplotlib import cbook
+
+SCORE_METRICS = ["kobertscore_f1", "type_score", "quality_score", "bleu_score", "perplexity_score"]
+# cascade 평가에서 생략한 지표 목록 (main_eval.py의 CASCADE_SKIP_FIELD)
+CASCADE_SKIP_FIELD = "cascade_skipped"
+# 평가 단계에서 붙는 필드 (데이터 비교/내보내기 시 제외)
+EVAL_FIELDS = SCORE_METRICS + [CASCADE_SKIP_FIELD]
+CATEGORY_FIELDS = ["post_type", "emotion"]
+STORE_VERSION = 4
+
+def iter_lines(source):
+    """
+    bytes 또는 memory map에서 줄 단위(줄바꿈 포함)로 잘라서 반환 (전체를 한 번에 복사하지 않음)
+    """
+    pos, size = 0, len(source)
+    while pos < size:
+        end = source.find(b"\n", pos)
+        end = size if end == -1 else end + 1
+        yield source[pos:end]
+        pos = end
+
+def content_hash(content) -> int:
+    content = content.strip() if isinstance(content, str) else ""
+    if not content:
+        return 0
+    return int.from_bytes(hashlib.blake2b(content.encode("utf-8"), digest_size=8).digest(), "little", signed=True)
+
+def build_score_columns(eval_bytes) -> dict:
+    """
+    평가 결과 jsonl(bytes 또는 memory map)을 한 번만 파싱해서 지표별 float32 컬럼과 줄 오프셋 인덱스 생성
+    - 점수가 없거나 None이면 NaN
+    - offsets[i]:offsets[i] + lengths[i] 가 i번째 행의 바이트 범위
+    - post_type, emotion은 {field}_codes(int16) + {field}_names 로 저장
+    - content_hash: 원문(content, 앞뒤 공백 제거) hash(int64), 빈 원문은 0 (중복 없는 원문 개수 계산용)
+    - cascade_skipped: cascade 평가로 모델 지표를 생략한 행 (bool)
+    """
+    offsets, lengths = [], []
+    columns = {metric: [] for metric in SCORE_METRICS}
+    categories = {field: {} for field in CATEGORY_FIELDS}
+    category_codes = {field: [] for field in CATEGORY_FIELDS}
+    content_hashes = []
+    cascade_skipped = []
+    pos = 0
+    for line in iter_lines(eval_bytes):
+        start = pos
+        pos += len(line)
+        stripped = line.strip()
+        if not stripped:
+            continue
+        data = json.loads(stripped)
+        offsets.append(start)
+        lengths.append(len(line.rstrip(b"\r\n")))
+        for metric in SCORE_METRICS:
+            value = data.get(metric)
+            columns[metric].append(np.nan if value is None else float(value))
+        for field in CATEGORY_FIELDS:
+            value = str(data.get(field, "unknown"))
+            category_codes[field].append(categories[field].setdefault(value, len(categories[field])))
+        content_hashes.append(content_hash(data.get("content", "")))
+        cascade_skipped.append(bool(data.get(CASCADE_SKIP_FIELD)))
+
+    store = {metric: np.asarray(values, dtype=np.float32) for metric, values in columns.items()}
+    for field in CATEGORY_FIELDS:
+        store[f"{field}_codes"] = np.asarray(category_codes[field], dtype=np.int16)
+        store[f"{field}_names"] = np.asarray(list(categories[field]), dtype=str)
+    store["content_hash"] = np.asarray(content_hashes, dtype=np.int64)
+    store["cascade_skipped"] = np.asarray(cascade_skipped, dtype=bool)
+    store["offsets"] = np.asarray(offsets, dtype=np.int64)
+    store["lengths"] = np.asarray(lengths, dtype=np.int64)
+    store["version"] = np.asarray(STORE_VERSION)
+    return store
+
+def save_score_store(store: dict, store_path: str):
+    # np.savez는 확장자를 붙이므로 임시 파일명도 .npz로 끝나게 한 뒤 교체
+    tmp_path = store_path + ".tmp.npz"
+    np.savez(tmp_path, **store)
+    os.replace(tmp_path, store_path)
+
+def load_score_store(store_path: str) -> dict:
+    """
+    저장된 컬럼 파일을 읽어 dict로 반환 (버전이 다르거나 없으면 None)
+    """
+    if not os.path.exists(store_path):
+        return None
+    with np.load(store_path) as npz:
+        store = {key: npz[key] for key in npz.files}
+    if int(store.get("version", -1)) != STORE_VERSION:
+        return None
+    return store
+
+def load_or_build_score_store(eval_path: str, store_path: str) -> dict:
+    """
+    컬럼 파일이 평가 결과 파일보다 오래됐거나 없으면 다시 생성
+    """
+    store = None
+    if os.path.exists(store_path) and os.path.getmtime(store_path) >= os.path.getmtime(eval_path):
+        store = load_score_store(store_path)
+    if store is None:
+        with open(eval_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                store = build_score_columns(b"")
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                    store = build_score_columns(view)
+        save_score_store(store, store_path)
+    return store
+
+def mean_scores_from_store(store: dict, metrics) -> dict:
+    """
+    점수 컬럼의 지표별 평균 (NaN 제외, 값이 하나도 없는 지표는 제외)
+    """
+    mean_scores = {}
+    for metric in metrics:
+        values = store.get(metric)
+        if values is None:
+            continue
+        values = values[~np.isnan(values)]
+        if values.size:
+            mean_scores[metric] = float(values.astype(np.float64).mean())
+    return mean_scores
+
+def summarize_scores(score_store: dict, metrics, bins: int = 20) -> dict:
+    """
+    지표별 히스토그램 bin, 분위수, 박스플롯 통계 계산 (json 저장 가능한 형태)
+    - 히스토그램은 plt.hist(values, bins=20)과 같은 구간 사용
+    """
+    summaries = {}
+    for metric in metrics:
+        if metric not in score_store:
+            continue
+        values = score_store[metric]
+        values = values[~np.isnan(values)].astype(np.float64)
+        if not values.size:
+            continue
+        counts, edges = np.histogram(values, bins=bins)
+        box = cbook.boxplot_stats(values)[0]
+        summaries[metric] = {
+            "count": int(values.size),
+            "hist_counts": counts.tolist(),
+            "hist_edges": edges.tolist(),
+            "quantiles": dict(zip(["p05", "p25", "p50", "p75", "p95"],
+                                  np.percentile(values, [5, 25, 50, 75, 95]).tolist())),
+            "boxplot": {
+                key: (np.asarray(value).tolist() if key == "fliers" else float(value))
+                for key, value in box.items()
+            },
+        }
+    return summaries
+
+def row_count(store: dict) -> int:
+    return len(store["offsets"])
+
+def get_rows(eval_bytes, store: dict, indices) -> list:
+    """
+    선택된 행 인덱스만 오프셋으로 잘라서 json 파싱
+    """
+    offsets = store["offsets"]
+    lengths = store["lengths"]
+    rows = []
+    for i in indices:
+        start = int(offsets[i])
+        rows.append(json.loads(eval_bytes[start:start + int(lengths[i])]))
+    return rows
@@ -0,0 +1,136 @@
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from functions.eval_cache import CACHE_DIR, MANIFEST_NAME, cache_path, load_manifest, open_eval_view, load_scores
+from functions.row_catalog import sync_catalog
+
+# =========================
+# 프로세스 전체에서 공유하는 데이터셋 캐시
+# - 여러 세션이 같은 데이터셋의 점수 컬럼(읽기 전용 numpy)과 평가 파일 memory map을 함께 사용
+# - 세션은 SessionHandle로 참조를 잡고, 세션이 사라지면(handle GC) 참조도 자동으로 해제
+# - 메모리 예산(점수 컬럼 크기 합, memory map은 OS 페이지 캐시라 제외)을 넘으면
+#   참조가 없는 항목부터 오래된 순서(LRU)로 내리고(memory map도 닫음), 다음 요청 때 디스크에서 다시 로딩
+# - 예산은 soft limit: 세션이 참조 중인 항목은 내리지 않으므로 그동안은 예산을 넘을 수 있음
+#   → 세션이 파일 참조를 놓을 때(retain) 다시 검사해서 예산 안으로 줄임
+# - 행 카탈로그(SQLite) 동기화는 카탈로그를 쓰는 화면(검색, 중복 제거 내보내기, 버전 비교)을
+#   처음 열 때만 실행 (목록 로딩은 manifest만 읽음)
+# =========================
+DEFAULT_MEMORY_BUDGET_MB = int(os.environ.get("SHARED_CACHE_MB", "512"))
+
+class SessionHandle:
+    """
+    세션 하나를 나타내는 객체 (st.session_state에 보관)
+    """
+    pass
+
+class SharedDatasetCache:
+    def __init__(self, cache_dir: str = CACHE_DIR, memory_budget_mb: int = DEFAULT_MEMORY_BUDGET_MB):
+        self.cache_dir = cache_dir
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self._manifest = None
+        self._manifest_mtime = None
+        self.catalog_lock = threading.Lock()
+        self._catalog_manifest = None
+
+    def manifest(self) -> dict:
+        """
+        manifest.json이 바뀌었을 때만 다시 읽어서 모든 세션이 같은 목록을 공유 (읽기 전용)
+        """
+        with self.lock:
+            mtime = self._read_manifest_mtime()
+            if self._manifest is None or mtime != self._manifest_mtime:
+                self._manifest = load_manifest(self.cache_dir)
+                self._manifest_mtime = self._read_manifest_mtime()
+            return self._manifest
+
+    def ensure_catalog(self):
+        """
+        행 카탈로그를 현재 manifest에 맞춤 (manifest가 바뀐 뒤 처음 호출될 때만 동기화)
+        - 카탈로그가 없는 데이터셋(이전 캐시)은 등록하고, 삭제된 데이터셋은 제거
+        - manifest 목록을 읽는 다른 세션은 막지 않도록 별도 lock 사용
+        """
+        manifest = self.manifest()
+        with self.catalog_lock:
+            if self._catalog_manifest is not manifest:
+                sync_catalog(manifest, self.cache_dir)
+                self._catalog_manifest = manifest
+
+    def _read_manifest_mtime(self):
+        manifest_path = os.path.join(self.cache_dir, MANIFEST_NAME)
+        return os.stat(manifest_path).st_mtime_ns if os.path.exists(manifest_path) else None
+
+    def _load(self, filename: str) -> dict:
+        store = load_scores(filename, self.cache_dir)
+        for values in store.values():
+            values.setflags(write=False)
+        return {
+            "view": open_eval_view(filename, self.cache_dir),
+            "store": store,
+            "nbytes": sum(values.nbytes for values in store.values()),
+            "eval_mtime": os.path.getmtime(cache_path(filename, "_eval.jsonl", self.cache_dir)),
+            "holders": weakref.WeakSet(),
+        }
+
+    def get(self, handle: SessionHandle, filename: str):
+        """
+        (평가 파일 memory map, 점수 컬럼) 반환. 평가 파일이 바뀌었으면 다시 로딩
+        """
+        eval_mtime = os.path.getmtime(cache_path(filename, "_eval.jsonl", self.cache_dir))
+        with self.lock:
+            entry = self.entries.get(filename)
+            if entry is None or entry["eval_mtime"] != eval_mtime:
+                if entry is not None:
+                    self._close(entry)
+                entry = self._load(filename)
+                self.entries[filename] = entry
+            self.entries.move_to_end(filename)
+            entry["holders"].add(handle)
+            self._evict()
+            return entry["view"], entry["store"]
+
+    def retain(self, handle: SessionHandle, filenames):
+        """
+        세션이 지금 사용하는 파일 외의 참조는 해제
+        """
+        filenames = set(filenames)
+        with self.lock:
+            for filename, entry in self.entries.items():
+                if filename not in filenames:
+                    entry["holders"].discard(handle)
+            self._evict()
+
+    def invalidate(self, filename: str):
+        # 참조 중인 세션은 기존 객체를 계속 쓰고, 새 요청부터 디스크에서 다시 로딩
+        with self.lock:
+            entry = self.entries.pop(filename, None)
+            if entry is not None:
+                self._close(entry)
+            self._manifest = None
+
+    def _close(self, entry: dict):
+        # 참조 중인 세션이 없을 때만 memory map을 닫음 (있으면 그 세션이 계속 쓰고 GC 때 닫힘)
+        view = entry["view"]
+        if len(entry["holders"]) == 0 and hasattr(view, "close"):
+            try:
+                view.close()
+            except BufferError:
+                # 슬라이스 등으로 버퍼를 아직 참조 중이면 GC에 맡김
+                pass
+
+    def _evict(self):
+        """
+        예산을 넘으면 참조가 없는 항목을 LRU 순서로 내림 (참조 중인 항목은 남기므로 soft limit)
+        """
+        total = sum(entry["nbytes"] for entry in self.entries.values())
+        for filename in list(self.entries):
+            if total <= self.memory_budget:
+                break
+            entry = self.entries[filename]
+            if len(entry["holders"]) == 0:
+                total -= entry["nbytes"]
+                del self.entries[filename]
+                self._close(entry)
+
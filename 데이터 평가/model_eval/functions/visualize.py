@@ -2,6 +2,7 @@ import json
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
+from io import BytesIO
 from typing import List, Optional
 import streamlit as st
 import warnings
@@ -89,58 +90,69 @@ def plot_radar_chart_multi(
     ax.legend(loc='upper right', bbox_to_anchor=(1.25, 1.15), fontsize=11)
     st.pyplot(fig)
 
+@st.cache_data(max_entries=256, show_spinner=False)
+def render_score_distribution(metric, label, summary_keys, file_names, threshold, _summaries):
+    """
+    요약 통계로 히스토그램/박스플롯 png 생성
+    - summary_keys(파일 hash)와 threshold가 같으면 다시 그리지 않음
+    """
+    fig, axes = plt.subplots(1, 2, figsize=(10, 4))
+    metric_scores = [
+        (fname, summary[metric]) for fname, summary in zip(file_names, _summaries)
+        if summary is not None and metric in summary
+    ]
+
+    # 히스토그램 (정규화 값 기준)
+    for fname, summary in metric_scores:
+        edges = np.asarray(summary["hist_edges"])
+        axes[0].bar(edges[:-1], summary["hist_counts"], width=np.diff(edges), align="edge", alpha=0.5, label=fname)
+    if threshold is not None:
+        axes[0].axvline(threshold, color='red', linestyle='--', label='Threshold')
+    axes[0].set_title(f"{label} - Histogram")
+    axes[0].set_xlabel("Normalized Score (0~1)")
+    axes[0].set_ylabel("Count")
+    axes[0].set_xlim(0, 1.05)
+    axes[0].legend()
+
+    # 박스플롯 (정규화 값 기준)
+    box_stats = [dict(summary["boxplot"], label=fname) for fname, summary in metric_scores]
+    if box_stats:
+        axes[1].bxp(box_stats)
+    if threshold is not None:
+        axes[1].axhline(threshold, color='red', linestyle='--', label='Threshold')
+    axes[1].set_title(f"{label} - Boxplot")
+    axes[1].set_ylabel("Normalized Score (0~1)")
+    axes[1].set_ylim(0, 1)
+
+    # x축 라벨 각도 45도로 설정
+    for tick_label in axes[1].get_xticklabels():
+        tick_label.set_rotation(45)
+
+    buf = BytesIO()
+    fig.savefig(buf, format="png", bbox_inches="tight")
+    plt.close(fig)
+    return buf.getvalue()
+
 def plot_score_distribution(
-    eval_jsonl_bytes_list,
+    score_summaries,
     file_names,
     selected_metrics,
     metric_labels=None,
-    thresholds=None
+    thresholds=None,
+    summary_keys=None
 ):
     """
-    여러 평가 결과 jsonl(bytes) 리스트, 파일명 리스트, 선택 지표 리스트를 받아
+    여러 평가 결과의 지표별 요약 통계(summarize_scores) 리스트, 파일명 리스트, 선택 지표 리스트를 받아
     각 지표별로 히스토그램/박스플롯을 그려 Streamlit에 출력
+    - summary_keys: 요약 통계를 구분하는 키(평가 파일 hash), 같은 선택이면 캐시된 이미지 사용
     """
+    if summary_keys is None:
+        summary_keys = [json.dumps(summary, sort_keys=True) for summary in score_summaries]
 
     for metric in selected_metrics:
-        fig, axes = plt.subplots(1, 2, figsize=(10, 4))
-        metric_scores = []
-        for eval_bytes, fname in zip(eval_jsonl_bytes_list, file_names):
-            if eval_bytes is None:
-                continue
-            lines = eval_bytes.decode("utf-8").splitlines()
-            values = []
-            for line in lines:
-                try:
-                    data = json.loads(line)
-                    v = data.get(metric)
-                    if v is not None:
-                        values.append(float(v))
-                except Exception:
-                    continue
-            if values:
-                metric_scores.append((fname, values))
-
-        # 히스토그램 (정규화 값 기준)
-        for fname, values in metric_scores:
-            axes[0].hist(values, bins=20, alpha=0.5, label=fname)
-        if thresholds and metric in thresholds:
-            axes[0].axvline(thresholds[metric], color='red', linestyle='--', label='Threshold')
-        axes[0].set_title(f"{metric_labels.get(metric, metric) if metric_labels else metric} - Histogram")
-        axes[0].set_xlabel("Normalized Score (0~1)")
-        axes[0].set_ylabel("Count")
-        axes[0].set_xlim(0, 1.05)
-        axes[0].legend()
-
-        # 박스플롯 (정규화 값 기준)
-        axes[1].boxplot([v for _, v in metric_scores], labels=[f for f, _ in metric_scores])
-        if thresholds and metric in thresholds:
-            axes[1].axhline(thresholds[metric], color='red', linestyle='--', label='Threshold')
-        axes[1].set_title(f"{metric_labels.get(metric, metric) if metric_labels else metric} - Boxplot")
-        axes[1].set_ylabel("Normalized Score (0~1)")
-        axes[1].set_ylim(0, 1)
-        
-        # x축 라벨 각도 45도로 설정
-        for label in axes[1].get_xticklabels():
-            label.set_rotation(45)
-
-        st.pyplot(fig)
\ No newline at end of file
+        label = metric_labels.get(metric, metric) if metric_labels else metric
+        threshold = thresholds.get(metric) if thresholds else None
+        png = render_score_distribution(
+            metric, label, tuple(summary_keys), tuple(file_names), threshold, score_summaries
+        )
+        st.image(png, use_container_width=True)